@@ -0,0 +1,58 @@
+"""
+Recording a double pendulum trajectory the old way (update() plus appending
+attributes to lists every step) versus advance() filling an array, for every
+integrator. advance() only saves what's around the step: update()'s attribute
+lookups, the per-record appends and numpy row writes. That's 20-40% for the
+cheap explicit steps; rk4 and glrk4 spend nearly all their time inside the
+step function and come out about even. The real win is that it's one loop a
+compiled backend (jit.py) can take over wholesale.
+
+run from anywhere: python benchmarks/bench_advance.py [steps] [record_every]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pendulum_physics import DoublePendulum
+
+integrators = ('euler', 'symplectic_euler', 'leapfrog', 'velocity_verlet', 'rk4', 'glrk4')
+
+
+def make(integrator):
+    return DoublePendulum(origin=(0, 0), l1=200, l2=200, m1=15, m2=15, theta1=2.0, theta2=1.0, integrator=integrator)
+
+
+def with_update(integrator, steps, record_every):
+    pendulum = make(integrator)
+    angles1, velocities1, angles2, velocities2 = [], [], [], []
+    start = time.perf_counter()
+    for step in range(steps):
+        if step % record_every == 0:
+            angles1.append(pendulum.theta1)
+            velocities1.append(pendulum.vel1)
+            angles2.append(pendulum.theta2)
+            velocities2.append(pendulum.vel2)
+        pendulum.update()
+    return steps / (time.perf_counter() - start)
+
+
+def with_advance(integrator, steps, record_every):
+    pendulum = make(integrator)
+    start = time.perf_counter()
+    pendulum.advance(steps, record_every=record_every)
+    return steps / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    record_every = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    print(f"{'integrator':<18} {'update/s':>10} {'advance/s':>10} {'speedup':>8}")
+    for integrator in integrators:
+        # best of a few, single runs swing by 20% on a busy machine
+        before = max(with_update(integrator, steps, record_every) for _ in range(5))
+        after = max(with_advance(integrator, steps, record_every) for _ in range(5))
+        print(f"{integrator:<18} {before:>10.0f} {after:>10.0f} {after / before:>7.2f}x")
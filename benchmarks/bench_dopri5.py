@@ -0,0 +1,53 @@
+"""
+Fixed step RK4 versus adaptive dopri5 on the same double pendulum run: how
+many right hand side evaluations (counted by wrapping accelerations(), so
+both pay for everything they actually call) it takes to reach a given
+max relative energy error.
+
+run from anywhere: python benchmarks/bench_dopri5.py [seconds simulated]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pendulum_physics import DoublePendulum
+
+frame = 0.03 # the scripts' delta_t, dopri5 reports the state at these times
+
+
+def run(integrator, delta_t, seconds, **work):
+    pendulum = DoublePendulum(origin=(0, 0), l1=200, l2=200, m1=15, m2=15, theta1=3.0, theta2=1.0,
+                              delta_t=delta_t, integrator=integrator)
+    pendulum.work.update(work)
+    calls = [0]
+    accelerations = pendulum.accelerations
+
+    def counted(theta, omega):
+        calls[0] += 1
+        return accelerations(theta, omega)
+
+    pendulum.accelerations = counted
+    start_energy = pendulum.total_energy()
+    worst = 0.0
+    start = time.perf_counter()
+    for _ in range(round(seconds / delta_t)):
+        pendulum.update()
+        worst = max(worst, abs(pendulum.total_energy() - start_energy) / start_energy)
+    elapsed = time.perf_counter() - start
+    return worst, calls[0], elapsed, pendulum
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+
+    print(f"{'scheme':<22} {'max rel dE':>11} {'rhs evals':>10} {'ms':>8}  accepted/rejected")
+    for delta_t in (0.05, 0.03, 0.01, 0.005):
+        worst, calls, elapsed, _ = run('rk4', delta_t, seconds)
+        print(f"{'rk4 dt=' + str(delta_t):<22} {worst:>11.2e} {calls:>10} {elapsed * 1000:>8.1f}")
+    for tol in (1e-6, 1e-8, 1e-10, 1e-12):
+        worst, calls, elapsed, pendulum = run('dopri5', frame, seconds, rtol=tol, atol=tol)
+        counts = f"{pendulum.work['accepted']}/{pendulum.work['rejected']}"
+        print(f"{'dopri5 tol=' + str(tol):<22} {worst:>11.2e} {calls:>10} {elapsed * 1000:>8.1f}  {counts}")
@@ -0,0 +1,43 @@
+"""
+Long double pendulum runs at big time steps: the verlet schemes on
+(theta, omega), RK4 and GLRK4, against implicit midpoint on the canonical
+(theta, p) coordinates (symplectic even though the hamiltonian isn't
+separable) and its 4th order triple jump. Prints the worst and the final
+relative energy error, a drifting scheme has them about equal.
+
+run from anywhere: python benchmarks/bench_double_symplectic.py [seconds simulated]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pendulum_physics import DoublePendulum
+
+schemes = ('leapfrog', 'velocity_verlet', 'rk4', 'glrk4', 'implicit_midpoint', 'implicit_midpoint4')
+step_sizes = (0.3, 0.15)
+
+
+def run(integrator, delta_t, seconds):
+    pendulum = DoublePendulum(origin=(0, 0), l1=200, l2=200, m1=15, m2=15, theta1=2.5, theta2=1.0,
+                              delta_t=delta_t, integrator=integrator)
+    start_energy = pendulum.total_energy()
+    worst = error = 0.0
+    start = time.perf_counter()
+    for _ in range(round(seconds / delta_t)):
+        pendulum.update()
+        error = (pendulum.total_energy() - start_energy) / start_energy
+        worst = max(worst, abs(error))
+    return worst, error, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2000.0
+
+    print(f"{'scheme':<20} {'dt':>5} {'max rel dE':>11} {'final rel dE':>13} {'s':>6}")
+    for integrator in schemes:
+        for delta_t in step_sizes:
+            worst, final, elapsed = run(integrator, delta_t, seconds)
+            print(f"{integrator:<20} {delta_t:>5} {worst:>11.2e} {final:>13.2e} {elapsed:>6.2f}")
@@ -0,0 +1,50 @@
+"""
+Drawing a long run with matplotlib (Agg, saved to png in memory): every
+point against minmax() for an energy-like series and lttb() for a phase
+portrait. With the downsampling the render time should stop growing with
+the run length.
+
+run from anywhere: python benchmarks/bench_downsample.py
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from pendulum_physics.downsample import lttb, minmax
+
+
+def render(x, y):
+    start = time.perf_counter()
+    plt.figure(figsize=(10, 6))
+    plt.plot(x, y, 'b-')
+    plt.savefig(io.BytesIO(), format='png')
+    plt.close()
+    return time.perf_counter() - start
+
+
+def timed(reduce, x, y):
+    start = time.perf_counter()
+    x, y = reduce(x, y)
+    return time.perf_counter() - start, render(x, y)
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    print(f"{'points':>10} {'series':>8} {'all':>8} {'reduce+draw':>14} {'curve':>8} {'all':>8} {'reduce+draw':>14}")
+    for n in (10_000, 100_000, 1_000_000, 4_000_000):
+        steps = np.arange(n, dtype=float)
+        energy = 1000 + np.cumsum(rng.normal(size=n)) # drifting, noisy, like an euler run
+        theta, omega = np.sin(steps / 97) + 0.3 * np.sin(steps / 13), np.cos(steps / 97) + 0.3 * np.cos(steps / 31)
+        series_all, (series_reduce, series_draw) = render(steps, energy), timed(minmax, steps, energy)
+        curve_all, (curve_reduce, curve_draw) = render(theta, omega), timed(lttb, theta, omega)
+        print(f"{n:>10} {'minmax':>8} {series_all:>7.2f}s {series_reduce:>6.2f}+{series_draw:.2f}s "
+              f"{'lttb':>8} {curve_all:>7.2f}s {curve_reduce:>6.2f}+{curve_draw:.2f}s")
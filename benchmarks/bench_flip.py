@@ -0,0 +1,41 @@
+"""
+Flip time map throughput: pixels per second, and how much of the work the
+early termination (dropping flipped lanes, skipping pixels that can't flip)
+saves against stepping every pixel for the whole t_max.
+
+run from anywhere: python benchmarks/bench_flip.py [image side] [t_max]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from pendulum_physics.flip import flip_time_map
+from pendulum_physics.models import DoublePendulumModel
+
+if __name__ == '__main__':
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    t_max = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+    delta_t = 0.01
+    axis = np.linspace(-np.pi, np.pi, side)
+    flip_time_map(axis[:2], axis[:2], t_max=1.0, delta_t=delta_t, jit=True, workers=1) # compile outside the timing
+
+    print(f"{side}x{side} pixels, t_max {t_max:.0f}s, dt {delta_t}, {os.cpu_count()} cores")
+    for jit in (False, True):
+        start = time.perf_counter()
+        times = flip_time_map(axis, axis, t_max=t_max, delta_t=delta_t, jit=jit)
+        elapsed = time.perf_counter() - start
+        print(f"{f'jit={jit}':<12} {elapsed:>8.2f}s  {side * side / elapsed:>10.0f} pixels/s")
+
+    # lanes stop right at their flip, the ones that can't flip never start
+    model = DoublePendulumModel(200, 200, 15, 15, xp=np)
+    theta1, theta2 = np.meshgrid(axis, axis, indexing='ij')
+    can_flip = model.potential_energy((theta1, theta2)) >= model.potential_energy((0.0, np.pi))
+    steps_taken = np.minimum(times[can_flip], t_max).sum() / delta_t
+    steps_full = side * side * t_max / delta_t
+    print(f"flipped {np.isfinite(times).mean():.0%}, can flip {can_flip.mean():.0%}, "
+          f"lane steps {steps_taken / steps_full:.0%} of stepping every pixel to t_max")
@@ -0,0 +1,52 @@
+"""
+How long it takes to start python and import the physics, versus the pygame
+front-ends, and which heavy modules each one drags in.
+
+run from anywhere: python benchmarks/bench_import_time.py [repeats]
+"""
+
+import os
+import subprocess
+import sys
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+targets = [
+    ("python (nothing)", None, "pass"),
+    ("pendulum_physics", root, "import pendulum_physics"),
+    ("pendulum_physics.DoublePendulum", root, "from pendulum_physics import DoublePendulum"),
+    ("double_pendulum_glrk4 (front-end)", os.path.join(root, "double_pendulums"), "import double_pendulum_glrk4"),
+    ("pendulum_glrk4 (front-end)", os.path.join(root, "simple_pendulums"), "import pendulum_glrk4"),
+]
+
+heavy = ("numpy", "scipy", "matplotlib", "pygame")
+
+# prints the wall time of the import and which heavy modules ended up loaded
+probe = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(cwd, statement, repeats):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    code = probe.format(statement=statement, heavy=heavy)
+    best = float("inf")
+    loaded = ""
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+        elapsed, _, loaded = result.stdout.strip().splitlines()[-1].partition(" ")
+        best = min(best, float(elapsed))
+    return best, loaded
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'import':<36} {'best ms':>8}  heavy modules loaded")
+    for name, cwd, statement in targets:
+        best, loaded = measure(cwd, statement, repeats)
+        print(f"{name:<36} {best * 1000:>8.1f}  {loaded or '-'}")
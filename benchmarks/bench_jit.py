@@ -0,0 +1,104 @@
+"""
+The numba backend (jit=True) against the plain python/numpy integrators.
+
+First a parity check: every compiled integrator has to land on the python
+result (single pendulum and ensemble, update() and advance()), an
+AssertionError naming every case that doesn't, so the script exits non-zero.
+--check stops after that, for running it after touching the kernels. Then
+steps/sec for a single trajectory and for ensembles. Needs numba, compile
+time is excluded (one warm-up run).
+
+run from anywhere: python benchmarks/bench_jit.py [--check] [steps] [ensemble size]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from pendulum_physics import DoublePendulum, DoublePendulumEnsemble, jit
+
+integrators = ('euler', 'symplectic_euler', 'leapfrog', 'velocity_verlet', 'rk4')
+tolerance = 1e-9 # different rounding/fma in the compiled code, chaos amplifies it a bit
+
+
+def single(integrator, use_jit):
+    return DoublePendulum(origin=(0, 0), l1=200, l2=150, m1=15, m2=10, theta1=2.0, theta2=1.0,
+                          integrator=integrator, jit=use_jit)
+
+
+def ensemble(integrator, use_jit, size):
+    theta1 = np.linspace(0.5, 3.0, size)
+    return DoublePendulumEnsemble(origin=(0, 0), l1=200, l2=150, m1=15, m2=10, theta1=theta1, theta2=1.0,
+                                  integrator=integrator, jit=use_jit)
+
+
+def parity(steps=300):
+    """max abs difference of every (integrator, case), raises AssertionError listing the ones over tolerance"""
+    differences = {}
+    for integrator in integrators:
+        plain, fast = single(integrator, False), single(integrator, True)
+        for _ in range(steps):
+            plain.update()
+            fast.update()
+        differences[integrator, 'single update'] = max(abs(a - b) for a, b in zip(plain.y, fast.y))
+
+        plain, fast = single(integrator, False), single(integrator, True)
+        differences[integrator, 'single advance'] = np.max(np.abs(plain.advance(steps, 7) - fast.advance(steps, 7)))
+
+        plain, fast = ensemble(integrator, False, 50), ensemble(integrator, True, 50)
+        for _ in range(steps):
+            plain.update()
+            fast.update()
+        differences[integrator, 'ensemble update'] = np.max(np.abs(plain.y - fast.y))
+        differences[integrator, 'ensemble advance'] = np.max(np.abs(plain.advance(steps, 7) - fast.advance(steps, 7)))
+        worst = max(v for (name, _), v in differences.items() if name == integrator)
+        print(f"parity {integrator:<18} max abs difference {worst:.1e}")
+
+    failed = [f"{name} {case}: {value:.1e}" for (name, case), value in differences.items()
+              if not value <= tolerance] # not <= so a nan fails too
+    if failed: # not an assert, python -O would drop it
+        raise AssertionError(f"compiled integrators disagree with python by more than {tolerance:.0e}: " + ", ".join(failed))
+    return differences
+
+
+def rate(make, steps, use_advance):
+    make().advance(3) # compile / warm up
+    pendulum = make()
+    start = time.perf_counter()
+    if use_advance:
+        pendulum.advance(steps)
+    else:
+        for _ in range(steps):
+            pendulum.update()
+    return steps / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    check_only = '--check' in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != '--check']
+    steps = int(args[0]) if len(args) > 0 else 20000
+    size = int(args[1]) if len(args) > 1 else 10000
+
+    if not jit.available:
+        sys.exit("numba isn't installed, nothing to compare")
+
+    parity()
+    if check_only:
+        sys.exit(0)
+
+    print(f"\n{'integrator':<18} {'mode':<22} {'python/s':>10} {'numba/s':>11} {'speedup':>8}")
+    for integrator in integrators:
+        modes = (
+            ("single update()", lambda j: single(integrator, j), steps, False),
+            ("single advance()", lambda j: single(integrator, j), steps, True),
+            (f"ensemble {size} update", lambda j: ensemble(integrator, j, size), max(steps // 200, 10), False),
+            (f"ensemble {size} advance", lambda j: ensemble(integrator, j, size), max(steps // 200, 10), True),
+        )
+        for mode, make, n, use_advance in modes:
+            plain = rate(lambda: make(False), n, use_advance)
+            fast = rate(lambda: make(True), n, use_advance)
+            print(f"{integrator:<18} {mode:<22} {plain:>10.0f} {fast:>11.0f} {fast / plain:>7.1f}x")
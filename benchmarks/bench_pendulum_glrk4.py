@@ -0,0 +1,35 @@
+"""
+steps/sec of the simple pendulum GLRK4 step, old fsolve engine vs the newton one.
+
+run from anywhere: python benchmarks/bench_pendulum_glrk4.py [steps]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pendulum_physics import Pendulum
+
+
+def steps_per_sec(integrator, steps, angle=2.0, velocity=0.0):
+    pendulum = Pendulum(origin=(0, 0), length=1, mass=1, angle=angle, velocity=velocity, integrator=integrator)
+    start = time.perf_counter()
+    for _ in range(steps):
+        pendulum.update()
+    elapsed = time.perf_counter() - start
+    return steps / elapsed, pendulum
+
+
+if __name__ == '__main__':
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    before, slow = steps_per_sec('glrk4_fsolve', steps)
+    after, fast = steps_per_sec('glrk4', steps)
+
+    print(f"{'engine':<8} {'steps/sec':>12}")
+    print(f"{'fsolve':<8} {before:>12.0f}")
+    print(f"{'newton':<8} {after:>12.0f}")
+    print(f"speedup: {after / before:.1f}x")
+    print(f"angle difference after {steps} steps: {abs(slow.angle - fast.angle):.2e}")
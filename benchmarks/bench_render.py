@@ -0,0 +1,97 @@
+"""
+Drawing N double pendulums per frame: the old way (two draw.line and two
+draw.circle calls per pendulum, like butterfly_effect.py used to) against
+EnsembleRenderer (one draw.lines per color for the arms, bobs written into
+the surface pixels), plus what an ensemble step costs at the same N, so the
+two halves of a frame can be compared. Then the fading trails of
+chaos_art.py: every segment redrawn with its own alpha each frame (the old
+way) against TrailCanvas (one fade and the newest segment), for a few trail
+lengths. Headless (SDL dummy driver).
+
+run from anywhere: python benchmarks/bench_render.py
+"""
+
+import os
+import sys
+import time
+from collections import deque
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pygame
+
+from pendulum_physics import DoublePendulumEnsemble
+from pendulum_physics.render import EnsembleRenderer, TrailCanvas
+
+origin = (400, 200)
+
+
+def per_frame(draw, repeat=20):
+    draw()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        draw()
+    return (time.perf_counter() - start) / repeat
+
+
+def per_pendulum(screen, positions, colors):
+    for color, (bob1, bob2) in zip(colors, positions.tolist()):
+        pygame.draw.line(screen, color, origin, bob1, 2)
+        pygame.draw.circle(screen, color, (int(bob1[0]), int(bob1[1])), 5)
+        pygame.draw.line(screen, color, bob1, bob2, 2)
+        pygame.draw.circle(screen, color, (int(bob2[0]), int(bob2[1])), 5)
+
+
+def redrawn_trail(screen, surface, trail, color):
+    surface.fill((0, 0, 0, 15))
+    for i in range(len(trail) - 1):
+        pygame.draw.line(surface, (*color, int(255 * (i / len(trail)))), trail[i], trail[i + 1], 2)
+    screen.blit(surface, (0, 0))
+
+
+def trail_points(n):
+    t = np.arange(n) * 0.05
+    return np.column_stack((400 + 300 * np.sin(1.3 * t), 400 + 300 * np.cos(0.7 * t))).tolist()
+
+
+if __name__ == '__main__':
+    pygame.init()
+    screen = pygame.display.set_mode((800, 800))
+    rng = np.random.default_rng(0)
+
+    print(f"{'pendulums':>9} {'per pendulum':>13} {'renderer':>9} {'bobs only':>10} {'rk4 step':>9} {'glrk4 step':>11}  (ms per frame)")
+    for n in (100, 1000, 10_000):
+        theta = np.linspace(0.5, 2.5, n)
+        pendulums = DoublePendulumEnsemble(origin, 200, 200, 5, 5, theta, theta[::-1], integrator='rk4')
+        positions = np.empty((n, 2, 2))
+        colors = rng.integers(50, 256, (n, 3))
+        color_list = [tuple(c) for c in colors.tolist()]
+        renderer = EnsembleRenderer(origin, colors, radius=4 if n <= 256 else 1, width=2)
+        bobs_only = EnsembleRenderer(origin, colors, arms=0)
+
+        old = per_frame(lambda: per_pendulum(screen, pendulums.positions(out=positions), color_list), repeat=3 if n > 1000 else 20)
+        new = per_frame(lambda: renderer.draw(screen, pendulums.positions(out=positions)))
+        bare = per_frame(lambda: bobs_only.draw(screen, pendulums.positions(out=positions)))
+        rk4 = per_frame(pendulums.update, repeat=5)
+        implicit = DoublePendulumEnsemble(origin, 200, 200, 5, 5, theta, theta[::-1], integrator='glrk4')
+        glrk4 = per_frame(implicit.update, repeat=3)
+        print(f"{n:>9} {1e3 * old:>13.2f} {1e3 * new:>9.2f} {1e3 * bare:>10.2f} {1e3 * rk4:>9.2f} {1e3 * glrk4:>11.2f}")
+
+    print(f"\n{'trail':>9} {'redrawn':>9} {'canvas':>9}  (ms per frame, one trail)")
+    surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+    for length in (1200, 10_000, 50_000):
+        points = trail_points(length + 1)
+        trail = deque(points[:length], maxlen=length)
+        old = per_frame(lambda: redrawn_trail(screen, surface, trail, (0, 0, 255)), repeat=3)
+        canvas = TrailCanvas(screen.get_size(), length=length)
+        segment = iter(zip(points, points[1:]))
+
+        def incremental():
+            canvas.fade()
+            canvas.line(*next(segment), (0, 0, 255), 2)
+            canvas.draw(screen)
+        new = per_frame(incremental)
+        print(f"{length:>9} {1e3 * old:>9.2f} {1e3 * new:>9.2f}")
+    pygame.quit()
@@ -0,0 +1,63 @@
+"""
+Recording a long run: python lists (what the scripts used to do) against a
+TrajectoryWriter, peak python memory and time per recorded frame, plus how
+long reading a column back takes.
+
+run from anywhere: python benchmarks/bench_store.py [frames]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pendulum_physics.store import TrajectoryReader, TrajectoryWriter
+
+COLUMNS = ('step', 'theta1', 'theta2', 'vel1', 'vel2', 'kinetic', 'potential', 'total')
+
+
+def into_lists(frames):
+    lists = [[] for _ in COLUMNS]
+    for i in range(frames):
+        for column, value in zip(lists, (i, 0.1 * i, 0.2 * i, 0.3 * i, 0.4 * i, 1.0 * i, 2.0 * i, 3.0 * i)):
+            column.append(value)
+    return lists
+
+
+def into_store(frames, path):
+    with TrajectoryWriter(path, COLUMNS, integrator='rk4', dt=0.03) as record:
+        for i in range(frames):
+            record.append(i, 0.1 * i, 0.2 * i, 0.3 * i, 0.4 * i, 1.0 * i, 2.0 * i, 3.0 * i)
+
+
+def measure(run, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == '__main__':
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{frames} frames of {len(COLUMNS)} floats")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.trj')
+        lists, elapsed, peak = measure(into_lists, frames)
+        del lists
+        print(f"{'lists':<20} {elapsed / frames * 1e6:>6.2f} us/frame  peak {peak / 2**20:>8.1f} MiB")
+        _, elapsed, peak = measure(into_store, frames, path)
+        print(f"{'TrajectoryWriter':<20} {elapsed / frames * 1e6:>6.2f} us/frame  peak {peak / 2**20:>8.1f} MiB"
+              f"  ({os.path.getsize(path) / 2**20:.1f} MiB on disk)")
+
+        start = time.perf_counter()
+        run = TrajectoryReader(path)
+        total = run['total']
+        opened = time.perf_counter() - start
+        print(f"{'open + column view':<20} {opened * 1e3:>6.2f} ms, max total {total.max():.0f}")
+        del run, total
@@ -0,0 +1,53 @@
+"""
+Wall time of a parameter sweep for 1, 2, 4, ... workers up to the core
+count, next to the old way (one DoublePendulum per parameter set, stepped
+with update() in this process). Ideal scaling is speedup == workers.
+
+run from anywhere: python benchmarks/bench_sweep.py [grid side] [steps]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from pendulum_physics import DoublePendulum
+from pendulum_physics.sweep import grid, sweep
+
+
+def one_at_a_time(params, steps, integrator):
+    for i in range(len(params['theta1'])):
+        pendulum = DoublePendulum(origin=(0, 0), l1=200, l2=200, m1=15, m2=15, theta1=params['theta1'][i],
+                                  theta2=params['theta2'][i], integrator=integrator)
+        for _ in range(steps):
+            pendulum.update()
+
+
+if __name__ == '__main__':
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    integrator = 'rk4'
+    params = grid(theta1=np.linspace(0.1, 3.0, side), theta2=np.linspace(0.1, 3.0, side))
+    cores = os.cpu_count() or 1
+
+    print(f"{side * side} parameter sets, {steps} {integrator} steps each, {cores} cores")
+    sample = {name: values[:100] for name, values in params.items()}
+    start = time.perf_counter()
+    one_at_a_time(sample, steps, integrator)
+    serial = (time.perf_counter() - start) * side * side / len(sample['theta1'])
+    print(f"{'one DoublePendulum at a time (extrapolated)':<44} {serial:>8.2f}s")
+
+    baseline = None
+    workers = 1
+    while True:
+        start = time.perf_counter()
+        sweep(**params, n_steps=steps, integrator=integrator, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{f'sweep, {workers} workers':<44} {elapsed:>8.2f}s  {baseline / elapsed:>5.2f}x")
+        if workers >= cores:
+            break
+        workers = min(workers * 2, cores)
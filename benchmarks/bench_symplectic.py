@@ -0,0 +1,41 @@
+"""
+Energy drift versus cost for the simple pendulum: leapfrog, the yoshida
+compositions built on it and GLRK4 (the newton one and the original fsolve
+one). Max relative energy error over the whole run against wall time per
+simulated second, for a few step sizes.
+
+run from anywhere: python benchmarks/bench_symplectic.py [seconds simulated]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pendulum_physics import Pendulum
+
+schemes = ('leapfrog', 'yoshida4', 'yoshida6', 'yoshida8', 'glrk4', 'glrk4_fsolve')
+step_sizes = (0.2, 0.1, 0.05, 0.025)
+
+
+def drift(integrator, delta_t, seconds, angle=2.0):
+    pendulum = Pendulum(origin=(0, 0), length=1, mass=1, angle=angle, delta_t=delta_t, integrator=integrator)
+    start_energy = pendulum.total_energy()
+    worst = 0.0
+    start = time.perf_counter()
+    for _ in range(round(seconds / delta_t)):
+        pendulum.update()
+        worst = max(worst, abs(pendulum.total_energy() - start_energy) / start_energy)
+    elapsed = time.perf_counter() - start
+    return worst, elapsed / seconds
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 100.0
+
+    print(f"{'scheme':<14} {'dt':>6} {'max rel dE':>11} {'ms per sim s':>13}")
+    for integrator in schemes:
+        for delta_t in step_sizes:
+            worst, cost = drift(integrator, delta_t, seconds)
+            print(f"{integrator:<14} {delta_t:>6} {worst:>11.2e} {cost * 1000:>13.3f}")
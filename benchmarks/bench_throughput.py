@@ -0,0 +1,184 @@
+"""
+Throughput of every integrator's update(): steps per second for a single
+Pendulum, a single DoublePendulum and DoublePendulumEnsembles of 1, 100
+and 10k lanes (plus the numba kernels with --jit). Headless, nothing here
+imports pygame.
+
+A progress table goes to stderr, the results go out as json (stdout, or
+--out) together with the machine, python and library versions, so runs can
+be kept and compared. With --compare old.json every case that also is in
+the old file gets checked, and the exit code is 1 if one got slower by more
+than --threshold or fails now.
+
+run from anywhere:
+    python benchmarks/bench_throughput.py > baseline.json
+    python benchmarks/bench_throughput.py --compare baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from pendulum_physics import INTEGRATORS, DoublePendulum, DoublePendulumEnsemble, Pendulum
+
+SKIP = ('glrk4_fsolve',) # same scheme as glrk4, and it can't step an ensemble, its errors would only be noise
+
+
+def steps_per_second(step, min_time, repeat):
+    """best of `repeat` runs, each doubling its step count until it takes at least min_time"""
+    # warm up first: jit compiles (a second time once the int start values turned float), warm starts, lazy imports
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        step()
+    best = 0.0
+    for _ in range(repeat):
+        n = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(n):
+                step()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+            n *= 2
+        best = max(best, n / elapsed)
+    return best
+
+
+def cases(integrators, lanes, jit):
+    """(model, integrator, lanes, jit, factory) for everything we time"""
+    for name in integrators:
+        yield 'pendulum', name, 1, False, lambda name=name: Pendulum((0, 0), 15, 300, angle=1.0, integrator=name)
+        for compiled in (False, True) if jit else (False,):
+            yield 'double_pendulum', name, 1, compiled, lambda name=name, compiled=compiled: DoublePendulum(
+                (0, 0), 200, 200, 15, 15, 1.0, 2.0, integrator=name, jit=compiled)
+            for n in lanes:
+                yield 'ensemble', name, n, compiled, lambda name=name, n=n, compiled=compiled: DoublePendulumEnsemble(
+                    (0, 0), 200, 200, 15, 15, np.linspace(0.5, 2.0, n), 2.0, integrator=name, jit=compiled)
+
+
+def environment():
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except ImportError:
+            return None
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'numba': version('numba'),
+        'scipy': version('scipy'),
+    }
+
+
+def key(result):
+    return result['model'], result['integrator'], result['lanes'], result['jit']
+
+
+def compare(results, baseline, threshold):
+    """
+    print how every case moved against the baseline, return the ones that got
+    slower than threshold allows and the ones that ran then and fail now
+    (those with change None)
+    """
+    old = {key(r): r for r in baseline['results'] if 'steps_per_s' in r}
+    regressions = []
+    print(f"\nagainst {baseline['environment'].get('commit') or 'baseline'} ({baseline['environment'].get('time')}),"
+          f" threshold {threshold:.0%}", file=sys.stderr)
+    for result in results:
+        before = old.get(key(result))
+        if before is None:
+            continue
+        if 'steps_per_s' not in result:
+            regressions.append((result, None))
+            print(f"{describe(result):<44} {'FAILED':>8}  {result['error']}", file=sys.stderr)
+            continue
+        change = result['steps_per_s'] / before['steps_per_s'] - 1
+        slower = change < -threshold
+        if slower:
+            regressions.append((result, change))
+        print(f"{describe(result):<44} {change:>+8.1%}{'  REGRESSION' if slower else ''}", file=sys.stderr)
+    return regressions
+
+
+def describe(result):
+    jit = ' jit' if result['jit'] else ''
+    lanes = f" x{result['lanes']}" if result['model'] == 'ensemble' else ''
+    return f"{result['model']}{lanes} {result['integrator']}{jit}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="steps/s of every integrator, as json")
+    parser.add_argument('--integrators', nargs='+', default=[n for n in sorted(INTEGRATORS) if n not in SKIP],
+                        help="default: all registered but " + ', '.join(SKIP))
+    parser.add_argument('--lanes', nargs='+', type=int, default=[1, 100, 10_000], help="ensemble sizes")
+    parser.add_argument('--jit', action='store_true', help="also time the numba kernels")
+    parser.add_argument('--min-time', type=float, default=0.1, help="seconds per timed run")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case, the best one counts")
+    parser.add_argument('--out', help="write the json here instead of stdout")
+    parser.add_argument('--compare', help="json from an earlier run to check against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown before it counts as a regression (runs on a busy machine wobble 10-20%%)")
+    args = parser.parse_args()
+
+    results = []
+    for model, name, lanes, jit, make in cases(args.integrators, args.lanes, args.jit):
+        result = {'model': model, 'integrator': name, 'lanes': lanes, 'jit': jit}
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', RuntimeWarning)
+                pendulum = make()
+        except RuntimeWarning:
+            continue # no compiled kernel for this one, the python version is timed already
+        try:
+            rate = steps_per_second(pendulum.update, args.min_time, args.repeat)
+            result.update(steps_per_s=rate, lane_steps_per_s=rate * lanes)
+            print(f"{describe(result):<44} {rate:>12.0f} steps/s {rate * lanes:>14.0f} lane steps/s", file=sys.stderr)
+        except Exception as error: # some integrators can't step some models, that's a result too
+            result['error'] = f"{type(error).__name__}: {error}"
+            print(f"{describe(result):<44} {result['error']}", file=sys.stderr)
+        results.append(result)
+
+    report = {'environment': environment(),
+              'settings': {'min_time': args.min_time, 'repeat': args.repeat},
+              'results': results}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            failed = sum(change is None for _, change in regressions)
+            print(f"{len(regressions) - failed} regression(s), {failed} case(s) failing that ran in the baseline", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
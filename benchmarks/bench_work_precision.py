@@ -0,0 +1,257 @@
+"""
+Work-precision of every integrator: each scheme runs the same swing at a
+range of time steps, and for every run we keep the wall time, the worst
+relative energy error over the run and the trajectory error (largest angle
+difference in radians, checked every --every seconds) against a tight
+dopri5 reference. dopri5 picks its own steps, so for it the tolerance gets
+swept instead, at dt 0.03.
+
+Prints a table per model with the pareto front marked (E: nothing is both
+faster and better on energy, T: same for the trajectory), the cheapest run
+under a few error targets, and saves log-log error vs wall time plots.
+
+--check only makes sure the fixed step schemes converge at their order on
+the simple pendulum (halving dt cuts the angle error by 2**order), and
+exits nonzero when one doesn't. A scheme that kicks from a wrong initial
+accel drops to first order and would be ranked wrongly by everything else.
+
+run from anywhere:
+    python benchmarks/bench_work_precision.py
+    python benchmarks/bench_work_precision.py --models double --integrators rk4 glrk4 --csv wp.csv
+    python benchmarks/bench_work_precision.py --check
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from pendulum_physics import INTEGRATORS, DoublePendulum, DoublePendulumModel, Pendulum, PendulumModel
+
+# all of these divide --every (3s) into whole steps, so every run lands on the checkpoints
+STEP_SIZES = (3.0, 1.5, 1.0, 0.6, 0.3, 0.15, 0.1, 0.06, 0.03, 0.015, 0.01)
+TOLERANCES = (1e-3, 1e-4, 1e-5, 1e-6, 1e-7, 1e-8, 1e-9, 1e-10, 1e-11)
+SKIP = ('glrk4_fsolve',) # same scheme as glrk4, just the slow old solver
+# what --check expects on the simple pendulum. leapfrog and verlet are only first order on the double one,
+# its accel depends on the velocities
+ORDERS = {'euler': 1, 'symplectic_euler': 1, 'leapfrog': 2, 'velocity_verlet': 2, 'implicit_midpoint': 2,
+          'rk4': 4, 'yoshida4': 4, 'glrk4': 4}
+
+
+def make(model, integrator, delta_t, jit=False):
+    if model == 'simple':
+        return Pendulum((0, 0), 15, 300, angle=2.5, delta_t=delta_t, integrator=integrator)
+    return DoublePendulum((0, 0), 200, 200, 15, 15, 1.0, 1.5, delta_t=delta_t, integrator=integrator, jit=jit)
+
+
+def energy(model, states):
+    """total energy of every row of states"""
+    if model == 'simple':
+        physics = PendulumModel(300, 15, xp=np)
+    else:
+        physics = DoublePendulumModel(200, 200, 15, 15, xp=np)
+    return physics.kinetic_energy(states.T) + physics.potential_energy(states.T)
+
+
+def trajectory(pendulum, seconds):
+    """states at t = 0, dt, ..., seconds as a (steps + 1, n_state) array"""
+    n_steps = round(seconds / pendulum.delta_t)
+    out = np.empty((n_steps + 1, len(pendulum.y)))
+    pendulum.advance(n_steps, out=out)
+    out[n_steps] = pendulum.y
+    return out
+
+
+def reference(model, seconds, every, rtol):
+    pendulum = make(model, 'dopri5', every)
+    pendulum.work.update(rtol=rtol, atol=rtol)
+    return trajectory(pendulum, seconds)
+
+
+def angle_error(states, ref):
+    n_dof = states.shape[1] // 2
+    difference = (states[:, :n_dof] - ref[:, :n_dof] + np.pi) % (2 * np.pi) - np.pi
+    return np.abs(difference).max()
+
+
+def run(model, integrator, delta_t, rtol, seconds, every, ref, jit, min_time, repeat):
+    """one point: wall time (best of a few runs if it is quick), max relative energy error, max angle error"""
+    per_checkpoint = round(every / delta_t)
+    if abs(per_checkpoint * delta_t - every) > 1e-9:
+        raise ValueError(f"dt {delta_t} doesn't divide --every {every}")
+    best = np.inf
+    for attempt in range(repeat):
+        pendulum = make(model, integrator, delta_t, jit)
+        if rtol is not None:
+            pendulum.work.update(rtol=rtol, atol=rtol)
+        if jit and attempt == 0:
+            pendulum.advance(2) # compile outside the timing
+            pendulum = make(model, integrator, delta_t, jit)
+        start = time.perf_counter()
+        states = trajectory(pendulum, seconds)
+        best = min(best, time.perf_counter() - start)
+        if best >= min_time:
+            break
+    total = energy(model, states)
+    energy_error = np.abs((total - total[0]) / total[0]).max()
+    return best, energy_error, angle_error(states[::per_checkpoint], ref)
+
+
+def orders(step_sizes=(0.1, 0.05), seconds=30.0, every=3.0, slack=0.25):
+    """observed order of every scheme in ORDERS, raises AssertionError listing the ones more than slack off"""
+    ref = reference('simple', seconds, every, 1e-13)
+    observed = {}
+    for integrator, expected in ORDERS.items():
+        errors = [angle_error(trajectory(make('simple', integrator, dt), seconds)[::round(every / dt)], ref)
+                  for dt in step_sizes]
+        observed[integrator] = np.log(errors[0] / errors[1]) / np.log(step_sizes[0] / step_sizes[1])
+        print(f"order {integrator:<18} {observed[integrator]:5.2f} (expected {expected})", file=sys.stderr)
+    failed = [f"{name}: {value:.2f} instead of {ORDERS[name]}" for name, value in observed.items()
+              if not abs(value - ORDERS[name]) <= slack] # not <= so a nan fails too
+    if failed: # not an assert, python -O would drop it
+        raise AssertionError("schemes off their order: " + ", ".join(failed))
+    return observed
+
+
+def pareto(times, errors):
+    """mask of the points nothing else beats on both wall time and error"""
+    order = np.lexsort((errors, times))
+    front = np.zeros(len(times), dtype=bool)
+    lowest = np.inf
+    for i in order:
+        if errors[i] < lowest:
+            front[i] = True
+            lowest = errors[i]
+    return front
+
+
+def points(model, integrators, step_sizes, tolerances, seconds, every, ref, jit, min_time, repeat):
+    rows = []
+    for integrator in integrators:
+        settings = [(0.03, rtol) for rtol in tolerances] if integrator == 'dopri5' else [(dt, None) for dt in step_sizes]
+        for delta_t, rtol in settings:
+            row = {'model': model, 'integrator': integrator, 'dt': delta_t, 'rtol': rtol}
+            try:
+                with np.errstate(all='ignore'):
+                    wall, energy_error, angle = run(model, integrator, delta_t, rtol, seconds, every, ref, jit, min_time, repeat)
+            except (ArithmeticError, ValueError, RuntimeError) as error: # blew up, or an implicit solver gave up at a big step
+                wall, energy_error, angle = np.nan, np.inf, np.inf
+                row['error'] = f"{type(error).__name__}: {error}"
+            if not np.isfinite(energy_error) or not np.isfinite(angle):
+                energy_error = angle = np.inf # diverged, never on the front
+            row.update(wall_s=wall, energy_error=energy_error, angle_error=angle)
+            rows.append(row)
+            print(f"  {integrator:<20} {setting(row):>12} {wall:>9.4f}s", file=sys.stderr)
+    times = np.array([r['wall_s'] for r in rows])
+    finite_times = np.where(np.isfinite(times), times, np.inf)
+    for name in ('energy_error', 'angle_error'):
+        front = pareto(finite_times, np.array([r[name] for r in rows]))
+        for row, on_front in zip(rows, front):
+            row[name + '_front'] = bool(on_front and np.isfinite(row[name]))
+    return rows
+
+
+def setting(row):
+    return f"rtol {row['rtol']:.0e}" if row['rtol'] is not None else f"dt {row['dt']:g}"
+
+
+def table(rows):
+    print(f"{'integrator':<20} {'setting':>12} {'wall s':>9} {'max rel dE':>11} {'angle err':>10}  front")
+    for row in rows:
+        front = ('E' if row['energy_error_front'] else ' ') + ('T' if row['angle_error_front'] else ' ')
+        print(f"{row['integrator']:<20} {setting(row):>12} {row['wall_s']:>9.4f} {row['energy_error']:>11.2e} "
+              f"{row['angle_error']:>10.2e}  {front}")
+
+
+def cheapest(rows, targets):
+    print(f"\n{'target':>8}  {'cheapest under it for energy':<40} {'cheapest under it for the trajectory':<40}")
+    for target in targets:
+        picks = []
+        for name in ('energy_error', 'angle_error'):
+            good = [r for r in rows if r[name] <= target]
+            best = min(good, key=lambda r: r['wall_s']) if good else None
+            picks.append(f"{best['integrator']} {setting(best)} ({best['wall_s']:.3f}s)" if best else '-')
+        print(f"{target:>8.0e}  {picks[0]:<40} {picks[1]:<40}")
+
+
+def plot(model, rows, path, reference_error):
+    figure, axes = plt.subplots(1, 2, figsize=(14, 6))
+    for ax, name, label in zip(axes, ('energy_error', 'angle_error'), ("max relative energy error", "max angle error (rad)")):
+        for i, integrator in enumerate(dict.fromkeys(r['integrator'] for r in rows)):
+            mine = [r for r in rows if r['integrator'] == integrator and np.isfinite(r[name])]
+            if mine:
+                # more schemes than the default color cycle has colors
+                ax.loglog([r['wall_s'] for r in mine], [r[name] for r in mine], '-', marker='osD^v<>'[i % 7], ms=4,
+                          color=plt.cm.tab20(i % 20), label=integrator)
+        front = sorted((r for r in rows if r[name + '_front']), key=lambda r: r['wall_s'])
+        ax.step([r['wall_s'] for r in front], [r[name] for r in front], 'k--', where='post', lw=1, label='pareto front')
+        if name == 'angle_error':
+            ax.axhline(reference_error, color='grey', lw=0.8, ls=':', label='reference accuracy')
+        ax.set_xlabel("wall time (s)")
+        ax.set_ylabel(label)
+        ax.grid(True, which='both', alpha=0.3)
+    for ax in axes:
+        ax.legend(fontsize=8)
+    figure.suptitle(f"work-precision, {model} pendulum")
+    figure.tight_layout()
+    figure.savefig(path, dpi=120)
+    plt.close(figure)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="error against wall time for every integrator over a range of dt")
+    parser.add_argument('--models', nargs='+', default=['simple', 'double'], choices=['simple', 'double'])
+    parser.add_argument('--integrators', nargs='+', default=[n for n in sorted(INTEGRATORS) if n not in SKIP],
+                        help="default: all registered but glrk4_fsolve")
+    parser.add_argument('--dts', nargs='+', type=float, default=STEP_SIZES, help="step sizes, each has to divide --every")
+    parser.add_argument('--seconds', type=float, default=300.0, help="simulated time per run")
+    parser.add_argument('--every', type=float, default=3.0, help="seconds between trajectory checks")
+    parser.add_argument('--jit', action='store_true', help="numba kernels where there are any (double pendulum)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="runs quicker than this are repeated, the best counts")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--targets', nargs='+', type=float, default=[1e-2, 1e-4, 1e-6, 1e-8])
+    parser.add_argument('--csv', help="also write every point here")
+    parser.add_argument('--plots', default='.', help="directory for work_precision_<model>.png")
+    parser.add_argument('--check', action='store_true', help="only check every fixed step scheme converges at its order")
+    args = parser.parse_args()
+
+    if args.check:
+        orders()
+        return
+
+    all_rows = []
+    for model in args.models:
+        ref = reference(model, args.seconds, args.every, 1e-13)
+        # how far the reference itself is off, errors below this are noise
+        reference_error = angle_error(reference(model, args.seconds, args.every, 1e-12), ref)
+        print(f"{model} pendulum, {args.seconds:g}s, reference dopri5 rtol 1e-13 (vs 1e-12: {reference_error:.1e} rad)",
+              file=sys.stderr)
+        rows = points(model, args.integrators, args.dts, TOLERANCES, args.seconds, args.every, ref,
+                      args.jit, args.min_time, args.repeat)
+        print(f"\n{model} pendulum, {args.seconds:g}s simulated, trajectory checked every {args.every:g}s "
+              f"against dopri5 at rtol 1e-13 (good to about {reference_error:.0e} rad)")
+        table(rows)
+        cheapest(rows, args.targets)
+        path = os.path.join(args.plots, f"work_precision_{model}.png")
+        plot(model, rows, path, reference_error)
+        print(f"plot: {path}")
+        all_rows += rows
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['model', 'integrator', 'dt', 'rtol', 'wall_s', 'energy_error', 'angle_error',
+                                                   'energy_error_front', 'angle_error_front', 'error'])
+            writer.writeheader()
+            writer.writerows(all_rows)
+
+
+if __name__ == '__main__':
+    main()
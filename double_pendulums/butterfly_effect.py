@@ -1,66 +1,93 @@
+import os
+import sys
 import pygame
 import math
 import random
-from double_pendulum_glrk4 import DoublePendulum
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics import DoublePendulumEnsemble
+from pendulum_physics.profiler import FrameProfiler
+from pendulum_physics.render import EnsembleRenderer
+from pendulum_physics.scheduler import FixedStep
 
 pygame.init()
 
 width, height = 800, 800
 screen = pygame.display.set_mode((width, height))
 pygame.display.set_caption("Double Pendulums with Slightly Different Initial Conditions")
-font = pygame.font.Font(None, 36)
 
 black = (0, 0, 0)
-G = 9.81
 delta_t = 0.05
+speed = 3.0 # simulated seconds per real second
 
 origin = (width // 2, height // 4)
 
-num_pendulums = 100
+# python butterfly_effect.py [number of pendulums] [integrator], e.g. 10000 rk4 (glrk4 is implicit, 10k of those don't step at 60 fps)
+num_pendulums = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+integrator = sys.argv[2] if len(sys.argv) > 2 else 'glrk4'
 initial_theta1 = math.pi / 2  # Starting at 90 degrees
 initial_theta2 = math.pi / 2
 theta_increment = 1e-5  # thousandth of a radian
 
-pendulums = []
-for i in range(num_pendulums):
-    theta1 = initial_theta1 + i * theta_increment
-    theta2 = initial_theta2 + i * theta_increment
+theta1 = initial_theta1 + np.arange(num_pendulums) * theta_increment
+theta2 = initial_theta2 + np.arange(num_pendulums) * theta_increment
 
+colors = []
+for i in range(num_pendulums):
     # Generate non-black, non-white colors
     r = random.randint(50, 255)
     g = random.randint(50, 255)
     b = random.randint(50, 255)
-    color = (r, g, b)
-
-    pendulum = DoublePendulum(
-        origin=origin,
-        l1=200,
-        l2=200,
-        m1=5,
-        m2=5,
-        theta1=theta1,
-        theta2=theta2,
-        ball_color=color,
-        line_color=color,  # Use the same color for both balls and lines
-        delta_t=delta_t
-    )
-    pendulums.append(pendulum)
+    colors.append((r, g, b))  # Use the same color for both balls and lines
+# all of them in a few draw calls, with arms up to a few hundred and only bobs past that
+few = num_pendulums <= 256
+renderer = EnsembleRenderer(origin, colors, radius=4 if few else 1, width=2 if few else 1, first_bob=few)
+positions = np.empty((num_pendulums, 2, 2))
+
+# all the pendulums live in one ensemble and get stepped together
+pendulums = DoublePendulumEnsemble(
+    origin=origin,
+    l1=200,
+    l2=200,
+    m1=5,
+    m2=5,
+    theta1=theta1,
+    theta2=theta2,
+    delta_t=delta_t,
+    integrator=integrator
+)
 
 running = True
 clock = pygame.time.Clock()
+profiler = FrameProfiler()
+fixed_step = FixedStep(speed=speed)
 
 while running:
+    profiler.frame()
     screen.fill(black)  # Black background
+    profiler.mark('clear')
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+            profiler.toggle()
+    profiler.mark('events')
+
+    fixed_step.advance(pendulums)
+    profiler.mark('update')
 
-    for pendulum in pendulums:
-        pendulum.update()
-        pendulum.draw(screen)
+    with fixed_step.interpolated(pendulums):
+        pendulums.positions(out=positions)
+    renderer.draw(screen, positions)
+    profiler.mark('draw')
 
+    profiler.draw(screen)
     pygame.display.flip()
+    profiler.mark('flip')
     clock.tick(240)  # Limit to 240 FPS
+    profiler.mark('tick')
 
 pygame.quit()
+print(profiler.summary())
@@ -1,7 +1,13 @@
+import os
+import sys
 import pygame
 import math
-from collections import deque
-from double_pendulum_glrk4 import DoublePendulum
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics import DoublePendulum
+from pendulum_physics.render import TrailCanvas
+from pendulum_physics.profiler import FrameProfiler
+from pendulum_physics.scheduler import FixedStep
 
 pygame.init()
 
@@ -15,6 +21,7 @@ white = (255, 255, 255)
 
 origin = (width // 2, height // 4)
 delta_t = 0.03
+speed = 1.8 # simulated seconds per real second
 pendulum = DoublePendulum(
     origin=origin,
     l1=200,
@@ -23,73 +30,66 @@ pendulum = DoublePendulum(
     m2=5,
     theta1=math.pi / 2,
     theta2=math.pi / 4,
-    ball_color=white,
-    line_color=white,
     delta_t=delta_t
 )
 
-fading_trail_max_length = 1200
-first_bob_fading_trail = deque(maxlen=fading_trail_max_length)
-second_bob_fading_trail = deque(maxlen=fading_trail_max_length)
-
-first_bob_full_trail = []
-second_bob_full_trail = []
+# frames until a trail segment has faded out, each frame only draws the newest segment so this can be as long as you like
+fading_trail_length = 5000
+fading_trail = TrailCanvas((width, height), length=fading_trail_length)
+previous_positions = None
 
-trail_surface = pygame.Surface((width, height), pygame.SRCALPHA)  # Add alpha channel
+# the whole run's trails for the image saved at the end, drawn as it goes in fixed memory, at full_trail_scale x the window size
+full_trail_scale = 2
+full_trail = TrailCanvas((width, height), length=None, scale=full_trail_scale)
 
 clock = pygame.time.Clock()
 running = True
 simulation_ended = False
+profiler = FrameProfiler()
+fixed_step = FixedStep(speed=speed)
 
 while running:
+    profiler.frame()
     screen.fill(black)
+    profiler.mark('clear')
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             simulation_ended = True
             running = False
-
-    pendulum.update()
-
-    first_bob_pos, second_bob_pos = pendulum.get_pos()
-
-    first_bob_fading_trail.append(first_bob_pos)
-    second_bob_fading_trail.append(second_bob_pos)
-
-    first_bob_full_trail.append(first_bob_pos)
-    second_bob_full_trail.append(second_bob_pos)
-
-    trail_surface.fill((0, 0, 0, 15))  # The last value (15) controls fade speed (lower = slower)
-
-    for i in range(len(first_bob_fading_trail) - 1):
-        alpha = int(255 * (i / len(first_bob_fading_trail)))  # Fade effect
-        color = (0, 0, 255, alpha)  # Blue with variable alpha
-        pygame.draw.line(trail_surface, color, first_bob_fading_trail[i], first_bob_fading_trail[i + 1], 2)
-
-    for i in range(len(second_bob_fading_trail) - 1):
-        alpha = int(255 * (i / len(second_bob_fading_trail)))  # Fade effect
-        color = (255, 255, 255, alpha)  # White with variable alpha
-        pygame.draw.line(trail_surface, color, second_bob_fading_trail[i], second_bob_fading_trail[i + 1], 2)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+            profiler.toggle()
+    profiler.mark('events')
+
+    fixed_step.advance(pendulum)
+    profiler.mark('update')
+
+    with fixed_step.interpolated(pendulum):
+        first_bob_pos, second_bob_pos = pendulum.get_pos()
+
+    fading_trail.fade()  # everything drawn so far one frame dimmer
+    if previous_positions is not None:
+        fading_trail.line(previous_positions[0], first_bob_pos, blue, 2)
+        fading_trail.line(previous_positions[1], second_bob_pos, white, 2)
+        full_trail.line(previous_positions[0], first_bob_pos, blue, 2)
+        full_trail.line(previous_positions[1], second_bob_pos, white, 2)
+    previous_positions = (first_bob_pos, second_bob_pos)
+    fading_trail.draw(screen)
+    profiler.mark('trails')
 
     pygame.draw.circle(screen, blue, (int(first_bob_pos[0]), int(first_bob_pos[1])), 8)  # First bob (blue)
     pygame.draw.circle(screen, white, (int(second_bob_pos[0]), int(second_bob_pos[1])), 8)  # Second bob (red)
+    profiler.mark('draw')
 
-    screen.blit(trail_surface, (0, 0))
-
+    profiler.draw(screen)
     pygame.display.flip()
+    profiler.mark('flip')
     clock.tick(240)
+    profiler.mark('tick')
 
 if simulation_ended:
-    static_surface = pygame.Surface((width, height))
-    static_surface.fill(black)
-
-    for i in range(len(first_bob_full_trail) - 1):
-        pygame.draw.line(static_surface, blue, first_bob_full_trail[i], first_bob_full_trail[i + 1], 2)
-
-    for i in range(len(second_bob_full_trail) - 1):
-        pygame.draw.line(static_surface, white, second_bob_full_trail[i], second_bob_full_trail[i + 1], 2)
-
-    pygame.image.save(static_surface, "double_pendulum_full_trail.png")
+    full_trail.save("double_pendulum_full_trail.png")
     print("Full trail image saved as 'double_pendulum_full_trail.png'")
 
 pygame.quit()
+print(profiler.summary())
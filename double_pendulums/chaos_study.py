@@ -1,7 +1,15 @@
+import os
+import sys
 import pygame
 import math
 import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 from double_pendulum_glrk4 import DoublePendulum  # Import your DoublePendulum class
+from pendulum_physics.lyapunov import lyapunov_spectrum
+from pendulum_physics.profiler import FrameProfiler
+from pendulum_physics.scheduler import FixedStep
+from pendulum_physics.telemetry import Telemetry
 
 pygame.init()
 
@@ -16,6 +24,7 @@ blue = (0, 0, 255)
 
 origin = (width // 2, height // 4)
 delta_t = 0.03
+speed = 3.0 # simulated seconds per real second
 
 theta1_initial = math.pi / 2
 theta2_initial = math.pi / 2
@@ -30,42 +39,63 @@ pendulum2 = DoublePendulum(
     ball_color=blue, line_color=blue, delta_t=delta_t
 )
 
-divergence_data = []
-time_data = []
-time_elapsed = 0
+# the distance between the two over time, fixed-size however long it runs
+divergence_data = Telemetry(('divergence',))
 
 running = True
 clock = pygame.time.Clock()
+frame_time = 0.0
+profiler = FrameProfiler()
+# one scheduler per pendulum, both fed the same frame time so they always take the same steps
+fixed_step1 = FixedStep(speed=speed)
+fixed_step2 = FixedStep(speed=speed)
 
 while running:
+    profiler.frame()
     screen.fill(black)
+    profiler.mark('clear')
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-
-    pendulum1.update()
-    pendulum2.update()
-
-    pendulum1.draw(screen)
-    pendulum2.draw(screen)
-
-    (x1_1, y1_1), (x2_1, y2_1) = pendulum1.get_pos()
-    (x1_2, y1_2), (x2_2, y2_2) = pendulum2.get_pos()
-    divergence = math.sqrt((x2_1 - x2_2) ** 2 + (y2_1 - y2_2) ** 2)
-
-    time_elapsed += delta_t
-    divergence_data.append(divergence)
-    time_data.append(time_elapsed)
-
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+            profiler.toggle()
+    profiler.mark('events')
+
+    steps = fixed_step1.advance(pendulum1, frame_time)
+    fixed_step2.advance(pendulum2, frame_time)
+    profiler.mark('update')
+
+    with fixed_step1.interpolated(pendulum1), fixed_step2.interpolated(pendulum2):
+        pendulum1.draw(screen)
+        pendulum2.draw(screen)
+    profiler.mark('draw')
+
+    if steps:
+        (x1_1, y1_1), (x2_1, y2_1) = pendulum1.get_pos()
+        (x1_2, y1_2), (x2_2, y2_2) = pendulum2.get_pos()
+        divergence = math.sqrt((x2_1 - x2_2) ** 2 + (y2_1 - y2_2) ** 2)
+        divergence_data.append(fixed_step1.time, divergence)
+    profiler.mark('divergence')
+
+    profiler.draw(screen)
     pygame.display.flip()
-    clock.tick(500)
+    profiler.mark('flip')
+    frame_time = clock.tick(500) / 1000
+    profiler.mark('tick')
 
 pygame.quit()
+print(profiler.summary())
+
+# the distance above saturates once the two are far apart, the exponent doesnt
+lyapunov = lyapunov_spectrum(theta1_initial, theta2_initial, l1=200, l2=200, m1=10, m2=10, t_total=200.0, delta_t=delta_t)[0, 0]
+print(f"largest lyapunov exponent: {lyapunov:.4f} 1/s")
 
+time_data, low, high, mean = divergence_data['divergence']
 plt.figure(figsize=(10, 6))
-plt.plot(time_data, divergence_data, color="orange", label="Divergence")
-plt.title("Chaos Transition Study: Divergence Over Time")
+plt.plot(time_data, mean, color="orange", label="Divergence")
+plt.fill_between(time_data, low, high, color="orange", alpha=0.3)
+plt.title(f"Chaos Transition Study: Divergence Over Time (largest Lyapunov exponent {lyapunov:.3f} 1/s)")
 plt.xlabel("Simulation Time (s)")
 plt.ylabel("Divergence (Euclidean Distance)")
 plt.legend()
@@ -0,0 +1,156 @@
+import os
+import sys
+import pygame
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics import double_pendulum as physics
+from pendulum_physics.profiler import FrameProfiler
+from pendulum_physics.scheduler import FixedStep
+from pendulum_physics.store import frame_writer
+from pendulum_physics.telemetry import Telemetry
+
+pygame.init()
+
+width, height = 800, 800
+screen = pygame.display.set_mode((width, height))
+pygame.display.set_caption("bes double pendulum ever creat3d")
+font = pygame.font.Font(None, 36)
+
+white = (255, 255, 255)
+black = (0, 0, 0)
+red = (255, 0, 0)
+delta_t = 0.03
+# delta t is just how often we look at the pendulum here, dopri5 picks its own
+# step sizes to stay inside the tolerance (big steps in quiet swings, small near flips)
+speed = 1.8 # simulated seconds per real second
+tolerance = 1e-8
+
+class DoublePendulum(physics.DoublePendulum):
+    """The headless double pendulum from pendulum_physics, stepped with the adaptive dopri5 integrator, plus pygame drawing."""
+    def __init__(self, origin, l1, l2, m1, m2, theta1, theta2):
+        super().__init__(origin, l1, l2, m1, m2, theta1, theta2, delta_t=delta_t, integrator='dopri5')
+        self.work['rtol'] = self.work['atol'] = tolerance
+
+    def draw(self, screen):
+        (x1, y1), (x2, y2) = self.get_pos()
+        pygame.draw.line(screen, black, self.origin, (x1, y1), 2)
+        pygame.draw.circle(screen, red if self.drag1 else black, (int(x1), int(y1)), self.m1)
+        pygame.draw.line(screen, black, (x1, y1), (x2, y2), 2)
+        pygame.draw.circle(screen, red if self.drag2 else black, (int(x2), int(y2)), self.m2)
+
+def draw_text(screen, text, position, font, color=black):
+    text_surface = font.render(text, True, color)
+    screen.blit(text_surface, position)
+
+
+origin = (width // 2, height // 4)
+double_pendulum = DoublePendulum(origin, l1=200, l2=200, m1=15, m2=15, theta1=0, theta2=0)
+
+
+record = frame_writer("double_pendulum_dopri5.trj", double_pendulum)
+energy = Telemetry(('kinetic', 'potential', 'total'))
+profiler = FrameProfiler()
+fixed_step = FixedStep(speed=speed)
+
+time_step = 0
+running = True
+clock = pygame.time.Clock()
+
+while running:
+    profiler.frame()
+    screen.fill(white)
+    profiler.mark('clear')
+
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                double_pendulum = DoublePendulum(origin, l1=200, l2=200, m1=15, m2=15, theta1=0, theta2=0)
+            elif event.key == pygame.K_p:
+                profiler.toggle()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            mouse_pos = pygame.mouse.get_pos()
+            (x1, y1), (x2, y2) = double_pendulum.get_pos()
+            if (mouse_pos[0] - x1) ** 2 + (mouse_pos[1] - y1) ** 2 <= double_pendulum.m1 ** 2:
+                double_pendulum.drag1 = True
+            elif (mouse_pos[0] - x2) ** 2 + (mouse_pos[1] - y2) ** 2 <= double_pendulum.m2 ** 2:
+                double_pendulum.drag2 = True
+        elif event.type == pygame.MOUSEBUTTONUP:
+            double_pendulum.release()
+        elif event.type == pygame.MOUSEMOTION:
+            double_pendulum.handle_mouse_drag(pygame.mouse.get_pos())
+
+    profiler.mark('events')
+    steps = fixed_step.advance(double_pendulum)
+    profiler.mark('update')
+    with fixed_step.interpolated(double_pendulum):
+        double_pendulum.draw(screen)
+    profiler.mark('draw')
+
+    # Calculate energies
+    kinetic_energy = double_pendulum.kinetic()
+    potential_energy = double_pendulum.potential()
+    total_energy = kinetic_energy + potential_energy
+
+    if steps:
+        record.append(time_step, *double_pendulum.y, kinetic_energy, potential_energy, total_energy)
+        energy.append(time_step, kinetic_energy, potential_energy, total_energy)
+    profiler.mark('energy')
+
+    instructions = "Space: Reset, dont reccomend lol | P: Profiler"
+    energy_text = f"Total Energy: {total_energy:.2f} | KE: {kinetic_energy:.2f} | PE: {potential_energy:.2f}"
+    steps_text = f"Steps accepted: {double_pendulum.work.get('accepted', 0)} | rejected: {double_pendulum.work.get('rejected', 0)}"
+
+    draw_text(screen, instructions, (10, height - 120), font)
+    draw_text(screen, steps_text, (10, height - 90), font)
+    draw_text(screen, energy_text, (10, height - 60), font)
+    profiler.mark('text')
+
+    time_step += steps
+
+    profiler.draw(screen)
+    pygame.display.flip()
+    profiler.mark('flip')
+
+pygame.quit()
+print(f"accepted steps: {double_pendulum.work.get('accepted', 0)}, rejected: {double_pendulum.work.get('rejected', 0)}, rhs evaluations: {double_pendulum.work.get('nfev', 0)}")
+record.close()
+print(profiler.summary())
+time_steps, low, high, mean = energy.history()
+kinetic_energies, potential_energies, total_energies = mean.T
+
+plt.figure(figsize=(10, 6))
+plt.plot(time_steps, total_energies, label="Total Energy", color='red')
+plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
+plt.plot(time_steps, kinetic_energies, label="Kinetic Energy", color='green')
+plt.plot(time_steps, potential_energies, label="Potential Energy", color='blue')
+plt.title("Dormand-Prince 5(4): Double Pendulum Energy Over Time")
+plt.xlabel("Time Step")
+plt.ylabel("Energy")
+plt.legend(loc="upper right")
+delta_t_text = f"Frame step (\u0394t): {delta_t:.2f}s, tol {tolerance:.0e}"
+plt.text(1.05, 0.05, delta_t_text, transform=plt.gca().transAxes, fontsize=10,
+         verticalalignment='bottom', horizontalalignment='left',
+         bbox=dict(boxstyle="round", facecolor="white", alpha=0.5))
+plt.legend(loc="center left", bbox_to_anchor=(1, 0.5), title="Legend")
+plt.tight_layout(rect=[0, 0, 0.98, 1])
+plt.grid()
+plt.show()
+
+plt.figure(figsize=(10, 6))
+plt.plot(time_steps, total_energies, label="Total Energy", color='red')
+plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
+plt.title("Dormand-Prince 5(4): Double Pendulum Energy Over Time")
+plt.xlabel("Time Step")
+plt.ylabel("Energy")
+plt.legend(loc="upper right")
+delta_t_text = f"Frame step (\u0394t): {delta_t:.2f}s, tol {tolerance:.0e}"
+plt.text(1.05, 0.05, delta_t_text, transform=plt.gca().transAxes, fontsize=10,
+         verticalalignment='bottom', horizontalalignment='left',
+         bbox=dict(boxstyle="round", facecolor="white", alpha=0.5))
+plt.legend(loc="center left", bbox_to_anchor=(1, 0.5), title="Legend")
+plt.tight_layout(rect=[0, 0, 0.98, 1])
+plt.grid()
+plt.show()
\ No newline at end of file
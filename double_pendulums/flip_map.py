@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics.flip import flip_time_map
+
+# how long until the second arm flips over, for every starting (theta1, theta2) released from rest.
+# black = never flipped in t_max (or can't, not enough energy)
+# usage: python flip_map.py [image side] [seconds simulated]
+
+side = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+t_max = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+
+# the worker processes may re-import this file, so only run it directly
+if __name__ == '__main__':
+    theta1_axis = np.linspace(-np.pi, np.pi, side)
+    theta2_axis = np.linspace(-np.pi, np.pi, side)
+
+    start = time.perf_counter()
+    times = flip_time_map(theta1_axis, theta2_axis, t_max=t_max, jit=True) # jit falls back without numba
+    print(f"{side}x{side} flip map up to {t_max:.0f}s took {time.perf_counter() - start:.1f}s")
+    np.save("flip_map.npy", times)
+
+    # log scale, the fast flips are where all the structure is
+    image = np.ma.masked_invalid(np.log10(times)).T
+    cmap = plt.get_cmap("twilight_shifted").copy()
+    cmap.set_bad("black")
+    plt.imsave("flip_map.png", image, cmap=cmap, origin="lower")
+
+    plt.figure(figsize=(9, 8))
+    plt.imshow(image, origin="lower", extent=(-np.pi, np.pi, -np.pi, np.pi), cmap=cmap)
+    plt.colorbar(label="log10 time to first flip [s]")
+    plt.xlabel("Initial angle θ1 [radians]")
+    plt.ylabel("Initial angle θ2 [radians]")
+    plt.title("Time Until the Second Arm Flips")
+    plt.tight_layout()
+    plt.show()
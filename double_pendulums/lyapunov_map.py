@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics.lyapunov import lyapunov_map
+
+# largest lyapunov exponent for every starting (theta1, theta2), both released from rest.
+# dark = regular motion, bright = chaos
+# usage: python lyapunov_map.py [grid side] [seconds simulated]
+
+side = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+t_total = float(sys.argv[2]) if len(sys.argv) > 2 else 100.0
+
+# the worker processes may re-import this file, so only run it directly
+if __name__ == '__main__':
+    theta1_axis = np.linspace(-np.pi, np.pi, side)
+    theta2_axis = np.linspace(-np.pi, np.pi, side)
+
+    start = time.perf_counter()
+    exponents = lyapunov_map(theta1_axis, theta2_axis, t_total=t_total, transient=10.0)
+    print(f"{side}x{side} map over {t_total:.0f}s took {time.perf_counter() - start:.1f}s")
+    np.save("lyapunov_map.npy", exponents)
+
+    plt.figure(figsize=(9, 8))
+    plt.imshow(exponents.T, origin="lower", extent=(-np.pi, np.pi, -np.pi, np.pi), cmap="magma", vmin=0)
+    plt.colorbar(label="Largest Lyapunov exponent [1/s]")
+    plt.xlabel("Initial angle θ1 [radians]")
+    plt.ylabel("Initial angle θ2 [radians]")
+    plt.title("Lyapunov Map of the Double Pendulum")
+    plt.tight_layout()
+    plt.savefig("lyapunov_map.png", dpi=150)
+    plt.show()
@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics.poincare import at_energy, load_hits, poincare_section
+
+# poincare section theta1 = 0, omega1 > 0 for a bunch of pendulums that all have the same energy.
+# closed curves are regular (quasi periodic) orbits, scattered dust is chaos
+# usage: python poincare_section.py [energy] [seconds simulated]
+
+energy = float(sys.argv[1]) if len(sys.argv) > 1 else 20000.0 # zero hanging at rest, flipping arm 2 takes 58860
+t_total = float(sys.argv[2]) if len(sys.argv) > 2 else 3000.0
+path = "poincare_hits.bin"
+
+# start on the section itself, spread along theta2 with omega2 = 0
+theta1, theta2, vel1, vel2 = at_energy(energy, theta2=np.linspace(-np.pi, np.pi, 41), vel2=0)
+print(f"{len(theta1)} initial conditions at energy {energy:.0f}")
+
+if os.path.exists(path):
+    os.remove(path)
+start = time.perf_counter()
+hits = poincare_section(theta1, theta2, vel1, vel2, t_total=t_total, out=path, jit=True) # jit falls back without numba
+print(f"{hits} hits in {time.perf_counter() - start:.1f}s, written to {path}")
+
+hits = load_hits(path)
+wrapped = (hits[:, 3] + np.pi) % (2 * np.pi) - np.pi
+plt.figure(figsize=(10, 8))
+plt.scatter(wrapped, hits[:, 5], c=hits[:, 0], s=0.5, cmap="nipy_spectral")
+plt.xlabel("Angle θ2 [radians]")
+plt.ylabel("Angular Velocity ω2 [radians/s]")
+plt.title(f"Poincaré Section θ1 = 0, ω1 > 0 at Energy {energy:.0f}")
+plt.tight_layout()
+plt.show()
@@ -0,0 +1,270 @@
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy') # never opens a window, works on machines without a display
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # the import greeting would end up in the raw stream
+import numpy as np
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics.render import EnsembleRenderer, TrailCanvas
+from pendulum_physics.sweep import sweep
+
+# the scenes of butterfly_effect.py and chaos_art.py rendered offline, every frame and at any size, instead of
+# screen recording the window. the whole trajectory gets computed first (sweep(), one advance() over all the steps),
+# then the frames are drawn headless in batches spread over a process pool and written out in order.
+#
+#   python render_video.py pendulums --size 1920x1080 --seconds 30 --out frames   # frames/000000.png, ...
+#   python render_video.py art --size 3840x2160 --seconds 600 --out - | ffmpeg -f rawvideo -pix_fmt rgb24 \
+#       -s 3840x2160 -r 60 -i - -pix_fmt yuv420p chaos_art.mp4
+#
+# --out - writes raw rgb24 frames to stdout (everything else goes to stderr). the workers render straight into
+# shared memory, 2 x workers x batch frames of it, and the main process only writes those out, so a 4k stream
+# doesn't get pickled on the way. pngs are written by the workers themselves (zlib level 1, a 4k frame in
+# about 80ms instead of the 500ms pygame.image.save takes).
+
+black = (0, 0, 0)
+blue = (0, 0, 255)
+white = (255, 255, 255)
+
+# like the live scripts, in pixels of their 800x800 window, scaled to the output height
+SCENES = {
+    # butterfly_effect.py
+    'pendulums': {'delta_t': 0.05, 'speed': 3.0, 'l1': 200, 'l2': 200, 'm1': 5, 'm2': 5,
+                  'theta1': math.pi / 2, 'theta2': math.pi / 2, 'spread': 1e-5},
+    # chaos_art.py, trail in seconds of video
+    'art': {'delta_t': 0.03, 'speed': 1.8, 'l1': 200, 'l2': 200, 'm1': 5, 'm2': 5,
+            'theta1': math.pi / 2, 'theta2': math.pi / 4, 'trail': 20},
+}
+
+
+def trajectory(scene, n_frames, steps_per_frame, pendulums, integrator, workers):
+    """theta1, theta2 of every pendulum at every frame, (n_frames, 2, N)"""
+    settings = SCENES[scene]
+    spread = np.arange(pendulums) * settings['spread'] if scene == 'pendulums' else 0.0
+    states = sweep(l1=settings['l1'], l2=settings['l2'], m1=settings['m1'], m2=settings['m2'],
+                   theta1=settings['theta1'] + spread, theta2=settings['theta2'] + spread,
+                   n_steps=n_frames * steps_per_frame, record_every=steps_per_frame, delta_t=settings['delta_t'],
+                   integrator=integrator, workers=workers)
+    return np.ascontiguousarray(states[:, :2])
+
+
+class FrameRenderer:
+    """one per worker process, draws frames of a scene from their angles"""
+
+    def __init__(self, scene, size, fps, pendulums, out, block_name=None, slots=0):
+        self.scene = scene
+        self.size = width, height = size
+        self.out = out
+        self.scale = height / 800
+        self.origin = (width / 2, height / 4)
+        settings = SCENES[scene]
+        self.lengths = np.array([settings['l1'], settings['l2']]) * self.scale
+        self.surface = pygame.Surface(size) # 32 bit, the display's default format
+        # byte of every color channel in a pixel, to pull rgb out of the surface memory
+        self.channels = [shift // 8 for shift in self.surface.get_shifts()[:3]]
+        if scene == 'pendulums':
+            colors = np.random.default_rng(0).integers(50, 256, (pendulums, 3))
+            self.renderer = EnsembleRenderer(self.origin, colors, radius=round(4 * self.scale), width=round(2 * self.scale))
+        else:
+            self.history = settings['trail'] * fps # frames until a segment is gone
+            # trails can't leave the circle both arms reach, the canvas only needs to cover that
+            reach = self.lengths.sum() + 8 * self.scale
+            left, top = max(0, int(self.origin[0] - reach)), max(0, int(self.origin[1] - reach))
+            right, bottom = min(width, int(self.origin[0] + reach) + 1), min(height, int(self.origin[1] + reach) + 1)
+            self.corner = np.array([left, top])
+            self.trail = TrailCanvas((right - left, bottom - top), length=self.history)
+        self.block = None
+        if block_name is None:
+            # png rows, a filter byte of 0 (none) in front of each
+            self.png = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+        else:
+            self.block = shared_memory.SharedMemory(name=block_name)
+            self.slots = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=self.block.buf)
+
+    def positions(self, thetas):
+        """(frames, N, 2, 2) bob positions, like DoublePendulumEnsemble.positions() for every frame"""
+        offsets = np.stack((np.sin(thetas), np.cos(thetas)), axis=-1) * self.lengths[:, None, None] # (frames, 2, N, 2)
+        positions = np.cumsum(offsets, axis=1) + self.origin
+        return positions.transpose(0, 2, 1, 3)
+
+    def render(self, first, thetas, slots):
+        """
+        frames first.. from their angles, thetas starting `before` frames
+        earlier for the trails. every frame goes into its slot in shared
+        memory, or a png in the out directory
+        """
+        positions = self.positions(thetas)
+        before = len(positions) - len(slots)
+        if self.scene == 'art':
+            # trails of the frames before this batch, then on frame by frame like chaos_art.py
+            self.trail.clear()
+            self.trail.replay(positions[:before + 1, 0] - self.corner, (blue, white), 2 * self.scale)
+        for i, slot in enumerate(slots):
+            frame = before + i
+            self.surface.fill(black)
+            if self.scene == 'pendulums':
+                self.renderer.draw(self.surface, positions[frame])
+            else:
+                if i:
+                    previous, current = positions[frame - 1, 0] - self.corner, positions[frame, 0] - self.corner
+                    self.trail.fade()
+                    self.trail.line(previous[0], current[0], blue, 2 * self.scale)
+                    self.trail.line(previous[1], current[1], white, 2 * self.scale)
+                self.trail.draw(self.surface, self.corner)
+                (x1, y1), (x2, y2) = positions[frame, 0].tolist()
+                pygame.draw.circle(self.surface, blue, (int(x1), int(y1)), round(8 * self.scale))
+                pygame.draw.circle(self.surface, white, (int(x2), int(y2)), round(8 * self.scale))
+
+            if self.block is not None:
+                self.rgb(self.slots[slot])
+            else:
+                self.rgb(self.png[:, 1:].reshape(self.size[1], self.size[0], 3))
+                _write_png(os.path.join(self.out, f"{first + i:06d}.png"), self.png, self.size)
+        return len(slots)
+
+    def rgb(self, out):
+        """the surface as (height, width, 3) rgb into out"""
+        width, height = self.size
+        buffer = self.surface.get_buffer() # locks the surface until it's gone
+        pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(height, -1)[:, :4 * width].reshape(height, width, 4)
+        for i, channel in enumerate(self.channels):
+            out[..., i] = pixels[..., channel]
+        del pixels, buffer
+
+
+def _write_png(path, rows, size):
+    # rows are the filtered scanlines, (height, 1 + 3 * width)
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    header = struct.pack('>IIBBBBB', size[0], size[1], 8, 2, 0, 0, 0) # 8 bit rgb
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(rows.data, 1))
+                + chunk(b'IEND', b''))
+
+
+_frame = None # the worker's FrameRenderer
+
+
+def _start_worker(*args):
+    global _frame
+    _frame = FrameRenderer(*args)
+
+
+def _render(first, thetas, slots):
+    return _frame.render(first, thetas, slots)
+
+
+class _Done:
+    # what pool.submit hands back, for the runs without a pool
+    def __init__(self, result):
+        self._result = result
+
+    def result(self):
+        return self._result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="render butterfly_effect.py or chaos_art.py offline")
+    parser.add_argument('scene', choices=sorted(SCENES))
+    parser.add_argument('--size', default='1920x1080', help="width x height in pixels")
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--out', default='frames', help="directory for the png sequence, - for raw rgb24 on stdout")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch', type=int, default=8, help="frames per task")
+    parser.add_argument('--pendulums', type=int, default=100)
+    parser.add_argument('--integrator', default='glrk4')
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split('x'))
+    settings = SCENES[args.scene]
+    n_frames = int(args.seconds * args.fps)
+    # whole physics steps per frame, so the speed is as close to the live scripts' as delta_t allows
+    steps_per_frame = max(1, round(settings['speed'] / (args.fps * settings['delta_t'])))
+    raw = args.out == '-'
+    log = sys.stderr
+
+    start = time.perf_counter()
+    thetas = trajectory(args.scene, n_frames, steps_per_frame, args.pendulums, args.integrator, args.workers)
+    physics = time.perf_counter() - start
+    print(f"{n_frames} frames of {args.scene}, {n_frames * steps_per_frame} steps in {physics:.1f}s", file=log)
+
+    # frames of history every batch needs before its first one, for the trails
+    before = settings.get('trail', 0) * args.fps
+    batches = [(lo, min(lo + args.batch, n_frames)) for lo in range(0, n_frames, args.batch)]
+    in_flight = 2 * args.workers # batches queued or being drawn at once, bounds the memory
+    block, n_slots = None, 0
+    if raw:
+        n_slots = in_flight * args.batch
+        block = shared_memory.SharedMemory(create=True, size=n_slots * size[0] * size[1] * 3)
+        slots = np.ndarray((n_slots, size[1], size[0], 3), dtype=np.uint8, buffer=block.buf)
+        stdout = sys.stdout.buffer
+    else:
+        os.makedirs(args.out, exist_ok=True)
+    setup = (args.scene, size, args.fps, args.pendulums, args.out, block.name if raw else None, n_slots)
+
+    def task(lo, hi, slot):
+        first = max(0, lo - before)
+        return lo, thetas[first:hi], list(range(slot, slot + hi - lo))
+
+    start = time.perf_counter()
+    pool = None
+    try:
+        if args.workers == 1:
+            _start_worker(*setup)
+            submit = lambda *job: _Done(_render(*job))
+        else:
+            pool = ProcessPoolExecutor(max_workers=args.workers, initializer=_start_worker, initargs=setup)
+            submit = lambda *job: pool.submit(_render, *job)
+        # batches go out in order and come back in order, the next one is only queued once the oldest is written,
+        # so no frame gets skipped however slow the writing is, and a batch's slots are free again when they're reused
+        pending = deque()
+        done = 0
+
+        def finish():
+            nonlocal done
+            lo, hi, slot, future = pending.popleft()
+            future.result() # re-raises whatever went wrong in a worker
+            if raw:
+                for frame in slots[slot:slot + hi - lo]:
+                    stdout.write(frame.data)
+            done += hi - lo
+            if done % (args.fps * 10) < hi - lo or done == n_frames:
+                print(f"{done}/{n_frames} frames, {done / (time.perf_counter() - start):.1f} fps", file=log)
+
+        for i, (lo, hi) in enumerate(batches):
+            slot = (i % in_flight) * args.batch
+            pending.append((lo, hi, slot, submit(*task(lo, hi, slot))))
+            if len(pending) == in_flight:
+                finish()
+        while pending:
+            finish()
+        if raw:
+            stdout.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if block is not None:
+            del slots
+            if _frame is not None and _frame.block is not None:
+                del _frame.slots
+                _frame.block.close()
+            block.close()
+            block.unlink()
+    elapsed = time.perf_counter() - start
+    print(f"{n_frames} {size[0]}x{size[1]} frames in {elapsed:.1f}s, {n_frames / elapsed:.1f} fps, "
+          f"{args.seconds / (physics + elapsed):.2f}x real time with the physics", file=log)
+
+
+# the worker processes may re-import this file, so only run it directly
+if __name__ == '__main__':
+    main()
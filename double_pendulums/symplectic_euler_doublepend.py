@@ -1,6 +1,15 @@
+import os
+import sys
 import pygame
-import math
 import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics import double_pendulum as physics
+from pendulum_physics.profiler import FrameProfiler
+from pendulum_physics.scheduler import FixedStep
+from pendulum_physics.store import frame_writer
+from pendulum_physics.telemetry import Telemetry
+
 pygame.init()
 
 width, height = 800, 800
@@ -11,86 +20,14 @@ font = pygame.font.Font(None, 36)
 white = (255, 255, 255)
 black = (0, 0, 0)
 red = (255, 0, 0)
-G = 9.81
 delta_t = 0.03
-# smaller delta t is more accurate, but slow
-# bigger delta t is less accurate but our sim runs faster 
+# smaller delta t is more accurate but takes more steps
+speed = 1.8 # simulated seconds per real second
 
-class DoublePendulum:
+class DoublePendulum(physics.DoublePendulum):
+    """The headless double pendulum from pendulum_physics, stepped with the symplectic_euler integrator, plus pygame drawing."""
     def __init__(self, origin, l1, l2, m1, m2, theta1, theta2):
-        self.origin = origin
-        self.l1 = l1 # length1 from main bob to first bob
-        self.l2 = l2 # length 2 from first bob to second bob
-        self.m1 = m1 # mass 1
-        self.m2 = m2 # mass 2
-        self.theta1 = theta1
-        self.theta2 = theta2
-        self.vel1 = 0
-        self.vel2 = 0
-        self.acc1 = 0
-        self.acc2 = 0
-        self.drag1 = False # if were dragging the first bob
-        self.drag2 = False # if were dragging the second bob
-
-    def get_pos(self):
-        #where pendulum hangs + length (our y) + sin/cos of our angle (our x)
-        x1 = self.origin[0] + self.l1 * math.sin(self.theta1)
-        y1 = self.origin[1] + self.l1 * math.cos(self.theta1)
-        x2 = x1 + self.l2 * math.sin(self.theta2)
-        y2 = y1 + self.l2 * math.cos(self.theta2)
-        return (x1,y1), (x2,y2)
-
-    def update(self):
-        #symplectic euler, update accel -> vel -> angle
-        # if we not dragging da ball
-        if not self.drag1 and not self.drag2:
-            num1 = -G * (2 * self.m1 + self.m2) * math.sin(self.theta1)
-            num2 = -self.m2 * G * math.sin(self.theta1 - 2 * self.theta2)
-            num3 = -2 * math.sin(self.theta1 - self.theta2) * self.m2
-            num4 = self.vel2 ** 2 * self.l2 + self.vel1 ** 2 * self.l1 * math.cos(self.theta1 - self.theta2)
-            den1 = self.l1 * (2 * self.m1 + self.m2 - self.m2 * math.cos(2 * self.theta1 - 2 * self.theta2))
-            self.acc1 = (num1 + num2 + num3 * num4) / den1
-
-            num1 = 2 * math.sin(self.theta1 - self.theta2)
-            num2 = (self.vel1 ** 2 * self.l1 * (self.m1 + self.m2))
-            num3 = G * (self.m1 + self.m2) * math.cos(self.theta1)
-            num4 = self.vel2 ** 2 * self.l2 * self.m2 * math.cos(self.theta1 - self.theta2)
-
-            den2 = self.l2 * (2 * self.m1 + self.m2 - self.m2 * math.cos(2 * self.theta1 - 2 * self.theta2))
-            self.acc2 = (num1 * (num2 + num3 + num4)) / den2
-            self.vel1 = self.vel1 + (delta_t * self.acc1)
-            self.vel2 = self.vel2 + (delta_t * self.acc2)
-            self.theta1 = self.theta1 + (delta_t * self.vel1)
-            self.theta2 = self.theta2 + (delta_t * self.vel2)
-
-    def kinetic(self):
-        v1x = self.l1 * self.vel1 * math.cos(self.theta1)
-        v1y = self.l1 * self.vel1 * math.sin(self.theta1)
-        v2x = v1x + self.l2 * self.vel2 * math.cos(self.theta2)
-        v2y = v1y + self.l2 * self.vel2 * math.sin(self.theta2)
-
-        return 0.5 * self.m1 * (v1x**2 + v1y**2) + 0.5 * self.m2 * (v2x**2 + v2y**2)
-    
-    def potential(self):
-        """
-        Calculate potential energy relative to the origin with offset to 
-        ensure the eq position is zero.
-        """
-        (x1, y1), (x2, y2) = self.get_pos()
-
-        # calc height relative to the origin
-        potential_energy = self.m1 * G * (self.origin[1] - y1) + self.m2 * G * (self.origin[1] - y2)
-        
-        # subtract potential energy at equilibrium pos (when da bob is down)
-        y1_rest = self.origin[1] + self.l1
-        y2_rest = y1_rest + self.l2
-        potential_energy_offset = self.m1 * G * (self.origin[1] - y1_rest) + self.m2 * G * (self.origin[1] - y2_rest)
-
-        return potential_energy - potential_energy_offset
-    
-    def total_energy(self):
-        """Calculate total energy of the system."""
-        return self.kinetic() + self.potential()
+        super().__init__(origin, l1, l2, m1, m2, theta1, theta2, delta_t=delta_t, integrator='symplectic_euler')
 
     def draw(self, screen):
         (x1, y1), (x2, y2) = self.get_pos()
@@ -99,23 +36,6 @@ class DoublePendulum:
         pygame.draw.line(screen, black, (x1, y1), (x2, y2), 2)
         pygame.draw.circle(screen, red if self.drag2 else black, (int(x2), int(y2)), self.m2)
 
-    def handle_mouse_drag(self, mouse_pos):
-        """Adjust the angles of the pendulum based on the mouse position."""
-        if self.drag1:
-            dx = mouse_pos[0] - self.origin[0]
-            dy = mouse_pos[1] - self.origin[1]
-            self.theta1 = math.atan2(dx, dy)
-        elif self.drag2:
-            (x1, y1), _ = self.get_pos()
-            dx = mouse_pos[0] - x1
-            dy = mouse_pos[1] - y1
-            self.theta2 = math.atan2(dx, dy)
-
-    def release(self):
-        """Handle the release of the pendulum bobs."""
-        self.drag1 = False
-        self.drag2 = False
-    
 def draw_text(screen, text, position, font, color=black):
     text_surface = font.render(text, True, color)
     screen.blit(text_surface, position)
@@ -125,17 +45,19 @@ origin = (width // 2, height // 4)
 double_pendulum = DoublePendulum(origin, l1=200, l2=200, m1=15, m2=15, theta1=0, theta2=0)
 
 
-kinetic_energies = []
-potential_energies = []
-total_energies = []
-time_steps = []
+record = frame_writer("symplectic_euler_doublepend.trj", double_pendulum)
+energy = Telemetry(('kinetic', 'potential', 'total'))
+profiler = FrameProfiler()
+fixed_step = FixedStep(speed=speed)
 
 time_step = 0
 running = True
 clock = pygame.time.Clock()
 
 while running:
+    profiler.frame()
     screen.fill(white)
+    profiler.mark('clear')
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -143,6 +65,8 @@ while running:
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
                 double_pendulum = DoublePendulum(origin, l1=200, l2=200, m1=15, m2=15, theta2=0)
+            elif event.key == pygame.K_p:
+                profiler.toggle()
         elif event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = pygame.mouse.get_pos()
             (x1, y1), (x2, y2) = double_pendulum.get_pos()
@@ -155,34 +79,45 @@ while running:
         elif event.type == pygame.MOUSEMOTION:
             double_pendulum.handle_mouse_drag(pygame.mouse.get_pos())
 
-    double_pendulum.update()
-    double_pendulum.draw(screen)
+    profiler.mark('events')
+    steps = fixed_step.advance(double_pendulum)
+    profiler.mark('update')
+    with fixed_step.interpolated(double_pendulum):
+        double_pendulum.draw(screen)
+    profiler.mark('draw')
 
     # Calculate energies
     kinetic_energy = double_pendulum.kinetic()
     potential_energy = double_pendulum.potential()
     total_energy = kinetic_energy + potential_energy
 
-    # Append energies to lists
-    kinetic_energies.append(kinetic_energy)
-    potential_energies.append(potential_energy)
-    total_energies.append(total_energy)
-    time_steps.append(time_step)
+    if steps:
+        record.append(time_step, *double_pendulum.y, kinetic_energy, potential_energy, total_energy)
+        energy.append(time_step, kinetic_energy, potential_energy, total_energy)
+    profiler.mark('energy')
 
-    instructions = "Space: Reset, dont reccomend lol"
+    instructions = "Space: Reset, dont reccomend lol | P: Profiler"
     energy_text = f"Total Energy: {total_energy:.2f} | KE: {kinetic_energy:.2f} | PE: {potential_energy:.2f}"
 
     draw_text(screen, instructions, (10, height - 90), font)
     draw_text(screen, energy_text, (10, height - 60), font)
+    profiler.mark('text')
 
-    time_step += 1
+    time_step += steps
 
+    profiler.draw(screen)
     pygame.display.flip()
+    profiler.mark('flip')
 
 pygame.quit()
+record.close()
+print(profiler.summary())
+time_steps, low, high, mean = energy.history()
+kinetic_energies, potential_energies, total_energies = mean.T
 
 plt.figure(figsize=(10, 6))
 plt.plot(time_steps, total_energies, label="Total Energy", color='red')
+plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
 plt.plot(time_steps, kinetic_energies, label="Kinetic Energy", color='green')
 plt.plot(time_steps, potential_energies, label="Potential Energy", color='blue')
 plt.title("Symplectic Euler: Double Pendulum Energy Over Time")
@@ -200,6 +135,7 @@ plt.show()
 
 plt.figure(figsize=(10, 6))
 plt.plot(time_steps, total_energies, label="Total Energy", color='red')
+plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
 plt.title("Symplectic Euler: Double Pendulum Energy Over Time")
 plt.xlabel("Time Step")
 plt.ylabel("Energy")
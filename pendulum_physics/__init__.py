@@ -0,0 +1,28 @@
+"""
+Headless pendulum physics, just the models and integrators.
+
+Nothing in here imports pygame or matplotlib (the profiler's overlay and
+render.py pull in pygame once a script actually draws), and scipy only gets imported
+if you ask for the old fsolve solver, so importing this never opens a
+window and is safe on machines without a display. The pygame scripts in
+simple_pendulums/ and double_pendulums/ are front-ends on top of it.
+
+models.py has the equations of motion, integrators.py the step functions
+(pick one by name, e.g. DoublePendulum(..., integrator='rk4')).
+"""
+
+from .double_pendulum import DoublePendulum
+from .integrators import INTEGRATORS, get_integrator, register
+from .models import G, DoublePendulumModel, PendulumModel
+from .pendulum import Pendulum
+
+__all__ = ['DoublePendulum', 'DoublePendulumEnsemble', 'DoublePendulumModel', 'G', 'INTEGRATORS', 'Pendulum',
+           'PendulumModel', 'get_integrator', 'register']
+
+
+def __getattr__(name):
+    # the ensemble needs numpy, so only pay for that import when someone asks for it
+    if name == 'DoublePendulumEnsemble':
+        from .ensemble import DoublePendulumEnsemble
+        return DoublePendulumEnsemble
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,101 @@
+"""
+The double pendulum as one object: a DoublePendulumModel plus its state and
+whichever integrator from the registry you picked (GLRK4 by default). No
+drawing, double_pendulums/double_pendulum_glrk4.py subclasses it for that.
+"""
+
+import math
+
+from .integrators import advance, get_integrator
+from .models import DoublePendulumModel, state_property
+
+delta_t = 0.03
+
+
+class DoublePendulum(DoublePendulumModel):
+    def __init__(self, origin, l1, l2, m1, m2, theta1, theta2, delta_t=delta_t, vel1=0, vel2=0, integrator='glrk4', tol=1e-12, max_iter=50, jit=False):
+        super().__init__(l1, l2, m1, m2)
+        self.origin = origin
+        self.y = [theta1, theta2, vel1, vel2]
+        # the accel at the current state, leapfrog/verlet/euler kick with it on the first step
+        self.acc = list(self.accelerations(self.y[:2], self.y[2:]))
+        self.drag1 = False # if were dragging the first bob
+        self.drag2 = False # if were dragging the second bob
+        self.delta_t=delta_t
+        self.integrator = integrator
+        self.step = get_integrator(integrator, jit=jit) # jit needs numba, falls back without it
+        # solver settings for the implicit integrators, they also keep their warm start in here
+        self.work = {'tol': tol, 'max_iter': max_iter}
+
+    theta1 = state_property('y', 0)
+    theta2 = state_property('y', 1)
+    vel1 = state_property('y', 2)
+    vel2 = state_property('y', 3)
+    acc1 = state_property('acc', 0)
+    acc2 = state_property('acc', 1)
+
+    @property
+    def p1(self):
+        """canonical momentum of the first arm (dL/dvel1)"""
+        return self.momenta(self.y[:2], self.y[2:])[0]
+
+    @property
+    def p2(self):
+        """canonical momentum of the second arm (dL/dvel2)"""
+        return self.momenta(self.y[:2], self.y[2:])[1]
+
+    @property
+    def iterations(self):
+        """solver iterations used on the last step (implicit integrators only)"""
+        return self.work.get('iterations', 0)
+
+    def advance(self, n_steps, record_every=1, out=None):
+        """
+        Take n_steps steps without going through update(), recording the state
+        (theta1, theta2, vel1, vel2) before every record_every-th step. Returns a (n_records, 4) array
+        (or the filled part of out), see integrators.advance.
+        """
+        return advance(self.step, self, self.y, self.acc, self.delta_t, self.work, n_steps, record_every, out)
+
+    def get_pos(self):
+        #where pendulum hangs + length (our y) + sin/cos of our angle (our x)
+        x1 = self.origin[0] + self.l1 * math.sin(self.theta1)
+        y1 = self.origin[1] + self.l1 * math.cos(self.theta1)
+        x2 = x1 + self.l2 * math.sin(self.theta2)
+        y2 = y1 + self.l2 * math.cos(self.theta2)
+        return (x1,y1), (x2,y2)
+
+    def update(self):
+        if not self.drag1 and not self.drag2:
+            self.step(self, self.y, self.acc, self.delta_t, self.work)
+        else:
+            self.work.pop('stage_acc', None) # state got moved by hand, old stages are no good as a guess
+            self.acc[:] = self.accelerations(self.y[:2], self.y[2:])
+
+    def kinetic(self):
+        return self.kinetic_energy(self.y)
+
+    def potential(self):
+        """Potential energy with the equilibrium position (when da bob is down) at zero."""
+        return self.potential_energy(self.y)
+
+    def total_energy(self):
+        """Calculate total energy of the system."""
+        return self.kinetic() + self.potential()
+
+    def handle_mouse_drag(self, mouse_pos):
+        """Adjust the angles of the pendulum based on the mouse position."""
+        if self.drag1:
+            dx = mouse_pos[0] - self.origin[0]
+            dy = mouse_pos[1] - self.origin[1]
+            self.theta1 = math.atan2(dx, dy)
+        elif self.drag2:
+            (x1, y1), _ = self.get_pos()
+            dx = mouse_pos[0] - x1
+            dy = mouse_pos[1] - y1
+            self.theta2 = math.atan2(dx, dy)
+
+    def release(self):
+        """Handle the release of the pendulum bobs."""
+        self.drag1 = False
+        self.drag2 = False
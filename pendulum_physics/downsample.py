@@ -0,0 +1,60 @@
+"""
+Cutting long recorded series down to what a figure can actually show.
+
+minmax() keeps the lowest and the highest point of every bucket, so the
+envelope and every spike survive, for values over time. lttb() is
+Largest-Triangle-Three-Buckets: one point per bucket, the one that makes
+the biggest triangle with the point kept before it and the mean of the next
+bucket. Its buckets go by index, so it works for curves where x goes back
+and forth too, like phase portraits.
+
+Neither copies the whole input, memmapped columns from
+store.TrajectoryReader stay on disk except for what gets looked at.
+"""
+
+import numpy as np
+
+SCREEN_POINTS = 2000 # about the width of a figure in pixels, plotting more than that draws over itself
+
+
+def minmax(x, y, n_buckets=SCREEN_POINTS // 2):
+    """x and y with only the min and max of y in each of n_buckets buckets, in order. Short input comes back as it is."""
+    x, y = np.asarray(x), np.asarray(y) # no copy for arrays and memmaps
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return x, y
+    size = n // n_buckets
+    body = y[:size * n_buckets].reshape(n_buckets, size) # a view, even for a strided column
+    start = np.arange(n_buckets) * size
+    low, high = start + body.argmin(axis=1), start + body.argmax(axis=1)
+    keep = [low, high, [0, n - 1]] # the ends too, so the x range stays the same
+    if size * n_buckets < n:
+        # the leftover end is one more (shorter) bucket
+        tail = y[size * n_buckets:]
+        keep.append(size * n_buckets + np.array((tail.argmin(), tail.argmax())))
+    # sorted, and once only where min and max are the same point
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, n_out=SCREEN_POINTS):
+    """n_out points of the curve (x, y) picked with LTTB, first and last always kept. Short input comes back as it is."""
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return x, y
+    # n_out - 2 buckets between the first and the last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    ax, ay = x[0], y[0]
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = np.mean(x[hi:next_hi]), np.mean(y[hi:next_hi])
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+        j = lo + int(area.argmax())
+        keep[i + 1] = j
+        ax, ay = x[j], y[j]
+    return x[keep], y[keep]
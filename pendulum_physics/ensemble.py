@@ -0,0 +1,96 @@
+"""
+N double pendulums stepped together as (N,) numpy arrays.
+
+Same physics as DoublePendulum, but instead of N objects and N calls to
+update() we keep theta1/theta2/vel1/vel2/l1/l2/m1/m2 as arrays and run one
+batched kernel per step. The integrators are the same registry step
+functions the single pendulum uses, they just see a preallocated (4, N)
+state array instead of a list of floats.
+"""
+
+import numpy as np
+
+from .integrators import advance, get_integrator
+from .models import DoublePendulumModel, compute_accelerations, state_property
+
+delta_t = 0.03
+
+
+def batched_accelerations(theta1, theta2, omega1, omega2, l1, l2, m1, m2):
+    """Batched compute_accelerations, every argument can be an (N,) array."""
+    return compute_accelerations(theta1, theta2, omega1, omega2, l1, l2, m1, m2, xp=np)
+
+
+class DoublePendulumEnsemble(DoublePendulumModel):
+    def __init__(self, origin, l1, l2, m1, m2, theta1, theta2, vel1=0, vel2=0,
+                 delta_t=delta_t, integrator='glrk4', tol=1e-10, max_iter=50, jit=False):
+        # broadcast everything to (N,) so scalars and arrays can be mixed freely
+        params = (l1, l2, m1, m2, theta1, theta2, vel1, vel2)
+        arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float)) for a in params))
+        super().__init__(*(np.array(a) for a in arrays[:4]), xp=np)
+
+        self.origin = origin
+        self.y = np.array(arrays[4:]) # (4, N): theta1, theta2, vel1, vel2
+        self.acc = np.array(self.accelerations(self.y[:2], self.y[2:])) # (2, N), at the starting state
+        self.delta_t = delta_t
+        self.integrator = integrator
+        self.step = get_integrator(integrator, jit=jit) # jit needs numba, falls back without it
+        # solver settings for the implicit integrators, they also keep their warm start in here
+        self.work = {'tol': tol, 'max_iter': max_iter}
+
+    theta1 = state_property('y', 0)
+    theta2 = state_property('y', 1)
+    vel1 = state_property('y', 2)
+    vel2 = state_property('y', 3)
+    acc1 = state_property('acc', 0)
+    acc2 = state_property('acc', 1)
+
+    def __len__(self):
+        return self.y.shape[1]
+
+    @property
+    def iterations(self):
+        """solver iterations used on the last step (implicit integrators only)"""
+        return self.work.get('iterations', 0)
+
+    def update(self):
+        self.step(self, self.y, self.acc, self.delta_t, self.work)
+
+    def advance(self, n_steps, record_every=1, out=None):
+        """
+        Take n_steps steps without going through update(), recording the state
+        (theta1, theta2, vel1, vel2) before every record_every-th step. Returns a (n_records, 4, N) array
+        (or the filled part of out), see integrators.advance.
+        """
+        return advance(self.step, self, self.y, self.acc, self.delta_t, self.work, n_steps, record_every, out)
+
+    def get_pos(self):
+        """Bob positions as arrays, same layout as DoublePendulum.get_pos."""
+        x1 = self.origin[0] + self.l1 * np.sin(self.theta1)
+        y1 = self.origin[1] + self.l1 * np.cos(self.theta1)
+        x2 = x1 + self.l2 * np.sin(self.theta2)
+        y2 = y1 + self.l2 * np.cos(self.theta2)
+        return (x1, y1), (x2, y2)
+
+    def positions(self, out=None):
+        """Bob positions as one (N, 2, 2) array, [:, 0] is the first bob and [:, 1] the second, each (x, y)."""
+        if out is None:
+            out = np.empty((len(self), 2, 2))
+        sin, cos = np.sin(self.y[:2]), np.cos(self.y[:2])
+        np.multiply(self.l1, sin[0], out=out[:, 0, 0])
+        np.multiply(self.l1, cos[0], out=out[:, 0, 1])
+        out[:, 0] += self.origin
+        np.multiply(self.l2, sin[1], out=out[:, 1, 0])
+        np.multiply(self.l2, cos[1], out=out[:, 1, 1])
+        out[:, 1] += out[:, 0]
+        return out
+
+    def kinetic(self):
+        return self.kinetic_energy(self.y)
+
+    def potential(self):
+        """Potential energy with the hanging (equilibrium) position at zero."""
+        return self.potential_energy(self.y)
+
+    def total_energy(self):
+        return self.kinetic() + self.potential()
@@ -0,0 +1,99 @@
+"""
+Time until the second arm flips over (|theta2| passes pi), for a whole
+(theta1, theta2) image of pendulums released from rest.
+
+Every tile of pixels is one DoublePendulumEnsemble. It runs through
+advance() a chunk of steps at a time (so with jit=True a chunk is one
+compiled call), the recorded theta2 rows tell us at which step each lane
+flipped, and the flipped lanes get dropped from the ensemble before the
+next chunk, so finished pixels cost nothing anymore. Pixels that don't
+have the energy to ever lift the second bob over the top are never
+integrated at all.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .ensemble import DoublePendulumEnsemble
+from .models import DoublePendulumModel
+
+
+def flip_time_map(theta1_axis, theta2_axis, l1=200, l2=200, m1=15, m2=15, t_max=100.0, delta_t=0.01,
+                  integrator='rk4', jit=False, tile=1024, check_every=50, workers=None):
+    """
+    (len(theta1_axis), len(theta2_axis)) array of flip times in seconds, inf
+    where the arm didn't flip within t_max. Pixels are cut into tiles of
+    `tile` lanes that run on a process pool (workers=1 runs them here).
+    """
+    theta1, theta2 = (a.ravel() for a in np.meshgrid(np.asarray(theta1_axis, dtype=float),
+                                                       np.asarray(theta2_axis, dtype=float), indexing='ij'))
+    settings = {'l1': l1, 'l2': l2, 'm1': m1, 'm2': m2, 't_max': t_max, 'delta_t': delta_t,
+                'integrator': integrator, 'jit': jit, 'check_every': check_every}
+    bounds = list(range(0, theta1.size, tile)) + [theta1.size]
+    tiles = [(theta1[lo:hi], theta2[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [flip_times(a, b, **settings) for a, b in tiles]
+    else:
+        # numba's own threads stay at one per worker, the pool is the parallelism
+        initializer = None
+        if jit:
+            from .jit import one_thread as initializer
+        with ProcessPoolExecutor(max_workers=min(workers, len(tiles)), initializer=initializer) as pool:
+            futures = [pool.submit(flip_times, a, b, **settings) for a, b in tiles]
+            results = [future.result() for future in futures]
+    return np.concatenate(results).reshape(len(theta1_axis), len(theta2_axis))
+
+
+def flip_times(theta1, theta2, l1=200, l2=200, m1=15, m2=15, t_max=100.0, delta_t=0.01,
+               integrator='rk4', jit=False, check_every=50):
+    """Flip time of every (theta1[i], theta2[i]) starting from rest, an (N,) array with inf for no flip."""
+    theta1, theta2 = np.broadcast_arrays(np.atleast_1d(np.asarray(theta1, dtype=float)),
+                                         np.atleast_1d(np.asarray(theta2, dtype=float)))
+    times = np.full(theta1.shape, np.inf)
+
+    # from rest the energy is all potential, and the lowest it takes to get the
+    # second bob over the top is with the first arm hanging down
+    model = DoublePendulumModel(l1, l2, m1, m2, xp=np)
+    can_flip = model.potential_energy((theta1, theta2)) >= model.potential_energy((0.0, np.pi))
+    lanes = np.flatnonzero(can_flip)
+    if lanes.size == 0:
+        return times
+
+    ensemble = DoublePendulumEnsemble((0, 0), l1, l2, m1, m2, theta1[lanes], theta2[lanes],
+                                      delta_t=delta_t, integrator=integrator, jit=jit)
+    settings = dict(ensemble.work)
+    total_steps = round(t_max / delta_t)
+    out = np.empty((check_every, 4, lanes.size))
+    done = 0
+    while done < total_steps and lanes.size:
+        n = min(check_every, total_steps - done)
+        # records are the state before each step, so record i is the state after done + i steps
+        theta2_rows = ensemble.advance(n, out=out)[:, 1]
+        flipped = np.abs(theta2_rows) > np.pi
+        hit = flipped.any(axis=0)
+        times[lanes[hit]] = (done + flipped[:, hit].argmax(axis=0)) * delta_t
+        done += n
+
+        if hit.any():
+            keep = ~hit
+            lanes = lanes[keep]
+            _keep_lanes(ensemble, keep, settings)
+            out = np.empty((check_every, 4, lanes.size))
+    # the last state never got recorded
+    if lanes.size:
+        late = np.abs(ensemble.theta2) > np.pi
+        times[lanes[late]] = total_steps * delta_t
+    return times
+
+
+def _keep_lanes(ensemble, keep, settings):
+    ensemble.y = ensemble.y[:, keep]
+    ensemble.acc = ensemble.acc[:, keep]
+    ensemble.l1, ensemble.l2 = ensemble.l1[keep], ensemble.l2[keep]
+    ensemble.m1, ensemble.m2 = ensemble.m1[keep], ensemble.m2[keep]
+    # warm starts and internal states were for the old lanes, the integrators rebuild them
+    ensemble.work = dict(settings)
@@ -0,0 +1,651 @@
+"""
+Integrator registry.
+
+Every integrator is a stateless step function
+
+    step(model, y, acc, h, work)
+
+that advances the state y (and the carried acceleration acc) of a model from
+models.py by h in place. The step functions only index, read and assign y[i],
+so y can be a list of floats for one pendulum or a preallocated (2n, N) array
+for an ensemble, and any integrator drives any model. work is a dict the
+caller owns, the implicit methods keep their solver settings (tol, max_iter),
+warm start and iteration count in it.
+
+Pick one by name with get_integrator('rk4'), add one with @register('name').
+advance() runs many steps of one and records a trajectory into an array.
+"""
+
+import math
+
+INTEGRATORS = {}
+
+
+def register(name):
+    def decorator(step):
+        INTEGRATORS[name] = step
+        return step
+    return decorator
+
+
+def get_integrator(name, jit=False):
+    """The step function registered as `name`, the numba compiled one (see jit.py) if jit=True."""
+    try:
+        step = INTEGRATORS[name]
+    except KeyError:
+        raise ValueError(f"unknown integrator {name!r}, pick one of {sorted(INTEGRATORS)}") from None
+    if jit:
+        from .jit import compiled
+        return compiled(name, step)
+    return step
+
+
+def advance(step, model, y, acc, h, work, n_steps, record_every=1, out=None):
+    """
+    Run n_steps of step() in one go, recording y before every record_every-th
+    step into a float64 buffer of shape (n_records,) + shape of y, where
+    n_records = ceil(n_steps / record_every). Pass out to reuse a buffer (it
+    only has to be at least that long), returns the filled part of it.
+    """
+    import numpy as np # only the bulk path needs numpy
+
+    if record_every < 1:
+        raise ValueError(f"record_every has to be at least 1, got {record_every}")
+    n_records = -(-n_steps // record_every)
+    if out is None:
+        out = np.empty((n_records,) + np.shape(y))
+    elif len(out) < n_records:
+        raise ValueError(f"out has room for {len(out)} records, need {n_records}")
+
+    # compiled steps can run the whole loop themselves
+    compiled_advance = getattr(step, 'advance', None)
+    if compiled_advance is not None and compiled_advance(model, y, acc, h, n_steps, record_every, out):
+        return out[:n_records]
+
+    full, tail = divmod(n_steps, record_every) # whole record_every runs, then what's left for the last record
+    if not isinstance(y, list):
+        # ensembles, one step is a batched kernel and one row copy per record is noise
+        for record in range(full):
+            out[record] = y
+            for _ in range(record_every):
+                step(model, y, acc, h, work)
+        if tail:
+            out[full] = y
+            for _ in range(tail):
+                step(model, y, acc, h, work)
+        return out[:n_records]
+
+    # one pendulum: assigning a list into a numpy row costs about as much as a cheap step,
+    # so the records go into a flat list (one extend per record) and get copied over once at the end
+    rows = []
+    keep = rows.extend
+    steps = range(record_every)
+    for _ in range(full):
+        keep(y)
+        for _ in steps:
+            step(model, y, acc, h, work)
+    if tail:
+        keep(y)
+        for _ in range(tail):
+            step(model, y, acc, h, work)
+    out[:n_records] = np.array(rows).reshape((n_records,) + np.shape(y))
+    return out[:n_records]
+
+
+@register('euler')
+def euler_step(model, y, acc, h, work):
+    # TRUE STANDARD EULER, UPDATE ANGLES THEN VELOCITIES (with the old accel) THEN ACCEL
+    n = model.n_dof
+    for i in range(n):
+        y[i] = y[i] + h * y[n + i]
+        y[n + i] = y[n + i] + h * acc[i]
+    acc[:] = model.accelerations(y[:n], y[n:])
+
+
+@register('symplectic_euler')
+def symplectic_euler_step(model, y, acc, h, work):
+    # standard euler but we flip the order, accel -> vel -> angle
+    n = model.n_dof
+    acc[:] = model.accelerations(y[:n], y[n:])
+    for i in range(n):
+        y[n + i] = y[n + i] + h * acc[i]
+        y[i] = y[i] + h * y[n + i]
+
+
+@register('leapfrog')
+def leapfrog_step(model, y, acc, h, work):
+    # kick with the old accel, drift, new accel, kick again
+    n = model.n_dof
+    for i in range(n):
+        y[n + i] = y[n + i] + 0.5 * h * acc[i]
+        y[i] = y[i] + h * y[n + i]
+    acc[:] = model.accelerations(y[:n], y[n:])
+    for i in range(n):
+        y[n + i] = y[n + i] + 0.5 * h * acc[i]
+
+
+@register('velocity_verlet')
+def velocity_verlet_step(model, y, acc, h, work):
+    # angle_new = angle_old + velocity_old * h + 0.5 * accel_old * h^2,
+    # then the new accel is taken at the half step velocity
+    n = model.n_dof
+    vel_half = []
+    for i in range(n):
+        y[i] = y[i] + y[n + i] * h + 0.5 * acc[i] * h ** 2
+        vel_half.append(y[n + i] + 0.5 * acc[i] * h)
+    acc[:] = model.accelerations(y[:n], vel_half)
+    for i in range(n):
+        y[n + i] = vel_half[i] + 0.5 * acc[i] * h
+
+
+# yoshida's symmetric compositions of leapfrog: weights w_i (summing to 1) for
+# the substeps w_i * h. 4th order is the triple jump (suzuki's construction),
+# 6th and 8th are yoshida's 1990 solutions A and D
+CBRT2 = 2 ** (1 / 3)
+YOSHIDA4 = (1 / (2 - CBRT2), -CBRT2 / (2 - CBRT2), 1 / (2 - CBRT2))
+
+
+def _symmetric(weights):
+    # w_k ... w_1, w_0, w_1 ... w_k with w_0 making it sum to 1
+    return tuple(reversed(weights)) + (1 - 2 * sum(weights),) + tuple(weights)
+
+
+YOSHIDA6 = _symmetric((-1.17767998417887, 0.235573213359357, 0.784513610477560))
+YOSHIDA8 = _symmetric((0.102799849391985, -1.96061023297549, 1.93813913762276, -0.158240635368243,
+                       -1.44485223686048, 0.253693336566229, 0.914844246229740))
+
+
+def composition(weights, base=None, reads_acc=True):
+    """
+    Step function doing one base step (leapfrog by default) per weight. The
+    base has to be symmetric for the weights to give their order. For a
+    separable hamiltonian (the simple pendulum) yoshida on leapfrog is
+    symplectic; the double pendulum's accel depends on the velocities, so
+    there you want implicit midpoint as the base for that. reads_acc=False
+    is for bases that work from y alone (the implicit ones), they don't need
+    a fresh accel up front.
+    """
+    base = base or leapfrog_step
+
+    if not reads_acc:
+        def composition_step(model, y, acc, h, work):
+            for weight in weights:
+                base(model, y, acc, weight * h, work)
+        return composition_step
+
+    def composition_step(model, y, acc, h, work):
+        m = 2 * model.n_dof
+        # unlike plain leapfrog we can't live with a stale (or the initial zero)
+        # accel for the first kick, it would cost the method its order
+        kicked_from = work.get('kicked_from')
+        if kicked_from is None or not _same_state(kicked_from, [y[i] for i in range(m)], model.xp):
+            acc[:] = model.accelerations(y[:m // 2], y[m // 2:])
+        for weight in weights:
+            base(model, y, acc, weight * h, work)
+        work['kicked_from'] = [1.0 * y[i] for i in range(m)]
+    return composition_step
+
+
+register('yoshida4')(composition(YOSHIDA4))
+register('yoshida6')(composition(YOSHIDA6))
+register('yoshida8')(composition(YOSHIDA8))
+
+
+@register('rk4')
+def rk4_step(model, y, acc, h, work):
+    n = model.n_dof
+    theta = [y[i] for i in range(n)]
+    omega = [y[n + i] for i in range(n)]
+
+    k1_theta = omega
+    k1_omega = model.accelerations(theta, omega)
+
+    k2_theta = [omega[i] + 0.5 * h * k1_omega[i] for i in range(n)]
+    k2_omega = model.accelerations([theta[i] + 0.5 * h * k1_theta[i] for i in range(n)], k2_theta)
+
+    k3_theta = [omega[i] + 0.5 * h * k2_omega[i] for i in range(n)]
+    k3_omega = model.accelerations([theta[i] + 0.5 * h * k2_theta[i] for i in range(n)], k3_theta)
+
+    k4_theta = [omega[i] + h * k3_omega[i] for i in range(n)]
+    k4_omega = model.accelerations([theta[i] + h * k3_theta[i] for i in range(n)], k4_theta)
+
+    new_theta = [theta[i] + (h / 6) * (k1_theta[i] + 2 * k2_theta[i] + 2 * k3_theta[i] + k4_theta[i]) for i in range(n)]
+    new_omega = [omega[i] + (h / 6) * (k1_omega[i] + 2 * k2_omega[i] + 2 * k3_omega[i] + k4_omega[i]) for i in range(n)]
+    for i in range(n):
+        y[i] = new_theta[i]
+        y[n + i] = new_omega[i]
+    acc[:] = model.accelerations(new_theta, new_omega)
+
+
+# dormand-prince 5(4) tableau, error weights (5th minus 4th order) and the
+# coefficients of its 4th order continuous extension (hairer's dopri5)
+DP_A = ((),
+        (1/5,),
+        (3/40, 9/40),
+        (44/45, -56/15, 32/9),
+        (19372/6561, -25360/2187, 64448/6561, -212/729),
+        (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+        (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84))
+DP_E = (71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+DP_D = (-12715105075/11282082432, 0, 87487479700/32700410799, -10690763975/1880347072,
+        701980252875/199316789632, -1453857185/822651844, 69997945/29380423)
+
+
+@register('dopri5')
+def dopri5_step(model, y, acc, h, work):
+    """
+    Adaptive Dormand-Prince 5(4) with error control and dense output.
+
+    The internal steps don't have to line up with h: the integration runs
+    ahead on its own step sizes (big in quiet swings, small near flips) and
+    y is read off the 4th order interpolant of the step that covers time h.
+    Settings come from work['rtol'] / work['atol'], the counters
+    work['accepted'], work['rejected'] and work['nfev'] (right hand side
+    evaluations) add up over the run. work['dense'] keeps the steps that
+    cover this call, dense_output(work, t) evaluates them for 0 <= t <= h.
+    """
+    n = model.n_dof
+    m = 2 * n
+    xp = model.xp
+    rtol = work.get('rtol', 1e-8)
+    atol = work.get('atol', 1e-8)
+    accelerations = model.accelerations
+
+    def derivatives(state):
+        return state[n:] + list(accelerations(state[:n], state[n:]))
+
+    current = [1.0 * y[i] for i in range(m)] # copies, y rows are views for an ensemble
+    internal = work.get('internal')
+    if internal is None or not _same_state(work['shown'], current, xp):
+        # first call, or someone moved the pendulum: restart from y
+        internal = {'y': current, 'k': derivatives(current), 'ahead': 0.0, 'last': None}
+        work['nfev'] = work.get('nfev', 0) + 1
+        work['internal'] = internal
+    work.setdefault('accepted', 0)
+    work.setdefault('rejected', 0)
+
+    dense = [internal['last']] if internal['last'] is not None and internal['ahead'] > 0 else []
+    h_sub = work.get('h_sub', h)
+    y0, k1 = internal['y'], internal['k']
+    while internal['ahead'] < h:
+        k = [k1]
+        for stage in range(1, 7):
+            row = DP_A[stage]
+            state = [y0[i] + h_sub * sum(a * kj[i] for a, kj in zip(row, k) if a) for i in range(m)]
+            k.append(derivatives(state))
+        work['nfev'] += 6
+        y1 = state # the last stage is at the 5th order solution (FSAL)
+
+        error = 0.0
+        for i in range(m):
+            scale = atol + rtol * _maximum(abs(y0[i]), abs(y1[i]), xp)
+            e_i = h_sub * sum(e * kj[i] for e, kj in zip(DP_E, k) if e) / scale
+            error = error + e_i * e_i
+        error = max_abs([xp.sqrt(error / m)], xp)
+
+        if error <= 1.0:
+            rcont = _dopri5_dense(y0, y1, k, h_sub)
+            internal['last'] = (internal['ahead'], h_sub, rcont)
+            dense.append(internal['last'])
+            internal['ahead'] += h_sub
+            y0, k1 = y1, k[6]
+            work['accepted'] += 1
+            h_sub *= min(5.0, max(0.2, 0.9 * error ** -0.2)) if error > 0 else 5.0
+        else:
+            work['rejected'] += 1
+            h_sub *= max(0.2, 0.9 * error ** -0.2)
+    work['h_sub'] = h_sub
+    internal['y'], internal['k'] = y0, k1
+
+    # shift everything so the visible state is time 0 again
+    work['dense'] = dense
+    internal['ahead'] -= h
+    start, step, rcont = internal['last']
+    internal['last'] = (start - h, step, rcont)
+
+    shown, slope = _dense_eval(rcont, (h - start) / step)
+    for i in range(m):
+        y[i] = shown[i]
+    acc[:] = [s / step for s in slope[n:]]
+    work['shown'] = [1.0 * y[i] for i in range(m)]
+
+
+def dense_output(work, t):
+    """State at time t (0 <= t <= h) inside the last dopri5 call, from the interpolant."""
+    for start, step, rcont in work['dense']:
+        if t <= start + step:
+            return _dense_eval(rcont, (t - start) / step)[0]
+    start, step, rcont = work['dense'][-1]
+    return _dense_eval(rcont, (t - start) / step)[0]
+
+
+def _dopri5_dense(y0, y1, k, h):
+    # y(t0 + theta h) = r1 + theta (r2 + (1 - theta) (r3 + theta (r4 + (1 - theta) r5)))
+    rcont = []
+    for i in range(len(y0)):
+        r2 = y1[i] - y0[i]
+        r3 = h * k[0][i] - r2
+        r4 = r2 - h * k[6][i] - r3
+        r5 = h * sum(d * kj[i] for d, kj in zip(DP_D, k) if d)
+        rcont.append((y0[i], r2, r3, r4, r5))
+    return rcont
+
+
+def _dense_eval(rcont, theta):
+    # the interpolant and its theta derivative (divide by the step for d/dt)
+    values, slopes = [], []
+    u, v = theta, 1 - theta
+    for r1, r2, r3, r4, r5 in rcont:
+        P = r4 + v * r5
+        Q = r3 + u * P
+        R = r2 + v * Q
+        values.append(r1 + u * R)
+        slopes.append(R + u * (-Q + v * (P - u * r5)))
+    return values, slopes
+
+
+def _maximum(a, b, xp):
+    return max(a, b) if xp is math else xp.maximum(a, b)
+
+
+def _same_state(a, b, xp):
+    if xp is math:
+        return a == b
+    return all(xp.array_equal(p, q) for p, q in zip(a, b))
+
+
+# gauss-legendre 2 stage butcher tableau
+c1 = 0.5 - math.sqrt(3)/6
+c2 = 0.5 + math.sqrt(3)/6
+a11 = 0.25
+a12 = 0.25 - math.sqrt(3)/6
+a21 = 0.25 + math.sqrt(3)/6
+a22 = 0.25
+b1 = 0.5
+b2 = 0.5
+A = ((a11, a12), (a21, a22))
+A2 = tuple(tuple(sum(A[i][m] * A[m][k] for m in range(2)) for k in range(2)) for i in range(2)) # A @ A
+E1 = 1 / (c2 - c1) # extrapolation weights for the newton starting guess, (1 + c - c1) / (c2 - c1)
+E2 = 1 + E1
+
+
+@register('glrk4')
+def glrk4_step(model, y, acc, h, work):
+    """
+    GLRK4 step with a dedicated simplified newton solver.
+
+    The theta rows of the stage equations are linear, so we only solve for
+    the stage accelerations (every acc at both stages) and rebuild the stage
+    angles/velocities from them. The closed form jacobian is taken at y_n and
+    the iteration matrix inverted once per step, and the starting guess is
+    the previous step's stages extrapolated along their collocation line.
+    Settings come from work['tol'] and work['max_iter'], the iteration count
+    goes to work['iterations'].
+
+    This is the hot path, so it's unrolled by hand for our two models (loops
+    over n_dof cost about 2x in plain python).
+    """
+    if model.n_dof == 1:
+        _glrk4_1dof(model, y, acc, h, work)
+    elif model.n_dof == 2:
+        _glrk4_2dof(model, y, acc, h, work)
+    else:
+        raise ValueError(f"glrk4 handles 1 or 2 degrees of freedom, not {model.n_dof}")
+
+
+def _predict_stages(work, cold):
+    previous = work.get('stage_acc')
+    if previous is None:
+        return cold + cold
+    # stage accs of the last step sit at c1, c2 of the last interval,
+    # the line through them predicts this step's stages at 1 + c1, 1 + c2
+    n = len(cold)
+    return [p + E1 * (q - p) for p, q in zip(previous[:n], previous[n:])] + \
+        [p + E2 * (q - p) for p, q in zip(previous[:n], previous[n:])]
+
+
+def _glrk4_1dof(model, y, acc, h, work):
+    theta_n, omega_n = y[0], y[1]
+    (acc_n,), ((d_theta, d_omega),) = model.acceleration_jacobian([theta_n], [omega_n])
+    k1, k2 = _predict_stages(work, [acc_n])
+
+    # iteration matrix I - d(acc at stages)/d(stage accs), where
+    # d(stage angle)/d(stage acc) = h^2 (A^2) and d(stage vel)/d(stage acc) = h A
+    (j11, j12), (j21, j22) = [[-(d_theta * h * h * A2[j][k] + d_omega * h * A[j][k]) for k in range(2)] for j in range(2)]
+    i11, i12, i21, i22 = _inv2(1 + j11, j12, j21, 1 + j22)
+
+    ha11, ha12, ha21, ha22 = h * a11, h * a12, h * a21, h * a22
+    tol = work.get('tol', 1e-12)
+    max_iter = work.get('max_iter', 20)
+    xp = model.xp
+    accelerations = model.accelerations
+    for iteration in range(1, max_iter + 1):
+        # stage velocities then stage angles, from the stage accelerations
+        w1 = omega_n + ha11 * k1 + ha12 * k2
+        w2 = omega_n + ha21 * k1 + ha22 * k2
+        r1 = k1 - accelerations([theta_n + ha11 * w1 + ha12 * w2], [w1])[0]
+        r2 = k2 - accelerations([theta_n + ha21 * w1 + ha22 * w2], [w2])[0]
+        d1 = i11 * r1 + i12 * r2
+        d2 = i21 * r1 + i22 * r2
+        k1, k2 = k1 - d1, k2 - d2
+        if max_abs((d1, d2), xp) <= tol * (1 + max_abs((k1, k2), xp)):
+            break
+    else: # if we cant converge, we should always be able to tho
+        work.pop('stage_acc', None)
+        raise RuntimeError(f"GLRK4 newton did not converge in {max_iter} iterations")
+
+    work['iterations'] = iteration
+    work['stage_acc'] = [k1, k2]
+
+    w1 = omega_n + ha11 * k1 + ha12 * k2
+    w2 = omega_n + ha21 * k1 + ha22 * k2
+    y[0] = theta_n + h * (b1 * w1 + b2 * w2)
+    y[1] = omega_n + h * (b1 * k1 + b2 * k2)
+    acc[:] = accelerations([y[0]], [y[1]])
+
+
+def _glrk4_2dof(model, y, acc, h, work):
+    theta1_n, theta2_n, omega1_n, omega2_n = y[0], y[1], y[2], y[3]
+    acc_n, (dacc1, dacc2) = model.acceleration_jacobian([theta1_n, theta2_n], [omega1_n, omega2_n])
+    x0, x1, x2, x3 = _predict_stages(work, list(acc_n))
+
+    # iteration matrix I - d(acc at stages)/d(stage accs), where
+    # d(stage angle)/d(stage acc) = h^2 (A^2) and d(stage vel)/d(stage acc) = h A
+    jacobian = []
+    for j in range(2):
+        ct0, co0 = h * h * A2[j][0], h * A[j][0]
+        ct1, co1 = h * h * A2[j][1], h * A[j][1]
+        for dacc in (dacc1, dacc2):
+            jacobian.append([-(dacc[0] * ct0 + dacc[2] * co0), -(dacc[1] * ct0 + dacc[3] * co0),
+                             -(dacc[0] * ct1 + dacc[2] * co1), -(dacc[1] * ct1 + dacc[3] * co1)])
+    for i in range(4):
+        jacobian[i][i] = jacobian[i][i] + 1.0
+    row0, row1, row2, row3 = invert_small(jacobian)
+
+    ha11, ha12, ha21, ha22 = h * a11, h * a12, h * a21, h * a22
+    tol = work.get('tol', 1e-12)
+    max_iter = work.get('max_iter', 20)
+    xp = model.xp
+    accelerations = model.accelerations
+    for iteration in range(1, max_iter + 1):
+        # stage velocities then stage angles, from the stage accelerations (x0..x3)
+        w11 = omega1_n + ha11 * x0 + ha12 * x2
+        w21 = omega2_n + ha11 * x1 + ha12 * x3
+        w12 = omega1_n + ha21 * x0 + ha22 * x2
+        w22 = omega2_n + ha21 * x1 + ha22 * x3
+        t11 = theta1_n + ha11 * w11 + ha12 * w12
+        t21 = theta2_n + ha11 * w21 + ha12 * w22
+        t12 = theta1_n + ha21 * w11 + ha22 * w12
+        t22 = theta2_n + ha21 * w21 + ha22 * w22
+
+        f11, f21 = accelerations((t11, t21), (w11, w21))
+        f12, f22 = accelerations((t12, t22), (w12, w22))
+        r0, r1, r2, r3 = x0 - f11, x1 - f21, x2 - f12, x3 - f22
+
+        d0 = row0[0] * r0 + row0[1] * r1 + row0[2] * r2 + row0[3] * r3
+        d1 = row1[0] * r0 + row1[1] * r1 + row1[2] * r2 + row1[3] * r3
+        d2 = row2[0] * r0 + row2[1] * r1 + row2[2] * r2 + row2[3] * r3
+        d3 = row3[0] * r0 + row3[1] * r1 + row3[2] * r2 + row3[3] * r3
+        x0, x1, x2, x3 = x0 - d0, x1 - d1, x2 - d2, x3 - d3
+        if max_abs((d0, d1, d2, d3), xp) <= tol * (1 + max_abs((x0, x1, x2, x3), xp)):
+            break
+    else: # if we cant converge, we should always be able to tho
+        work.pop('stage_acc', None)
+        raise RuntimeError(f"GLRK4 newton did not converge in {max_iter} iterations")
+
+    work['iterations'] = iteration
+    work['stage_acc'] = [x0, x1, x2, x3]
+
+    w11 = omega1_n + ha11 * x0 + ha12 * x2
+    w21 = omega2_n + ha11 * x1 + ha12 * x3
+    w12 = omega1_n + ha21 * x0 + ha22 * x2
+    w22 = omega2_n + ha21 * x1 + ha22 * x3
+    new_theta = (theta1_n + h * (b1 * w11 + b2 * w12), theta2_n + h * (b1 * w21 + b2 * w22))
+    new_omega = (omega1_n + h * (b1 * x0 + b2 * x2), omega2_n + h * (b1 * x1 + b2 * x3))
+    y[0], y[1] = new_theta
+    y[2], y[3] = new_omega
+    acc[:] = accelerations(new_theta, new_omega)
+
+
+@register('implicit_midpoint')
+def implicit_midpoint_step(model, y, acc, h, work):
+    """
+    Implicit midpoint rule on the canonical coordinates (theta, p), which is
+    symplectic for any hamiltonian, separable or not (the double pendulum's
+    isn't, that's why leapfrog/verlet on (theta, omega) still drift). y keeps
+    (theta, omega) like everywhere else, we go to momenta and back each step.
+
+    The midpoint is found by fixed point iteration, starting from the last
+    step's midpoint slope. Settings come from work['tol'] and
+    work['max_iter'], the iteration count goes to work['iterations'].
+    """
+    n = model.n_dof
+    xp = model.xp
+    theta_n = [y[i] for i in range(n)]
+    p_n = model.momenta(theta_n, [y[n + i] for i in range(n)])
+    gradient = model.hamiltonian_gradient
+    half = 0.5 * h
+
+    # the midpoint solves z_mid = z_n + h/2 f(z_mid), f = (dH/dp, -dH/dtheta)
+    slope = work.get('midpoint_slope')
+    if slope is None:
+        dH_dtheta, dH_dp = gradient(theta_n, p_n)
+        slope = dH_dp + [-g for g in dH_dtheta]
+    theta_mid = [theta_n[i] + half * slope[i] for i in range(n)]
+    p_mid = [p_n[i] + half * slope[n + i] for i in range(n)]
+
+    tol = work.get('tol', 1e-12)
+    max_iter = work.get('max_iter', 20)
+    for iteration in range(1, max_iter + 1):
+        dH_dtheta, dH_dp = gradient(theta_mid, p_mid)
+        new_theta = [theta_n[i] + half * dH_dp[i] for i in range(n)]
+        new_p = [p_n[i] - half * dH_dtheta[i] for i in range(n)]
+        # every component against its own size, p is ~m l^2 times omega so one shared scale would let theta off easy
+        done = _converged(new_theta, theta_mid, tol, xp) and _converged(new_p, p_mid, tol, xp)
+        theta_mid, p_mid = new_theta, new_p
+        if done:
+            break
+    else: # step too big for the fixed point to contract
+        work.pop('midpoint_slope', None)
+        raise RuntimeError(f"implicit midpoint did not converge in {max_iter} iterations, try a smaller delta_t")
+
+    work['iterations'] = iteration
+    work['midpoint_slope'] = dH_dp + [-g for g in dH_dtheta]
+
+    theta = [2 * theta_mid[i] - theta_n[i] for i in range(n)]
+    omega = model.velocities(theta, [2 * p_mid[i] - p_n[i] for i in range(n)])
+    for i in range(n):
+        y[i] = theta[i]
+        y[n + i] = omega[i]
+    acc[:] = model.accelerations(theta, omega)
+
+
+# the triple jump on top of it, 4th order and still symplectic for any hamiltonian
+register('implicit_midpoint4')(composition(YOSHIDA4, implicit_midpoint_step, reads_acc=False))
+
+
+@register('glrk4_fsolve')
+def glrk4_fsolve_step(model, y, acc, h, work):
+    # the original GLRK4 (fsolve from an all zeros guess), kept around to compare against.
+    # only for single pendulums
+    import numpy as np
+    from scipy.optimize import fsolve
+
+    n = model.n_dof
+    y_n = np.array([y[i] for i in range(2 * n)], dtype=float)
+
+    def compute_derivatives(state):
+        return np.concatenate((state[n:], model.accelerations(state[:n], state[n:])))
+
+    def residuals(K):
+        K1 = K[:2 * n]
+        K2 = K[2 * n:]
+        res1 = K1 - compute_derivatives(y_n + h * (a11 * K1 + a12 * K2))
+        res2 = K2 - compute_derivatives(y_n + h * (a21 * K1 + a22 * K2))
+        return np.concatenate((res1, res2))
+
+    K_solution, info, ier, msg = fsolve(residuals, np.zeros(4 * n), full_output=True)
+
+    if ier != 1: # if we cant converge, we should always be able to tho
+        raise RuntimeError(msg)
+
+    work['iterations'] = info['nfev']
+    y_n_plus_1 = y_n + h * (b1 * K_solution[:2 * n] + b2 * K_solution[2 * n:])
+    for i in range(2 * n):
+        y[i] = float(y_n_plus_1[i])
+    acc[:] = model.accelerations([y[i] for i in range(n)], [y[n + i] for i in range(n)])
+
+
+def max_abs(values, xp=math):
+    if xp is math:
+        return max(map(abs, values))
+    return max(float(xp.max(xp.abs(v))) for v in values)
+
+
+def _converged(new, old, tol, xp=math):
+    # |new - old| <= tol * (1 + |new|) for every component (and every lane)
+    if xp is math:
+        return all(abs(a - b) <= tol * (1 + abs(a)) for a, b in zip(new, old))
+    return all(bool(xp.all(xp.abs(a - b) <= tol * (1 + xp.abs(a)))) for a, b in zip(new, old))
+
+
+def _inv2(a, b, c, d):
+    det = a * d - b * c
+    return d / det, -b / det, -c / det, a / det
+
+
+def _mul2(x, y):
+    return (x[0] * y[0] + x[1] * y[2], x[0] * y[1] + x[1] * y[3],
+            x[2] * y[0] + x[3] * y[2], x[2] * y[1] + x[3] * y[3])
+
+
+def invert_small(M):
+    """
+    Inverse of the 2x2 or 4x4 newton matrix (4x4 via 2x2 blocks and the schur
+    complement). Only uses + - * /, so the entries can be floats or (N,) arrays
+    for a whole ensemble at once, and it beats np.linalg at this size. No
+    pivoting, which is fine here since the matrix is I - O(h).
+    """
+    if len(M) == 1:
+        return [[1 / M[0][0]]]
+    if len(M) == 2:
+        a, b, c, d = _inv2(M[0][0], M[0][1], M[1][0], M[1][1])
+        return [[a, b], [c, d]]
+    if len(M) != 4:
+        raise ValueError(f"can only invert 1x1, 2x2 and 4x4 newton matrices, got {len(M)}x{len(M)}")
+
+    P_inv = _inv2(M[0][0], M[0][1], M[1][0], M[1][1])
+    Q = (M[0][2], M[0][3], M[1][2], M[1][3])
+    R = (M[2][0], M[2][1], M[3][0], M[3][1])
+    X = _mul2(P_inv, Q)
+    RP = _mul2(R, P_inv)
+    RX = _mul2(R, X)
+    S_inv = _inv2(M[2][2] - RX[0], M[2][3] - RX[1], M[3][2] - RX[2], M[3][3] - RX[3])
+    TR = _mul2(X, S_inv)
+    BL = _mul2(S_inv, RP)
+    TL = _mul2(TR, RP)
+    TL = tuple(p + t for p, t in zip(P_inv, TL))
+    return [[TL[0], TL[1], -TR[0], -TR[1]],
+            [TL[2], TL[3], -TR[2], -TR[3]],
+            [-BL[0], -BL[1], S_inv[0], S_inv[1]],
+            [-BL[2], -BL[3], S_inv[2], S_inv[3]]]
@@ -0,0 +1,214 @@
+"""
+Optional numba backend for the double pendulum.
+
+Compiled versions of the explicit integrators (euler, symplectic_euler,
+leapfrog, velocity_verlet, rk4). get_integrator(name, jit=True) hands out a
+step function that works like the registry one: it steps a single
+DoublePendulum (list state) with one compiled call, an ensemble ((4, N)
+state) with a parallel loop over the lanes, and advance() runs the whole
+loop compiled. Without numba, or for an integrator we have no kernel for,
+you get the normal python/numpy step back with a warning.
+"""
+
+import math
+import warnings
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+available = numba is not None
+
+_compiled = {}
+
+
+def compiled(name, fallback):
+    """registry-compatible compiled step for integrator `name`, or `fallback` if we can't."""
+    if not available:
+        warnings.warn("numba isn't installed, using the plain python integrators", RuntimeWarning, stacklevel=3)
+        return fallback
+    if name not in _kernels:
+        warnings.warn(f"no compiled kernel for {name!r}, using the plain python one", RuntimeWarning, stacklevel=3)
+        return fallback
+    if name not in _compiled:
+        _compiled[name] = _make_step(name, fallback)
+    return _compiled[name]
+
+
+def one_thread():
+    """
+    Process pool initializer: the pools in sweep.py and flip.py already run a
+    worker per core, numba's parallel loops in every one of them on top of
+    that would be cores x cores threads fighting over the cores.
+    """
+    if available:
+        numba.set_num_threads(1)
+
+
+def _make_step(name, fallback):
+    kernel = _kernels[name]
+    kind = _KINDS.index(name)
+
+    def compiled_step(model, y, acc, h, work):
+        if model.n_dof != 2:
+            return fallback(model, y, acc, h, work)
+        if isinstance(y, list):
+            y[0], y[1], y[2], y[3], acc[0], acc[1] = kernel(y[0], y[1], y[2], y[3], acc[0], acc[1], h,
+                                                            float(model.l1), float(model.l2), float(model.m1), float(model.m2))
+        else:
+            _ensemble_step(kind, y, acc, h, model.l1, model.l2, model.m1, model.m2)
+
+    def advance(model, y, acc, h, n_steps, record_every, out):
+        # returns False when it can't do it, so integrators.advance runs the python loop
+        if model.n_dof != 2:
+            return False
+        if isinstance(y, list):
+            import numpy as np
+            state = np.array(y + list(acc), dtype=float)
+            _single_advance(kind, state, n_steps, record_every, out, h,
+                            float(model.l1), float(model.l2), float(model.m1), float(model.m2))
+            y[:] = state[:4].tolist()
+            acc[:] = state[4:].tolist()
+        else:
+            _ensemble_advance(kind, y, acc, n_steps, record_every, out, h, model.l1, model.l2, model.m1, model.m2)
+        return True
+
+    compiled_step.advance = advance
+    return compiled_step
+
+
+# the kernels: one scalar step of one pendulum, same update order as the
+# registry functions in integrators.py, returning the new
+# (theta1, theta2, omega1, omega2, acc1, acc2)
+
+if available:
+    G = 9.81
+
+    @numba.njit(cache=True)
+    def accelerations(theta1, theta2, omega1, omega2, l1, l2, m1, m2):
+        # same formula as models.compute_accelerations, numba can't take the xp module
+        delta_theta = theta1 - theta2
+        sin_delta = math.sin(delta_theta)
+        cos_delta = math.cos(delta_theta)
+        den = 2 * m1 + m2 - m2 * math.cos(2 * delta_theta)
+        w1_sq_l1 = omega1 * omega1 * l1
+        w2_sq_l2 = omega2 * omega2 * l2
+
+        num1 = -G * (2 * m1 + m2) * math.sin(theta1)
+        num2 = -m2 * G * math.sin(theta1 - 2 * theta2)
+        num3 = -2 * sin_delta * m2
+        num4 = w2_sq_l2 + w1_sq_l1 * cos_delta
+        acc1 = (num1 + num2 + num3 * num4) / (l1 * den)
+
+        num1 = 2 * sin_delta
+        num2 = w1_sq_l1 * (m1 + m2)
+        num3 = G * (m1 + m2) * math.cos(theta1)
+        num4 = w2_sq_l2 * m2 * cos_delta
+        acc2 = num1 * (num2 + num3 + num4) / (l2 * den)
+
+        return acc1, acc2
+
+    @numba.njit(cache=True)
+    def euler(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2):
+        t1 = t1 + h * w1
+        t2 = t2 + h * w2
+        w1 = w1 + h * a1
+        w2 = w2 + h * a2
+        a1, a2 = accelerations(t1, t2, w1, w2, l1, l2, m1, m2)
+        return t1, t2, w1, w2, a1, a2
+
+    @numba.njit(cache=True)
+    def symplectic_euler(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2):
+        a1, a2 = accelerations(t1, t2, w1, w2, l1, l2, m1, m2)
+        w1 = w1 + h * a1
+        w2 = w2 + h * a2
+        return t1 + h * w1, t2 + h * w2, w1, w2, a1, a2
+
+    @numba.njit(cache=True)
+    def leapfrog(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2):
+        w1 = w1 + 0.5 * h * a1
+        w2 = w2 + 0.5 * h * a2
+        t1 = t1 + h * w1
+        t2 = t2 + h * w2
+        a1, a2 = accelerations(t1, t2, w1, w2, l1, l2, m1, m2)
+        return t1, t2, w1 + 0.5 * h * a1, w2 + 0.5 * h * a2, a1, a2
+
+    @numba.njit(cache=True)
+    def velocity_verlet(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2):
+        t1 = t1 + w1 * h + 0.5 * a1 * h ** 2
+        t2 = t2 + w2 * h + 0.5 * a2 * h ** 2
+        half1 = w1 + 0.5 * a1 * h
+        half2 = w2 + 0.5 * a2 * h
+        a1, a2 = accelerations(t1, t2, half1, half2, l1, l2, m1, m2)
+        return t1, t2, half1 + 0.5 * a1 * h, half2 + 0.5 * a2 * h, a1, a2
+
+    @numba.njit(cache=True)
+    def rk4(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2):
+        k1_a1, k1_a2 = accelerations(t1, t2, w1, w2, l1, l2, m1, m2)
+        k2_t1 = w1 + 0.5 * h * k1_a1
+        k2_t2 = w2 + 0.5 * h * k1_a2
+        k2_a1, k2_a2 = accelerations(t1 + 0.5 * h * w1, t2 + 0.5 * h * w2, k2_t1, k2_t2, l1, l2, m1, m2)
+        k3_t1 = w1 + 0.5 * h * k2_a1
+        k3_t2 = w2 + 0.5 * h * k2_a2
+        k3_a1, k3_a2 = accelerations(t1 + 0.5 * h * k2_t1, t2 + 0.5 * h * k2_t2, k3_t1, k3_t2, l1, l2, m1, m2)
+        k4_t1 = w1 + h * k3_a1
+        k4_t2 = w2 + h * k3_a2
+        k4_a1, k4_a2 = accelerations(t1 + h * k3_t1, t2 + h * k3_t2, k4_t1, k4_t2, l1, l2, m1, m2)
+
+        t1 = t1 + (h / 6) * (w1 + 2 * k2_t1 + 2 * k3_t1 + k4_t1)
+        t2 = t2 + (h / 6) * (w2 + 2 * k2_t2 + 2 * k3_t2 + k4_t2)
+        w1 = w1 + (h / 6) * (k1_a1 + 2 * k2_a1 + 2 * k3_a1 + k4_a1)
+        w2 = w2 + (h / 6) * (k1_a2 + 2 * k2_a2 + 2 * k3_a2 + k4_a2)
+        a1, a2 = accelerations(t1, t2, w1, w2, l1, l2, m1, m2)
+        return t1, t2, w1, w2, a1, a2
+
+    _kernels = {'euler': euler, 'symplectic_euler': symplectic_euler, 'leapfrog': leapfrog,
+                'velocity_verlet': velocity_verlet, 'rk4': rk4}
+    _KINDS = tuple(_kernels) # the drivers take the kernel as its index in here
+
+    # the drivers are module level and pick the kernel by index, so cache=True
+    # works: numba can't cache a closure over a kernel, or a kernel passed in as
+    # an argument, and every pool worker would compile them all over again
+
+    @numba.njit(cache=True)
+    def _step(kind, t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2):
+        if kind == 0:
+            return euler(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2)
+        if kind == 1:
+            return symplectic_euler(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2)
+        if kind == 2:
+            return leapfrog(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2)
+        if kind == 3:
+            return velocity_verlet(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2)
+        return rk4(t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2)
+
+    @numba.njit(parallel=True, cache=True)
+    def _ensemble_step(kind, y, acc, h, l1, l2, m1, m2):
+        for j in numba.prange(y.shape[1]):
+            y[0, j], y[1, j], y[2, j], y[3, j], acc[0, j], acc[1, j] = _step(
+                kind, y[0, j], y[1, j], y[2, j], y[3, j], acc[0, j], acc[1, j], h, l1[j], l2[j], m1[j], m2[j])
+
+    @numba.njit(cache=True)
+    def _single_advance(kind, state, n_steps, record_every, out, h, l1, l2, m1, m2):
+        t1, t2, w1, w2, a1, a2 = state[0], state[1], state[2], state[3], state[4], state[5]
+        for step in range(n_steps):
+            if step % record_every == 0:
+                record = step // record_every
+                out[record, 0], out[record, 1], out[record, 2], out[record, 3] = t1, t2, w1, w2
+            t1, t2, w1, w2, a1, a2 = _step(kind, t1, t2, w1, w2, a1, a2, h, l1, l2, m1, m2)
+        state[0], state[1], state[2], state[3], state[4], state[5] = t1, t2, w1, w2, a1, a2
+
+    @numba.njit(parallel=True, cache=True)
+    def _ensemble_advance(kind, y, acc, n_steps, record_every, out, h, l1, l2, m1, m2):
+        # lane by lane, each one stays in registers for its whole run
+        for j in numba.prange(y.shape[1]):
+            t1, t2, w1, w2, a1, a2 = y[0, j], y[1, j], y[2, j], y[3, j], acc[0, j], acc[1, j]
+            for step in range(n_steps):
+                if step % record_every == 0:
+                    record = step // record_every
+                    out[record, 0, j], out[record, 1, j], out[record, 2, j], out[record, 3, j] = t1, t2, w1, w2
+                t1, t2, w1, w2, a1, a2 = _step(kind, t1, t2, w1, w2, a1, a2, h, l1[j], l2[j], m1[j], m2[j])
+            y[0, j], y[1, j], y[2, j], y[3, j], acc[0, j], acc[1, j] = t1, t2, w1, w2, a1, a2
+else:
+    _kernels = {}
@@ -0,0 +1,99 @@
+"""
+Lyapunov exponents of the double pendulum, batched over many initial
+conditions (Benettin's method).
+
+Next to every pendulum we carry k tangent vectors and step them with the
+analytic variational equations dv/dt = J(y) v (J from the closed form
+acceleration jacobian), inside the same RK4 step as the state. Every few
+steps the tangents get orthonormalized (QR over all lanes at once) and the
+log of how much each one grew is added up; that sum over the elapsed time
+converges to the exponents, largest first. k=1 is the classic largest
+exponent, k=4 the full spectrum (which for a hamiltonian system comes in
++-pairs, with two zeros, handy as a sanity check).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .models import compute_acceleration_jacobian
+
+
+def lyapunov_spectrum(theta1, theta2, vel1=0, vel2=0, l1=200, l2=200, m1=15, m2=15, t_total=200.0,
+                      delta_t=0.03, renorm_every=10, n_exponents=1, transient=0.0):
+    """
+    Exponents (1/s) for every initial condition, scalars and (N,) arrays
+    broadcast together. Returns a (n_exponents, N) array. The first
+    `transient` seconds are integrated but not counted, to get the tangents
+    lined up first.
+    """
+    values = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (theta1, theta2, vel1, vel2, l1, l2, m1, m2)))
+    y = np.array(values[:4])
+    params = tuple(values[4:])
+    lanes = y.shape[1]
+
+    tangents = np.zeros((4, n_exponents, lanes)) # (component, vector, lane)
+    for i in range(n_exponents):
+        tangents[i, i] = 1.0
+
+    transient_steps = round(transient / delta_t)
+    steps = round(t_total / delta_t)
+    growth = np.zeros((n_exponents, lanes))
+    for step in range(1, transient_steps + steps + 1):
+        y, tangents = _rk4_tangent_step(y, tangents, delta_t, params)
+        if step % renorm_every == 0 or step == transient_steps + steps:
+            tangents, log_stretch = _orthonormalize(tangents)
+            if step > transient_steps:
+                growth += log_stretch
+    return growth / (steps * delta_t)
+
+
+def lyapunov_map(theta1_axis, theta2_axis, workers=None, tile=4096, **settings):
+    """
+    Largest exponent over the (theta1, theta2) plane, a (len(theta1_axis),
+    len(theta2_axis)) array. The grid gets cut into tiles of `tile` lanes that
+    run on a process pool (workers=1 runs them here). settings go to
+    lyapunov_spectrum.
+    """
+    theta1, theta2 = (a.ravel() for a in np.meshgrid(np.asarray(theta1_axis, dtype=float),
+                                                       np.asarray(theta2_axis, dtype=float), indexing='ij'))
+    settings['n_exponents'] = 1
+    bounds = list(range(0, theta1.size, tile)) + [theta1.size]
+    tiles = [(theta1[lo:hi], theta2[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [lyapunov_spectrum(a, b, **settings) for a, b in tiles]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tiles))) as pool:
+            futures = [pool.submit(lyapunov_spectrum, a, b, **settings) for a, b in tiles]
+            results = [future.result() for future in futures]
+    return np.concatenate([r[0] for r in results]).reshape(len(theta1_axis), len(theta2_axis))
+
+
+def _derivatives(y, tangents, params):
+    acc1, acc2, dacc1, dacc2 = compute_acceleration_jacobian(y[0], y[1], y[2], y[3], *params, xp=np)
+    dy = np.array((y[2], y[3], acc1, acc2))
+    # J v for every tangent: angle rows are just the velocity rows, accel rows are the jacobian rows
+    dv = np.empty_like(tangents)
+    dv[0], dv[1] = tangents[2], tangents[3]
+    dv[2] = dacc1[0] * tangents[0] + dacc1[1] * tangents[1] + dacc1[2] * tangents[2] + dacc1[3] * tangents[3]
+    dv[3] = dacc2[0] * tangents[0] + dacc2[1] * tangents[1] + dacc2[2] * tangents[2] + dacc2[3] * tangents[3]
+    return dy, dv
+
+
+def _rk4_tangent_step(y, tangents, h, params):
+    k1, l1 = _derivatives(y, tangents, params)
+    k2, l2 = _derivatives(y + 0.5 * h * k1, tangents + 0.5 * h * l1, params)
+    k3, l3 = _derivatives(y + 0.5 * h * k2, tangents + 0.5 * h * l2, params)
+    k4, l4 = _derivatives(y + h * k3, tangents + h * l3, params)
+    return (y + (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4),
+            tangents + (h / 6) * (l1 + 2 * l2 + 2 * l3 + l4))
+
+
+def _orthonormalize(tangents):
+    # stacked QR, one (4, k) matrix per lane; |R_ii| is how much vector i grew
+    q, r = np.linalg.qr(tangents.transpose(2, 0, 1))
+    stretch = np.abs(np.diagonal(r, axis1=1, axis2=2)).T
+    return np.ascontiguousarray(q.transpose(1, 2, 0)), np.log(stretch)
@@ -0,0 +1,201 @@
+"""
+The pendulum models: state layout plus right hand side, nothing else.
+
+A state is a mutable sequence y = [theta_1..theta_n, omega_1..omega_n] with
+n = model.n_dof, and the accelerations live next to it in acc = [acc_1..acc_n]
+(a few of our integrators carry the last acceleration over to the next step).
+Every entry is either a float (one pendulum, xp=math) or an (N,) array (an
+ensemble, xp=numpy); all the formulas are written so they work for both.
+
+The models also have the hamiltonian form in canonical coordinates (theta, p)
+with p = dL/domega, for the integrators that need it to be symplectic.
+"""
+
+import math
+
+G = 9.81
+
+
+class PendulumModel:
+    """Simple pendulum, theta'' = -G/L sin(theta)."""
+    n_dof = 1
+
+    def __init__(self, length, mass, xp=math):
+        self.length = length
+        self.mass = mass
+        self.xp = xp
+
+    def accelerations(self, theta, omega):
+        return [-G / self.length * self.xp.sin(theta[0])]
+
+    def acceleration_jacobian(self, theta, omega):
+        """accelerations plus their gradient rows w.r.t. (theta, omega)."""
+        g_over_L = G / self.length
+        return [-g_over_L * self.xp.sin(theta[0])], [(-g_over_L * self.xp.cos(theta[0]), 0.0)]
+
+    def momenta(self, theta, omega):
+        return [self.mass * self.length ** 2 * omega[0]]
+
+    def velocities(self, theta, p):
+        return [p[0] / (self.mass * self.length ** 2)]
+
+    def hamiltonian(self, theta, p):
+        return p[0] ** 2 / (2 * self.mass * self.length ** 2) + self.potential_energy([theta[0]])
+
+    def hamiltonian_gradient(self, theta, p):
+        """dH/dtheta and dH/dp (which is just the angular velocities)."""
+        return [self.mass * G * self.length * self.xp.sin(theta[0])], self.velocities(theta, p)
+
+    def kinetic_energy(self, y):
+        linear_velocity = self.length * y[1]
+        return 0.5 * self.mass * (linear_velocity ** 2)
+
+    def potential_energy(self, y):
+        # height above the hanging position
+        return self.mass * G * self.length * (1 - self.xp.cos(y[0]))
+
+
+class DoublePendulumModel:
+    """Double pendulum, same equations of motion every script in the repo uses."""
+    n_dof = 2
+
+    def __init__(self, l1, l2, m1, m2, xp=math):
+        self.l1 = l1 # length1 from main bob to first bob
+        self.l2 = l2 # length 2 from first bob to second bob
+        self.m1 = m1 # mass 1
+        self.m2 = m2 # mass 2
+        self.xp = xp
+
+    def accelerations(self, theta, omega):
+        return compute_accelerations(theta[0], theta[1], omega[0], omega[1], self.l1, self.l2, self.m1, self.m2, self.xp)
+
+    def acceleration_jacobian(self, theta, omega):
+        acc1, acc2, dacc1, dacc2 = compute_acceleration_jacobian(theta[0], theta[1], omega[0], omega[1],
+                                                                 self.l1, self.l2, self.m1, self.m2, self.xp)
+        return [acc1, acc2], [dacc1, dacc2]
+
+    # T = 1/2 omega^T M omega with the mass matrix
+    # M = [[(m1 + m2) l1^2, m2 l1 l2 cos(d)], [m2 l1 l2 cos(d), m2 l2^2]], d = theta1 - theta2
+    def momenta(self, theta, omega):
+        coupling = self.m2 * self.l1 * self.l2 * self.xp.cos(theta[0] - theta[1])
+        return [(self.m1 + self.m2) * self.l1 ** 2 * omega[0] + coupling * omega[1],
+                coupling * omega[0] + self.m2 * self.l2 ** 2 * omega[1]]
+
+    def velocities(self, theta, p):
+        a = (self.m1 + self.m2) * self.l1 ** 2
+        b = self.m2 * self.l2 ** 2
+        coupling = self.m2 * self.l1 * self.l2 * self.xp.cos(theta[0] - theta[1])
+        det = a * b - coupling * coupling
+        return [(b * p[0] - coupling * p[1]) / det, (a * p[1] - coupling * p[0]) / det]
+
+    def hamiltonian(self, theta, p):
+        omega = self.velocities(theta, p)
+        return 0.5 * (p[0] * omega[0] + p[1] * omega[1]) + self.potential_energy(theta)
+
+    def hamiltonian_gradient(self, theta, p):
+        """
+        dH/dtheta and dH/dp (which is just the angular velocities). At fixed p
+        the kinetic part changes with d = theta1 - theta2 as
+        m2 l1 l2 omega1 omega2 sin(d).
+        """
+        omega1, omega2 = self.velocities(theta, p)
+        swing = self.m2 * self.l1 * self.l2 * omega1 * omega2 * self.xp.sin(theta[0] - theta[1])
+        return [swing + (self.m1 + self.m2) * G * self.l1 * self.xp.sin(theta[0]),
+                -swing + self.m2 * G * self.l2 * self.xp.sin(theta[1])], [omega1, omega2]
+
+    def kinetic_energy(self, y):
+        theta1, theta2, vel1, vel2 = y[0], y[1], y[2], y[3]
+        cos, sin = self.xp.cos, self.xp.sin
+        v1x = self.l1 * vel1 * cos(theta1)
+        v1y = self.l1 * vel1 * sin(theta1)
+        v2x = v1x + self.l2 * vel2 * cos(theta2)
+        v2y = v1y + self.l2 * vel2 * sin(theta2)
+
+        return 0.5 * self.m1 * (v1x**2 + v1y**2) + 0.5 * self.m2 * (v2x**2 + v2y**2)
+
+    def potential_energy(self, y):
+        # heights above the hanging (equilibrium) position
+        h1 = self.l1 * (1 - self.xp.cos(y[0]))
+        h2 = h1 + self.l2 * (1 - self.xp.cos(y[1]))
+        return self.m1 * G * h1 + self.m2 * G * h2
+
+
+def compute_accelerations(theta1, theta2, omega1, omega2, l1, l2, m1, m2, xp=math):
+    delta_theta = theta1 - theta2
+    sin_delta = xp.sin(delta_theta)
+    cos_delta = xp.cos(delta_theta)
+    den = 2 * m1 + m2 - m2 * xp.cos(2 * delta_theta)
+    w1_sq_l1 = omega1 * omega1 * l1
+    w2_sq_l2 = omega2 * omega2 * l2
+
+    num1 = -G * (2 * m1 + m2) * xp.sin(theta1)
+    num2 = -m2 * G * xp.sin(theta1 - 2 * theta2)
+    num3 = -2 * sin_delta * m2
+    num4 = w2_sq_l2 + w1_sq_l1 * cos_delta
+    acc1 = (num1 + num2 + num3 * num4) / (l1 * den)
+
+    num1 = 2 * sin_delta
+    num2 = w1_sq_l1 * (m1 + m2)
+    num3 = G * (m1 + m2) * xp.cos(theta1)
+    num4 = w2_sq_l2 * m2 * cos_delta
+    acc2 = num1 * (num2 + num3 + num4) / (l2 * den)
+
+    return acc1, acc2
+
+
+def compute_acceleration_jacobian(theta1, theta2, omega1, omega2, l1, l2, m1, m2, xp=math):
+    """
+    Closed form partial derivatives of (acc1, acc2) w.r.t. (theta1, theta2, omega1, omega2).
+    The rest of the RHS jacobian is just d(theta)/dt = omega, so this is all newton needs.
+    Returns acc1, acc2 and the two gradient rows.
+    """
+    delta_theta = theta1 - theta2
+    sin_d = xp.sin(delta_theta)
+    cos_d = xp.cos(delta_theta)
+    cos_2d = xp.cos(2 * delta_theta)
+    sin_2d = xp.sin(2 * delta_theta)
+    D = 2 * m1 + m2 - m2 * cos_2d
+    dD = 2 * m2 * sin_2d # dD/dtheta1, and dD/dtheta2 = -dD
+
+    w1_sq_l1 = omega1 ** 2 * l1
+    w2_sq_l2 = omega2 ** 2 * l2
+
+    # acc1 = N1 / (l1 D)
+    cos_1m2 = xp.cos(theta1 - 2 * theta2)
+    N1 = -G * (2 * m1 + m2) * xp.sin(theta1) - m2 * G * xp.sin(theta1 - 2 * theta2) \
+        - 2 * m2 * sin_d * (w2_sq_l2 + w1_sq_l1 * cos_d)
+    acc1 = N1 / (l1 * D)
+    swing = 2 * m2 * (w2_sq_l2 * cos_d + w1_sq_l1 * cos_2d)
+    dN1_t1 = -G * (2 * m1 + m2) * xp.cos(theta1) - m2 * G * cos_1m2 - swing
+    dN1_t2 = 2 * m2 * G * cos_1m2 + swing
+    dN1_w1 = -4 * m2 * l1 * omega1 * sin_d * cos_d
+    dN1_w2 = -4 * m2 * l2 * omega2 * sin_d
+    dacc1 = ((dN1_t1 - acc1 * l1 * dD) / (l1 * D),
+             (dN1_t2 + acc1 * l1 * dD) / (l1 * D),
+             dN1_w1 / (l1 * D),
+             dN1_w2 / (l1 * D))
+
+    # acc2 = 2 sin(d) N2 / (l2 D)
+    N2 = w1_sq_l1 * (m1 + m2) + G * (m1 + m2) * xp.cos(theta1) + w2_sq_l2 * m2 * cos_d
+    acc2 = 2 * sin_d * N2 / (l2 * D)
+    dP_t1 = 2 * cos_d * N2 + 2 * sin_d * (-G * (m1 + m2) * xp.sin(theta1) - w2_sq_l2 * m2 * sin_d)
+    dP_t2 = -2 * cos_d * N2 + 2 * sin_d * w2_sq_l2 * m2 * sin_d
+    dP_w1 = 2 * sin_d * 2 * omega1 * l1 * (m1 + m2)
+    dP_w2 = 2 * sin_d * 2 * omega2 * l2 * m2 * cos_d
+    dacc2 = ((dP_t1 - acc2 * l2 * dD) / (l2 * D),
+             (dP_t2 + acc2 * l2 * dD) / (l2 * D),
+             dP_w1 / (l2 * D),
+             dP_w2 / (l2 * D))
+
+    return acc1, acc2, dacc1, dacc2
+
+
+def state_property(container, index, doc=None):
+    """Expose entry `index` of the state list/array `container` as a plain attribute (theta1, vel1, ...)."""
+    def get(self):
+        return getattr(self, container)[index]
+
+    def set(self, value):
+        getattr(self, container)[index] = value
+
+    return property(get, set, doc=doc)
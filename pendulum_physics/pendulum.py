@@ -0,0 +1,98 @@
+"""
+The simple pendulum as one object: a PendulumModel plus its state and
+whichever integrator from the registry you picked (GLRK4 by default). No
+drawing, the scripts in simple_pendulums/ subclass it for that.
+"""
+
+import math
+import time
+
+from .integrators import advance, get_integrator
+from .models import PendulumModel, state_property
+
+delta_t = 0.03
+
+
+class Pendulum(PendulumModel):
+    def __init__(self, origin, mass, length, damping=1.0, angle=0,velocity=0, delta_t=delta_t, integrator='glrk4', tol=1e-12, max_iter=50) -> None:
+        super().__init__(length, mass)
+        self.origin = origin
+        self.y = [angle, velocity]
+        # the accel at the current state, leapfrog/verlet/euler kick with it on the first step
+        self.acc = self.accelerations(self.y[:1], self.y[1:])
+        self.dragging = False
+        self.mouse_pos_history = []  # mouse pos
+        self.max_history_length = 4
+        self.throwing_enabled = False  # toggle T to throw
+        self.delta_t = delta_t
+        self.integrator = integrator
+        self.step = get_integrator(integrator)
+        # solver settings for the implicit integrators, they also keep their warm start in here
+        self.work = {'tol': tol, 'max_iter': max_iter}
+
+    angle = state_property('y', 0)
+    velocity = state_property('y', 1)
+    acceleration = state_property('acc', 0)
+
+    @property
+    def iterations(self):
+        """solver iterations used on the last step (implicit integrators only)"""
+        return self.work.get('iterations', 0)
+
+    def update(self):
+        if not self.dragging:
+            self.step(self, self.y, self.acc, self.delta_t, self.work)
+        else:
+            self.work.pop('stage_acc', None) # angle got moved by hand, old stages are no good as a guess
+            self.acc[:] = self.accelerations(self.y[:1], self.y[1:])
+
+    def advance(self, n_steps, record_every=1, out=None):
+        """
+        Take n_steps steps without going through update(), recording the state
+        (angle, velocity) before every record_every-th step. Returns a (n_records, 2) array
+        (or the filled part of out), see integrators.advance.
+        """
+        return advance(self.step, self, self.y, self.acc, self.delta_t, self.work, n_steps, record_every, out)
+
+    def get_pos(self):
+        x = self.origin[0] + (self.length * math.sin(self.angle))
+        y = self.origin[1] + (self.length * math.cos(self.angle))
+        return (x, y)
+    
+    def kinetic_energy(self, y=None):
+        return super().kinetic_energy(self.y if y is None else y)
+
+    def potential_energy(self, y=None):
+        return super().potential_energy(self.y if y is None else y)
+
+    def total_energy(self):
+        return self.kinetic_energy() + self.potential_energy()
+    
+    def mouse_drag(self, mouse_pos):
+        if self.dragging:
+            dx = mouse_pos[0] - self.origin[0]
+            dy = mouse_pos[1] - self.origin[1]
+            self.angle = math.atan2(dx, dy)
+            current_time = time.time()
+            self.mouse_pos_history.append((mouse_pos, current_time))
+            if len(self.mouse_pos_history) > self.max_history_length:
+                self.mouse_pos_history.pop(0)
+
+    def release(self):
+        if self.throwing_enabled and len(self.mouse_pos_history) > 1:
+            total_dx = total_dy = total_dt = 0
+            for i in range(len(self.mouse_pos_history) - 1):
+                (x1, y1), t1 = self.mouse_pos_history[i]
+                (x2, y2), t2 = self.mouse_pos_history[i + 1]
+                total_dx += (x2 - x1)
+                total_dy += (y2 - y1)
+                total_dt += (t2 - t1)
+
+            sens = 70
+            if total_dt > 0:
+                avg_velocity_x = (total_dx / total_dt) / sens
+                avg_velocity_y = (total_dy / total_dt) / sens
+                self.velocity = (avg_velocity_x * math.cos(self.angle) + avg_velocity_y * math.sin(self.angle)) / self.length
+
+        self.mouse_pos_history.clear()
+        self.dragging = False
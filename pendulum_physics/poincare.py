@@ -0,0 +1,145 @@
+"""
+Poincare sections of the double pendulum.
+
+The surface is one state variable at a fixed value, e.g. theta1 = 0 crossed
+with omega1 > 0 (component='theta1', value=0, direction=1). Angles are
+compared modulo 2 pi, so a pendulum that goes round still hits theta1 = 0
+every turn.
+
+All initial conditions run as one DoublePendulumEnsemble, a chunk of steps
+at a time through advance(). Between two recorded states we look for a
+sign change of the surface coordinate, and every crossing is then put
+exactly on the surface with Henon's trick: one RK4 step from the state
+before the crossing, using the surface coordinate itself as the
+independent variable (dy/ds = f(y) / f_s(y), dt/ds = 1 / f_s(y)), with
+the step size set to the distance to the surface. The hits go to a callback
+(or get appended to a file) as they come, nothing else is kept.
+
+    from pendulum_physics.poincare import at_energy, poincare_section, load_hits
+    y0 = at_energy(20000, theta2=np.linspace(-1, 1, 50), vel2=0)
+    poincare_section(*y0, t_total=5000, out='hits.bin')
+    hits = load_hits('hits.bin') # (n, 6): lane, t, theta1, theta2, vel1, vel2
+"""
+
+import os
+
+import numpy as np
+
+from .ensemble import DoublePendulumEnsemble
+from .models import DoublePendulumModel, compute_accelerations
+
+COMPONENTS = ('theta1', 'theta2', 'vel1', 'vel2')
+HIT_COLUMNS = ('lane', 't', 'theta1', 'theta2', 'vel1', 'vel2')
+
+
+def at_energy(energy, theta2, vel2, theta1=0.0, l1=200, l2=200, m1=15, m2=15):
+    """
+    Initial conditions with total energy `energy` (zero hanging at rest, like
+    total_energy()): theta1, theta2 and vel2 are given (and broadcast
+    together), vel1 is solved for and positive, so with theta1=0 they all
+    start on the theta1 = 0, omega1 > 0 section. Combinations that can't
+    reach that energy are dropped. Returns theta1, theta2, vel1, vel2 arrays.
+    """
+    theta1, theta2, vel2 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (theta1, theta2, vel2)))
+    model = DoublePendulumModel(l1, l2, m1, m2, xp=np)
+    # kinetic energy is quadratic in vel1: a vel1^2 + b vel1 + c = 0
+    a = 0.5 * (m1 + m2) * l1 ** 2
+    b = m2 * l1 * l2 * np.cos(theta1 - theta2) * vel2
+    c = 0.5 * m2 * l2 ** 2 * vel2 ** 2 + model.potential_energy((theta1, theta2)) - energy
+    discriminant = b * b - 4 * a * c
+    ok = discriminant >= 0
+    vel1 = (-b[ok] + np.sqrt(discriminant[ok])) / (2 * a)
+    return theta1[ok], theta2[ok], vel1, vel2[ok]
+
+
+def poincare_section(theta1, theta2, vel1=0, vel2=0, l1=200, l2=200, m1=15, m2=15, t_total=1000.0, delta_t=0.03,
+                     component='theta1', value=0.0, direction=1, callback=None, out=None,
+                     integrator='rk4', jit=False, chunk=256):
+    """
+    Integrate every initial condition (scalars and (N,) arrays broadcast
+    together) for t_total and report each crossing of `component` == value,
+    going up for direction=1, down for -1, either way for 0. Every chunk of
+    steps with hits calls callback(hits) with a (k, 6) array, columns are
+    HIT_COLUMNS (lane is the index of the initial condition), and/or appends
+    the same rows as raw float64 to `out` (a path or binary file, read it
+    back with load_hits). Returns the number of hits.
+    """
+    if component not in COMPONENTS:
+        raise ValueError(f"unknown component {component!r}, pick one of {COMPONENTS}")
+    if direction not in (-1, 0, 1):
+        raise ValueError(f"direction has to be -1, 0 or 1, got {direction}")
+    index = COMPONENTS.index(component)
+
+    ensemble = DoublePendulumEnsemble((0, 0), l1, l2, m1, m2, theta1, theta2, vel1, vel2,
+                                      delta_t=delta_t, integrator=integrator, jit=jit)
+    params = (ensemble.l1, ensemble.l2, ensemble.m1, ensemble.m2)
+    total_steps = round(t_total / delta_t)
+    states = np.empty((chunk + 1, 4, len(ensemble)))
+
+    sink = open(out, 'ab') if isinstance(out, (str, os.PathLike)) else out
+    try:
+        hits = 0
+        done = 0
+        while done < total_steps:
+            n = min(chunk, total_steps - done)
+            ensemble.advance(n, out=states)
+            states[n] = ensemble.y
+
+            # distance to the surface before and after every step
+            distance = _distance(states[:n + 1, index], value, index)
+            before, after = distance[:-1], distance[1:]
+            if direction == 1:
+                crossed = (before < 0) & (after >= 0)
+            elif direction == -1:
+                crossed = (before > 0) & (after <= 0)
+            else:
+                crossed = ((before < 0) & (after >= 0)) | ((before > 0) & (after <= 0))
+            if index < 2:
+                crossed &= np.abs(after - before) < np.pi # not the jump where the angle wraps round
+            steps, lanes = np.nonzero(crossed)
+
+            if lanes.size:
+                y = states[steps, :, lanes].T
+                lane_params = tuple(p[lanes] for p in params)
+                on_surface, dt = _henon_step(y, -before[steps, lanes], index, lane_params)
+                found = np.column_stack((lanes, (done + steps) * delta_t + dt, on_surface.T))
+                if callback is not None:
+                    callback(found)
+                if sink is not None:
+                    found.tofile(sink)
+                hits += len(found)
+            done += n
+    finally:
+        if sink is not out:
+            sink.close()
+    return hits
+
+
+def load_hits(path):
+    """hits written by poincare_section(out=path), as a (n, 6) array with HIT_COLUMNS."""
+    return np.fromfile(path, dtype=np.float64).reshape(-1, len(HIT_COLUMNS))
+
+
+def _distance(values, value, index):
+    if index < 2:
+        # signed angle from the surface in [-pi, pi)
+        return (values - value + np.pi) % (2 * np.pi) - np.pi
+    return values - value
+
+
+def _derivatives(y, params):
+    acc1, acc2 = compute_accelerations(y[0], y[1], y[2], y[3], *params, xp=np)
+    return np.array((y[2], y[3], acc1, acc2))
+
+
+def _henon_step(y, ds, index, params):
+    # RK4 in s = y[index]: d(y, t)/ds = (f(y), 1) / f_s(y)
+    def slopes(y):
+        f = _derivatives(y, params)
+        return f / f[index], 1 / f[index]
+
+    k1, t1 = slopes(y)
+    k2, t2 = slopes(y + 0.5 * ds * k1)
+    k3, t3 = slopes(y + 0.5 * ds * k2)
+    k4, t4 = slopes(y + ds * k3)
+    return y + (ds / 6) * (k1 + 2 * k2 + 2 * k3 + k4), (ds / 6) * (t1 + 2 * t2 + 2 * t3 + t4)
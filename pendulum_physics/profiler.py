@@ -0,0 +1,195 @@
+"""
+Where the frame time goes in the pygame loops.
+
+Call frame() at the top of the loop and mark(name) after every part of it;
+each mark books the time since the previous one under that name, whatever
+is left between the last mark and the next frame() goes under 'other'. The
+last `window` frames are kept per phase for the overlay (frame time
+percentiles, a histogram of the recent frame times and every phase's share),
+the whole run goes into totals and a log spaced histogram, so summary() at
+exit covers all of it in fixed memory.
+
+    profiler = FrameProfiler()
+    while running:
+        profiler.frame()
+        for event in pygame.event.get(): ...  # a key calls profiler.toggle()
+        profiler.mark('events')
+        pendulum.update()
+        profiler.mark('update')
+        ...
+        profiler.draw(screen)  # the overlay, when it's on
+        pygame.display.flip()
+        profiler.mark('flip')
+        clock.tick(240)
+        profiler.mark('tick')  # waiting for the frame cap, idle time
+    pygame.quit()
+    print(profiler.summary())
+
+In the scripts P toggles the overlay and the summary gets printed at exit.
+Only draw() needs pygame, and it imports it when it first gets called.
+"""
+
+import bisect
+import time
+
+import numpy as np
+
+# whole run frame times, 0.1ms to 10s in steps of about 6%
+_EDGES = np.geomspace(1e-4, 10, 201)
+_EDGE_LIST = _EDGES.tolist() # bisect on a list is a lot quicker than numpy for one value
+_PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    def __init__(self, window=600, refresh=10):
+        self.window = window
+        self.refresh = refresh # frames between redraws of the overlay, rendering text every frame costs more than most phases
+        self.visible = False
+        self.phases = [] # in the order they first showed up
+        self.n_frames = 0
+        self._index = {}
+        self._recent = np.zeros((window, 0)) # per phase seconds of the last `window` frames
+        self._frames = np.zeros(window) # whole frame seconds, same frames
+        self._totals = []
+        self._worst = []
+        self._counts = np.zeros(len(_EDGES) + 1, dtype=np.int64)
+        self._elapsed = 0.0
+        self._longest = 0.0
+        self._start = None
+        self._last = None
+        self._current = []
+        self._overlay = None
+
+    def frame(self):
+        """start of a frame, and the end of the one before it"""
+        now = time.perf_counter()
+        if self._start is not None:
+            self._finish(now)
+        self._start = self._last = now
+        self._current = [0.0] * len(self.phases)
+
+    def mark(self, name):
+        """book the time since the previous mark (or frame()) under name"""
+        now = time.perf_counter()
+        self._add(name, now - self._last)
+        self._last = now
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._overlay = None
+
+    def stats(self, recent=True):
+        """
+        frame time percentiles (_PERCENTILES, in seconds) and mean seconds per
+        frame of every phase, over the last `window` frames or (recent=False)
+        the whole run, where the percentiles come from the histogram
+        """
+        if recent:
+            n = min(self.n_frames, self.window)
+            if not n:
+                return {}, {}
+            percentiles = np.percentile(self._frames[:n], _PERCENTILES)
+            phases = self._recent[:n].mean(axis=0)
+        else:
+            if not self.n_frames:
+                return {}, {}
+            percentiles = _histogram_percentiles(self._counts, _PERCENTILES)
+            phases = np.array(self._totals) / self.n_frames
+        return dict(zip(_PERCENTILES, percentiles)), dict(zip(self.phases, phases))
+
+    def summary(self):
+        """the whole run as text, for printing at exit"""
+        if not self.n_frames:
+            return "profiler: no frames"
+        percentiles, phases = self.stats(recent=False)
+        mean = self._elapsed / self.n_frames
+        lines = [f"{self.n_frames} frames in {self._elapsed:.1f}s, {1 / mean:.1f} fps",
+                 f"frame ms   mean {1e3 * mean:.2f}  " + "  ".join(f"p{q} {1e3 * v:.2f}" for q, v in percentiles.items())
+                 + f"  max {1e3 * self._longest:.2f}",
+                 f"{'phase':<12} {'mean ms':>9} {'max ms':>9} {'share':>6}"]
+        for name, worst in zip(self.phases, self._worst):
+            lines.append(f"{name:<12} {1e3 * phases[name]:>9.3f} {1e3 * worst:>9.3f} {phases[name] / mean:>6.1%}")
+        return "\n".join(lines)
+
+    def draw(self, screen, position=(10, 10)):
+        """the overlay (when it's on), its own time goes under 'hud'"""
+        if not self.visible:
+            return
+        if self._overlay is None or self.n_frames % self.refresh == 0:
+            self._overlay = self._render()
+        screen.blit(self._overlay, position)
+        self.mark('hud')
+
+    def _add(self, name, seconds):
+        i = self._index.get(name)
+        if i is None:
+            i = self._index[name] = len(self.phases)
+            self.phases.append(name)
+            self._recent = np.hstack((self._recent, np.zeros((self.window, 1))))
+            self._totals.append(0.0)
+            self._worst.append(0.0)
+            self._current.append(0.0)
+        self._current[i] += seconds
+
+    def _finish(self, now):
+        total = now - self._start
+        self._add('other', total - sum(self._current))
+        slot = self.n_frames % self.window
+        self._recent[slot] = self._current
+        self._frames[slot] = total
+        for i, seconds in enumerate(self._current):
+            self._totals[i] += seconds
+            if seconds > self._worst[i]:
+                self._worst[i] = seconds
+        self._counts[bisect.bisect_left(_EDGE_LIST, total)] += 1
+        self._elapsed += total
+        self._longest = max(self._longest, total)
+        self.n_frames += 1
+
+    def _render(self):
+        import pygame
+
+        font = pygame.font.Font(None, 20)
+        percentiles, phases = self.stats()
+        n = min(self.n_frames, self.window)
+        width, line, bar = 300, 16, 120
+        histogram_height = 60
+        surface = pygame.Surface((width, line * (len(phases) + 2) + histogram_height + 16), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        if not n:
+            return surface
+        white, grey, green = (255, 255, 255), (170, 170, 170), (90, 220, 120)
+
+        mean = self._frames[:n].mean()
+        text = f"{1 / mean:5.1f} fps  " + "  ".join(f"p{q} {1e3 * v:.1f}" for q, v in percentiles.items()) + " ms"
+        surface.blit(font.render(text, True, white), (6, 4))
+        y = 4 + line
+        for name, seconds in phases.items():
+            share = seconds / mean
+            pygame.draw.rect(surface, green, (width - bar - 6, y + 3, max(1, int(bar * share)), line - 6))
+            surface.blit(font.render(f"{name:<8} {1e3 * seconds:6.2f} ms {share:4.0%}", True, grey), (6, y))
+            y += line
+
+        # recent frame times, up to twice the p99 so the tail still shows
+        top = 2 * percentiles[99]
+        counts, _ = np.histogram(np.minimum(self._frames[:n], top), bins=60, range=(0, top))
+        y += 8
+        scale = histogram_height / counts.max()
+        step = (width - 12) / len(counts)
+        for i, count in enumerate(counts):
+            height = int(count * scale)
+            if height:
+                pygame.draw.rect(surface, white, (6 + int(i * step), y + histogram_height - height, max(1, int(step) - 1), height))
+        for q, value in percentiles.items():
+            x = 6 + int(value / top * (width - 12))
+            pygame.draw.line(surface, (240, 80, 80) if q == 99 else grey, (x, y), (x, y + histogram_height))
+        surface.blit(font.render(f"0 - {1e3 * top:.1f} ms", True, grey), (width - 90, y))
+        return surface
+
+
+def _histogram_percentiles(counts, percentiles):
+    # the geometric middle of the bin the percentile falls in
+    cumulative = np.cumsum(counts)
+    centers = np.sqrt(_EDGES[:-1] * _EDGES[1:])
+    centers = np.concatenate(([_EDGES[0]], centers, [_EDGES[-1]])) # under and over the range
+    return [centers[np.searchsorted(cumulative, q / 100 * cumulative[-1])] for q in percentiles]
@@ -0,0 +1,228 @@
+"""
+Drawing a whole DoublePendulumEnsemble in a handful of pygame calls.
+
+Per pendulum draw.line / draw.circle calls cost about the same for a short
+arm as for a long one, so past a few hundred pendulums the call overhead is
+the frame. Here the positions come in as one (N, 2, 2) array
+(DoublePendulumEnsemble.positions()) and:
+
+- the arms of the first `arms` pendulums are one pygame.draw.lines call per
+  color: all pendulums hang from the same origin, so origin, bob 1, bob 2,
+  bob 1, origin, next bob 1, ... is one polyline that only ever goes back
+  over itself. Full arms of 10k pendulums are a few million pixels a frame
+  (about 70ms in pygame), so above that many only the bobs get drawn.
+- the bobs of every pendulum are written straight into the surface pixels
+  (surfarray.pixels2d), one numpy assignment for all of them.
+
+    renderer = EnsembleRenderer(origin, colors)  # colors (N, 3), or one color for all
+    renderer.draw(screen, pendulums.positions())
+
+TrailCanvas is the trails behind the bobs. Redrawing every segment of a
+trail with its own alpha every frame costs a draw call per segment, so long
+trails are out. The canvas keeps the picture instead, as a float32 buffer:
+each frame fade() scales all of it by one factor and line() adds
+only the newest segment, so a frame costs the same for a trail of 100
+points and one of 100000. The buffer is float because with 8 bit channels
+a factor close to 1 rounds back to the same value (pygame's BLEND_MULT with
+254/255 stops fading anything below 128) and long trails never go away.
+
+    trail = TrailCanvas((800, 800), length=1200)  # about 1200 frames until a segment is gone
+    while running:
+        trail.fade()
+        trail.line(previous, position, (0, 0, 255), 2)
+        trail.draw(screen)
+
+With length=None nothing fades and the buffer is plain 8 bit, that's a
+whole run's picture in fixed memory, ready to save() at any point. scale
+draws it at a multiple of the window resolution (coordinates stay in
+window pixels).
+
+pygame gets imported by draw() and save(), the first time they get called.
+"""
+
+import numpy as np
+
+
+class EnsembleRenderer:
+    def __init__(self, origin, colors, arms=256, radius=1, width=1, first_bob=True):
+        self.origin = tuple(origin)
+        self.arms = arms # pendulums drawn with arms, the rest only get their bobs
+        self.width = width
+        self.first_bob = first_bob
+        self.radius = radius
+        colors = np.asarray(colors, dtype=np.uint8)
+        self.colors = colors.reshape(-1, 3)
+        # pixels of a disc of the given radius, (dx, dy) offsets
+        dx, dy = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        inside = dx ** 2 + dy ** 2 <= radius ** 2 + radius # a bit rounder than the exact disc at small radii
+        self.offsets = np.column_stack((dx[inside], dy[inside]))
+        self._groups = None
+        self._mapped = None # colors as the surface's pixel values, and the format they're for
+
+    def draw(self, surface, positions):
+        """every pendulum in positions (N, 2, 2) onto surface"""
+        import pygame
+
+        if self.arms:
+            n = min(self.arms, len(positions))
+            order, groups = self._color_groups(n)
+            # every arm as origin, bob 1, bob 2, bob 1, sorted so each color is one run of rows
+            arms = positions[order]
+            points = np.empty((n, 4, 2))
+            points[:, 0] = self.origin
+            points[:, 1] = arms[:, 0]
+            points[:, 2] = arms[:, 1]
+            points[:, 3] = arms[:, 0]
+            points = points.reshape(-1, 2).tolist()
+            for color, start, stop in groups:
+                pygame.draw.lines(surface, color, False, points[4 * start:4 * stop - 1], self.width)
+        self._draw_bobs(pygame, surface, positions)
+
+    def _color_groups(self, n):
+        """the first n pendulums sorted by color, and (color, start, stop) of every color in that order"""
+        if self._groups is None or self._groups[0] != n:
+            if len(self.colors) == 1:
+                order, groups = np.arange(n), [(tuple(self.colors[0].tolist()), 0, n)]
+            else:
+                unique, inverse, counts = np.unique(self.colors[:n], axis=0, return_inverse=True, return_counts=True)
+                order = np.argsort(inverse.ravel(), kind='stable')
+                stops = np.cumsum(counts)
+                groups = [(tuple(color.tolist()), stop - count, stop)
+                          for color, count, stop in zip(unique, counts.tolist(), stops.tolist())]
+            self._groups = (n, order, groups)
+        return self._groups[1:]
+
+    def _draw_bobs(self, pygame, surface, positions):
+        n = len(positions)
+        which = (0, 1) if self.first_bob else (1,)
+        colors = self.colors if len(self.colors) > 1 else np.broadcast_to(self.colors, (n, 3))
+        key = (surface.get_bitsize(), surface.get_masks(), n)
+        if self._mapped is None or self._mapped[0] != key:
+            mapped = np.array([surface.map_rgb(tuple(c)) for c in colors.tolist()], dtype=np.uint32)
+            # one color per bob pixel, in the order the coordinates come out below
+            self._mapped = (key, np.tile(mapped, len(self.offsets) * len(which)))
+        try:
+            pixels = pygame.surfarray.pixels2d(surface)
+        except ValueError:
+            # 24 bit surfaces have no 2d pixel view, slow path
+            for bob in which:
+                for color, (x, y) in zip(colors.tolist(), positions[:, bob].tolist()):
+                    pygame.draw.circle(surface, color, (int(x), int(y)), max(1, self.radius))
+            return
+        # every pixel of every bob in one go, pendulums on the last axis: (offsets, bobs, pendulums)
+        bobs = positions[:, which].astype(np.intp).transpose(1, 2, 0)
+        x = (bobs[None, :, 0] + self.offsets[:, 0, None, None]).ravel()
+        y = (bobs[None, :, 1] + self.offsets[:, 1, None, None]).ravel()
+        w, h = pixels.shape
+        inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        pixels[x[inside], y[inside]] = self._mapped[1][inside]
+        del pixels # unlocks the surface
+
+
+class TrailCanvas:
+    def __init__(self, size, length=1200, scale=1):
+        self.size = tuple(size) # in window pixels
+        self.length = length # frames until a segment has faded below what 8 bits can show, None never fades
+        self.scale = scale
+        self.resolution = (int(self.size[0] * scale), int(self.size[1] * scale))
+        # (y, x, channel) with the channels in the byte order of a 32 bit display surface (b, g, r, unused),
+        # a blit between matching formats is a few times quicker than one that has to convert
+        shape = (self.resolution[1], self.resolution[0], 4)
+        if length is None:
+            self.decay = None
+            self.image = self._bytes = np.zeros(shape, dtype=np.uint8)
+        else:
+            # what's left of a segment per frame, 0.5/255 of it after length frames
+            self.decay = (0.5 / 255) ** (1 / length)
+            self.image = np.zeros(shape, dtype=np.float32)
+            self._bytes = np.zeros(shape, dtype=np.uint8)
+        self._surface = None
+        self._offsets = {}
+
+    def fade(self):
+        """one frame older, everything scaled by decay"""
+        if self.decay is not None:
+            np.multiply(self.image, self.decay, out=self.image)
+
+    def line(self, start, end, color, width=1):
+        """a segment at full color, on top of whatever is there"""
+        scale = self.scale
+        x0, y0, x1, y1 = start[0] * scale, start[1] * scale, end[0] * scale, end[1] * scale
+        # a point at least every pixel along it, and a width x width spot at every point
+        n = int(max(abs(x1 - x0), abs(y1 - y0))) + 2
+        t = np.linspace(0.0, 1.0, n)
+        offsets = self._spot(max(1, round(width * scale)))
+        x = np.floor(x0 + t * (x1 - x0) + offsets[:, 0, None]).astype(np.intp).ravel()
+        y = np.floor(y0 + t * (y1 - y0) + offsets[:, 1, None]).astype(np.intp).ravel()
+        w, h = self.resolution
+        inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        self.image[y[inside], x[inside], :3] = color[::-1]
+
+    def replay(self, points, colors, width=1):
+        """
+        The last n frames of trails in one go, what fade() and line() every
+        frame would have left: points is (n + 1, k, 2), k trails (one color
+        each, colors is (k, 3)) that got a segment per frame, the newest ones
+        come out at full color. For starting a canvas in the middle of a run.
+        """
+        points = np.asarray(points, dtype=float) * self.scale
+        n, k = len(points) - 1, points.shape[1]
+        if n < 1:
+            return
+        # every segment in drawing order, frame by frame and trail by trail within a frame
+        starts, steps = points[:-1].reshape(-1, 2), np.diff(points, axis=0).reshape(-1, 2)
+        faded = np.tile(np.broadcast_to(np.asarray(colors, dtype=float), (k, 3))[:, ::-1], (n, 1))
+        if self.decay is not None:
+            faded *= self.decay ** np.repeat(np.arange(n - 1, -1, -1), k)[:, None]
+
+        # a point at least every pixel along each segment, like line()
+        counts = np.abs(steps).max(axis=1).astype(np.intp) + 2
+        segment = np.repeat(np.arange(len(starts)), counts)
+        t = (np.arange(len(segment)) - np.repeat(np.cumsum(counts) - counts, counts)) / (counts - 1)[segment]
+        along = starts[segment] + t[:, None] * steps[segment]
+        offsets = self._spot(max(1, round(width * self.scale)))
+        x = np.floor(along[:, 0, None] + offsets[:, 0]).astype(np.intp).ravel()
+        y = np.floor(along[:, 1, None] + offsets[:, 1]).astype(np.intp).ravel()
+        segment = np.repeat(segment, len(offsets))
+        w, h = self.resolution
+        inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        # later segments overwrite earlier ones, same as drawing them one after the other
+        self.image[y[inside], x[inside], :3] = faded[segment[inside]]
+
+    def clear(self):
+        self.image[...] = 0
+
+    def draw(self, surface, position=(0, 0)):
+        """added onto surface, on a black background that's the same as drawing it with alpha"""
+        import pygame
+
+        image = self._update()
+        if self.scale != 1:
+            image = pygame.transform.smoothscale(image, self.size)
+        surface.blit(image, position, special_flags=pygame.BLEND_RGB_ADD)
+
+    def save(self, path):
+        """the picture at full resolution on black, as an image file (png, jpg, bmp, tga from the name)"""
+        import pygame
+
+        opaque = pygame.Surface(self.resolution) # the buffer's fourth channel is 0, it'd come out transparent
+        opaque.blit(self._update(), (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        pygame.image.save(opaque, path)
+
+    def _update(self):
+        import pygame
+
+        if self._bytes is not self.image:
+            np.copyto(self._bytes, self.image, casting='unsafe')
+        if self._surface is None:
+            # shares memory with _bytes, so it's always the latest picture
+            self._surface = pygame.image.frombuffer(self._bytes, self.resolution, 'BGRA')
+        return self._surface
+
+    def _spot(self, width):
+        if width not in self._offsets:
+            d = np.arange(width) - (width - 1) / 2
+            dx, dy = np.meshgrid(d, d)
+            inside = dx ** 2 + dy ** 2 <= (width / 2) ** 2
+            self._offsets[width] = np.column_stack((dx[inside], dy[inside]))
+        return self._offsets[width]
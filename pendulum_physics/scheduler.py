@@ -0,0 +1,99 @@
+"""
+Physics at a fixed rate, whatever the frame rate is.
+
+The loops used to take one delta_t per rendered frame, so the animation ran
+as fast as the machine could draw, and a smaller delta_t (more accurate)
+also meant slower motion. FixedStep keeps an accumulator instead: every
+frame adds the wall time since the last one times `speed` (simulated
+seconds per real second), and the pendulum takes as many delta_t steps as
+fit in it, none on a quick frame, several on a slow one. What's left over
+is how far we are into the next step, `alpha`, and interpolated() draws the
+pendulum that far between its last two states, so the motion stays smooth
+when steps and frames don't line up. delta_t is the accuracy knob, the
+frame cap (clock.tick) is the fps knob, speed is how fast it looks.
+
+    fixed_step = FixedStep(speed=3.0)
+    while running:
+        ...
+        steps = fixed_step.advance(pendulum)  # 0, 1 or more update()s
+        with fixed_step.interpolated(pendulum):
+            pendulum.draw(screen)
+        if steps:  # a frame without a step has nothing new to record
+            energy.append(...)
+
+Works with anything that has y, delta_t and update(): Pendulum,
+DoublePendulum and DoublePendulumEnsemble.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class FixedStep:
+    def __init__(self, speed=1.0, max_steps=64, max_frame=0.25, clock=time.perf_counter):
+        self.speed = speed # simulated seconds per wall clock second
+        self.max_steps = max_steps # per frame, when the physics can't keep up we slow down instead of falling further behind
+        self.max_frame = max_frame # longest frame counted, so a stall (window dragged, breakpoint) doesn't get replayed
+        self.clock = clock
+        self.accumulator = 0.0 # simulated seconds not stepped yet
+        self.alpha = 0.0 # accumulator / delta_t, how far into the next step the frame is
+        self.steps = 0 # physics steps taken in total
+        self.time = 0.0 # simulated seconds so far
+        self.dropped = 0.0 # simulated seconds skipped because of max_steps
+        self._last = None
+        self._previous = None # (pendulum, its y before the last step)
+
+    def advance(self, pendulum, frame_time=None):
+        """
+        Step the pendulum for the time since the last call (or frame_time
+        seconds of wall time, for runs that set their own pace), returns
+        how many update()s that was.
+        """
+        now = self.clock()
+        if frame_time is None:
+            frame_time = 0.0 if self._last is None else now - self._last
+        self._last = now
+        delta_t = pendulum.delta_t
+
+        self.accumulator += min(frame_time, self.max_frame) * self.speed
+        n = int(self.accumulator / delta_t + 1e-9) # 3 * 0.1 / 0.1 is 2.9999999999999996
+        if n > self.max_steps:
+            self.dropped += (n - self.max_steps) * delta_t
+            self.accumulator -= (n - self.max_steps) * delta_t
+            n = self.max_steps
+        for _ in range(n):
+            self._previous = (pendulum, pendulum.y.copy()) # a list for the single pendulums, a (4, N) array for the ensemble
+            pendulum.update()
+        self.accumulator = max(0.0, self.accumulator - n * delta_t)
+        self.alpha = self.accumulator / delta_t
+        self.steps += n
+        self.time += n * delta_t
+        if _held(pendulum):
+            self._previous = None # angles set by hand jump, don't blend across that
+        return n
+
+    @contextmanager
+    def interpolated(self, pendulum):
+        """pendulum.y blended between its last two states by alpha inside the with block, for drawing only"""
+        previous = self._previous
+        if previous is None or previous[0] is not pendulum or _held(pendulum):
+            # nothing to blend with yet, or it was reset or is being dragged
+            yield pendulum
+            return
+        current = pendulum.y
+        pendulum.y = _blend(previous[1], current, self.alpha)
+        try:
+            yield pendulum
+        finally:
+            pendulum.y = current
+
+
+def _blend(a, b, alpha):
+    if isinstance(b, list):
+        return [x + alpha * (y - x) for x, y in zip(a, b)]
+    return a + alpha * (b - a)
+
+
+def _held(pendulum):
+    # the scripts' mouse dragging, Pendulum has `dragging`, DoublePendulum drag1/drag2
+    return getattr(pendulum, 'dragging', False) or getattr(pendulum, 'drag1', False) or getattr(pendulum, 'drag2', False)
@@ -0,0 +1,179 @@
+"""
+Trajectory files for long runs.
+
+A file is a small header (magic, record count, where the data starts, then
+json with the column names, integrator, dt and model parameters) followed by
+fixed-width float64 records, one row per recorded frame. The writer maps the
+file one chunk of records at a time and appends into that, so a run of
+hours never holds more than one chunk in memory; the reader maps the whole
+thing read-only and hands out numpy views, nothing gets loaded until you
+touch it.
+
+    with TrajectoryWriter('run.trj', ('step', 'theta1', 'theta2'), **describe(pendulum)) as record:
+        record.append(step, pendulum.theta1, pendulum.theta2)
+    run = TrajectoryReader('run.trj')
+    plt.plot(run['step'], run['theta1'])
+
+The pygame scripts keep every frame this way instead of in lists, through
+frame_writer(), but only write <script name>.trj when PENDULUM_RECORD=1 is
+set (see recording()).
+"""
+
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b'PENDTRJ1'
+_PREFIX = struct.Struct('<8sQQ') # magic, number of records, data offset
+_ALIGN = 4096
+
+
+def describe(pendulum):
+    """integrator, dt and model parameters of a Pendulum, DoublePendulum or ensemble, as header fields."""
+    names = ('l1', 'l2', 'm1', 'm2') if pendulum.n_dof == 2 else ('length', 'mass')
+    params = {name: np.asarray(getattr(pendulum, name)).tolist() for name in names}
+    return {'integrator': pendulum.integrator, 'dt': pendulum.delta_t, 'params': params}
+
+
+def recording():
+    """whether the pygame scripts keep their .trj files: PENDULUM_RECORD set to anything but 0"""
+    return os.environ.get('PENDULUM_RECORD', '0') not in ('', '0')
+
+
+def frame_writer(path, pendulum, scratch=False):
+    """
+    Writer for what the pygame scripts keep every frame: step, the state and
+    the three energies. It only goes to path when recording() is on,
+    otherwise nothing gets written at all, or with scratch=True (scripts that
+    read the run back for their plots) it goes to a temporary file that the
+    script removes when it's done with it.
+    """
+    if not recording():
+        if not scratch:
+            return _Discard()
+        fd, path = tempfile.mkstemp(suffix='.trj')
+        os.close(fd)
+    state = ('theta1', 'theta2', 'vel1', 'vel2') if pendulum.n_dof == 2 else ('angle', 'velocity')
+    return TrajectoryWriter(path, ('step',) + state + ('kinetic', 'potential', 'total'), **describe(pendulum))
+
+
+class TrajectoryWriter:
+    def __init__(self, path, columns, chunk_records=65536, **header):
+        self.path = path
+        self.columns = tuple(columns)
+        self.chunk_records = chunk_records
+        self.header = dict(header, columns=list(self.columns))
+        self.n_records = 0
+
+        text = json.dumps(self.header).encode()
+        # page aligned data, so every chunk maps cleanly
+        self.offset = -(-(_PREFIX.size + len(text)) // _ALIGN) * _ALIGN
+        self.row_bytes = 8 * len(self.columns)
+        self._file = open(path, 'w+b')
+        self._file.write(_PREFIX.pack(MAGIC, 0, self.offset) + text.ljust(self.offset - _PREFIX.size))
+        self._chunk = None # memmap of the chunk being filled
+        self._start = 0 # record number of its first row
+
+    def append(self, *values):
+        """one record, a value for every column"""
+        row = self.n_records - self._start
+        if self._chunk is None or row == self.chunk_records:
+            self._next_chunk()
+            row = 0
+        self._chunk[row] = values
+        self.n_records += 1
+
+    def extend(self, rows):
+        """many records at once, a (k, n_columns) array (e.g. from advance())"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(self.columns))
+        done = 0
+        while done < len(rows):
+            row = self.n_records - self._start
+            if self._chunk is None or row == self.chunk_records:
+                self._next_chunk()
+                row = 0
+            n = min(len(rows) - done, self.chunk_records - row)
+            self._chunk[row:row + n] = rows[done:done + n]
+            self.n_records += n
+            done += n
+
+    def flush(self):
+        """write out what we have, a reader opened after this sees every record so far"""
+        if self._chunk is not None:
+            self._chunk.flush()
+        self._file.seek(8)
+        self._file.write(struct.pack('<Q', self.n_records))
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._chunk = None
+        # drop the unused end of the last chunk
+        self._file.truncate(self.offset + self.n_records * self.row_bytes)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_chunk(self):
+        if self._chunk is not None:
+            self.flush()
+        self._start = self.n_records
+        end = self.offset + (self._start + self.chunk_records) * self.row_bytes
+        self._file.truncate(end)
+        self._chunk = np.memmap(self._file, dtype=np.float64, mode='r+', offset=self.offset + self._start * self.row_bytes,
+                                shape=(self.chunk_records, len(self.columns)))
+
+
+class _Discard:
+    """a writer that keeps nothing, what frame_writer hands out when we're not recording"""
+    path = None
+
+    def append(self, *values):
+        pass
+
+    def extend(self, rows):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class TrajectoryReader:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, n_records, offset = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a trajectory file")
+            self.header = json.loads(f.read(offset - _PREFIX.size))
+        self.columns = tuple(self.header['columns'])
+        # a writer that died mid run may have counted more than made it to disk
+        n_records = min(n_records, (os.path.getsize(path) - offset) // (8 * len(self.columns)))
+        if n_records:
+            self.data = np.memmap(path, dtype=np.float64, mode='r', offset=offset, shape=(n_records, len(self.columns)))
+        else:
+            self.data = np.empty((0, len(self.columns)))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, column):
+        """one column as a view into the file"""
+        return self.data[:, self.columns.index(column)]
@@ -0,0 +1,86 @@
+"""
+Parameter sweeps over (l1, l2, m1, m2, theta1, theta2, vel1, vel2).
+
+Every parameter set is one lane. The lanes get split into contiguous chunks
+and each worker process steps its chunk as a DoublePendulumEnsemble with
+advance(), writing straight into one shared memory block, so the
+trajectories never get pickled on the way back.
+
+    from pendulum_physics.sweep import grid, sweep
+    params = grid(theta1=np.linspace(0, np.pi, 100), theta2=np.linspace(0, np.pi, 100))
+    trajectories = sweep(**params, n_steps=2000, record_every=10) # (200, 4, 10000)
+
+Scripts calling this need the usual `if __name__ == '__main__':` guard,
+on windows/macos the workers re-import the main module.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .ensemble import DoublePendulumEnsemble, delta_t
+
+PARAMETERS = ('l1', 'l2', 'm1', 'm2', 'theta1', 'theta2', 'vel1', 'vel2')
+
+
+def grid(**axes):
+    """Every combination of the given 1d axes, flattened to one (N,) array per parameter (lane order is C order)."""
+    names = list(axes)
+    mesh = np.meshgrid(*(np.atleast_1d(np.asarray(axes[name], dtype=float)) for name in names), indexing='ij')
+    return {name: values.ravel() for name, values in zip(names, mesh)}
+
+
+def sweep(l1=200, l2=200, m1=15, m2=15, theta1=0, theta2=0, vel1=0, vel2=0, n_steps=1000, record_every=1,
+          delta_t=delta_t, integrator='glrk4', workers=None, chunks_per_worker=4, jit=False):
+    """
+    Run every parameter set (scalars and (N,) arrays broadcast together) for
+    n_steps and return the trajectories as a (n_records, 4, N) array, rows are
+    theta1, theta2, vel1, vel2 like advance(). workers=None uses every core,
+    workers=1 runs in this process without a pool.
+    """
+    values = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (l1, l2, m1, m2, theta1, theta2, vel1, vel2)))
+    lanes = values[0].shape[0]
+    n_records = -(-n_steps // record_every)
+    shape = (n_records, 4, lanes)
+    settings = {'n_steps': n_steps, 'record_every': record_every, 'delta_t': delta_t, 'integrator': integrator, 'jit': jit}
+    if not lanes or not n_records:
+        return np.empty(shape) # nothing to run, and a pool of 0 workers is an error
+
+    workers = workers or os.cpu_count() or 1
+    # a few chunks per worker so a slow (chaotic, many newton iterations) chunk doesnt hold everyone up
+    bounds = np.linspace(0, lanes, min(lanes, workers * chunks_per_worker) + 1).astype(int)
+    chunks = [(lo, hi, {name: v[lo:hi] for name, v in zip(PARAMETERS, values)}) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    try:
+        if workers == 1 or len(chunks) == 1:
+            for lo, hi, params in chunks:
+                _run_chunk(block.name, shape, lo, hi, params, settings)
+        else:
+            # numba's own threads stay at one per worker, the pool is the parallelism
+            initializer = None
+            if jit:
+                from .jit import one_thread as initializer
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=initializer) as pool:
+                futures = [pool.submit(_run_chunk, block.name, shape, lo, hi, params, settings) for lo, hi, params in chunks]
+                for future in futures:
+                    future.result() # re-raises whatever went wrong in a worker
+        trajectories = np.ndarray(shape, dtype=np.float64, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+    return trajectories
+
+
+def _run_chunk(name, shape, lo, hi, params, settings):
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        out = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        ensemble = DoublePendulumEnsemble((0, 0), delta_t=settings['delta_t'], integrator=settings['integrator'],
+                                          jit=settings['jit'], **params)
+        ensemble.advance(settings['n_steps'], settings['record_every'], out=out[:, :, lo:hi])
+        del out # the view has to go before the block can close
+    finally:
+        block.close()
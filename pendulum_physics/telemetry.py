@@ -0,0 +1,154 @@
+"""
+Fixed-size telemetry for values we sample every frame (energies, mostly).
+
+Like an RRD: the last `window` samples are kept as they are, and on top of
+that a few levels of consolidated bins (min, max and mean of every `width`
+samples), each level a ring of `capacity` bins fed by the finished bins of
+the level below it. The last level never drops anything, when it fills up
+neighbouring bins get merged in pairs and its bins get twice as wide, so it
+always covers the whole run. Memory is fixed from the start no matter how
+long the session goes.
+
+    energy = Telemetry(('kinetic', 'potential', 'total'))
+    energy.append(step, kinetic, potential, total)  # every frame
+    steps, low, high, mean = energy.history()      # (n,), (n, 3) x3 covering the whole run
+"""
+
+import numpy as np
+
+
+class Telemetry:
+    def __init__(self, channels, window=2048, widths=(16, 256, 4096), capacity=1024):
+        self.channels = tuple(channels)
+        self.n_samples = 0
+        self.window = window
+        self._x = np.empty(window)
+        self._values = np.empty((window, len(self.channels)))
+        if capacity % 2:
+            raise ValueError(f"capacity has to be even (the last level merges bins in pairs), got {capacity}")
+        # every level consolidates whole bins of the one below
+        for finer, coarser in zip(widths, widths[1:]):
+            if coarser % finer:
+                raise ValueError(f"bin widths have to be multiples of each other, got {widths}")
+        self.levels = [_Level(width, capacity, len(self.channels), fold=i == len(widths) - 1)
+                       for i, width in enumerate(widths)]
+
+    def append(self, x, *values):
+        """one sample at x (step or time), a value for every channel"""
+        slot = self.n_samples % self.window
+        self._x[slot] = x
+        self._values[slot] = values
+        self.n_samples += 1
+
+        finished = (x, values, values, values, 1)
+        for level in self.levels:
+            finished = level.add(*finished)
+            if finished is None:
+                break
+
+    def recent(self):
+        """the raw samples still in the window, oldest first: x (n,), values (n, channels)"""
+        n = min(self.n_samples, self.window)
+        order = (self.n_samples - n + np.arange(n)) % self.window
+        return self._x[order], self._values[order]
+
+    def level(self, i):
+        """bins of level i, oldest first: x of their first sample (n,), min, max and mean (n, channels)"""
+        # the newest samples are still in the open bins of the finer levels
+        pending = [level.open for level in reversed(self.levels[:i]) if level.open is not None]
+        return self.levels[i].bins(pending)
+
+    def history(self):
+        """
+        The finest data that still reaches back to the first sample, as
+        x, min, max, mean like level(). Raw samples while the run fits in the
+        window (min = max = mean then), the last level at the latest.
+        """
+        if self.n_samples <= self.window:
+            x, values = self.recent()
+            return x, values, values, values
+        for i, level in enumerate(self.levels):
+            if level.complete:
+                return self.level(i)
+
+    def __getitem__(self, channel):
+        """history of one channel: x, min, max, mean as (n,) arrays"""
+        i = self.channels.index(channel)
+        x, low, high, mean = self.history()
+        return x, low[:, i], high[:, i], mean[:, i]
+
+
+class _Level:
+    def __init__(self, width, capacity, channels, fold=False):
+        self.width = width # samples per bin
+        self.capacity = capacity
+        self.fold = fold
+        self.complete = True # still has every bin since the start
+        self.x = np.empty(capacity)
+        self.low = np.empty((capacity, channels))
+        self.high = np.empty((capacity, channels))
+        self.sum = np.empty((capacity, channels))
+        self.count = np.empty(capacity)
+        self.head = 0
+        self.size = 0
+        self.open = None # the bin being filled: x, low, high, sum, count
+
+    def add(self, x, low, high, total, count):
+        """add a sample (count=1) or a finished finer bin, returns this level's bin when it fills up"""
+        if self.open is None:
+            self.open = [x, list(low), list(high), list(total), count]
+        else:
+            _merge(self.open, low, high, total, count)
+        if self.open[4] < self.width:
+            return None
+
+        finished, self.open = self.open, None
+        if self.size == self.capacity:
+            if self.fold:
+                # bins are twice as wide after this, so this one is only half of the next
+                self._fold()
+                self.open = finished
+                return finished
+            self.complete = False
+        slot = self.head
+        self.x[slot], self.low[slot], self.high[slot], self.sum[slot], self.count[slot] = finished
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return finished
+
+    def bins(self, pending=()):
+        """the finished bins and the one being filled, plus the samples still in `pending` (unfinished finer bins, oldest first)"""
+        order = (self.head - self.size + np.arange(self.size)) % self.capacity
+        x, low, high = self.x[order], self.low[order], self.high[order]
+        total, count = self.sum[order], self.count[order]
+        current = None if self.open is None else [self.open[0]] + [list(v) for v in self.open[1:4]] + [self.open[4]]
+        for piece in pending:
+            if current is None:
+                current = [piece[0]] + [list(v) for v in piece[1:4]] + [piece[4]]
+            else:
+                _merge(current, *piece[1:])
+        if current is not None:
+            # the bin that isn't full yet counts too, it's the newest data
+            x = np.append(x, current[0])
+            low, high = np.vstack((low, current[1])), np.vstack((high, current[2]))
+            total, count = np.vstack((total, current[3])), np.append(count, current[4])
+        return x, low, high, total / count[:, None]
+
+    def _fold(self):
+        # merge neighbours, the ring is full so slot 0 is the oldest
+        half = self.capacity // 2
+        pairs = slice(0, 2 * half, 2), slice(1, 2 * half, 2)
+        self.x[:half] = self.x[pairs[0]]
+        self.low[:half] = np.minimum(self.low[pairs[0]], self.low[pairs[1]])
+        self.high[:half] = np.maximum(self.high[pairs[0]], self.high[pairs[1]])
+        self.sum[:half] = self.sum[pairs[0]] + self.sum[pairs[1]]
+        self.count[:half] = self.count[pairs[0]] + self.count[pairs[1]]
+        self.head = self.size = half
+        self.width *= 2
+
+
+def _merge(into, low, high, total, count):
+    into[1] = [a if a < b else b for a, b in zip(into[1], low)]
+    into[2] = [a if a > b else b for a, b in zip(into[2], high)]
+    into[3] = [a + b for a, b in zip(into[3], total)]
+    into[4] += count
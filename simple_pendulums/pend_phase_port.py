@@ -1,19 +1,16 @@
+import os
+import sys
 import math
 import matplotlib.pyplot as plt
-from pendulum_glrk4 import Pendulum
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics import Pendulum
 
 def simulate_pendulum(initial_angle, initial_velocity, steps=1000, step_skip=1, unwrap=False):
     pendulum = Pendulum(origin=(0, 0), length=1, mass=1, angle=initial_angle, velocity=initial_velocity)
-    angles, angular_velocities = [], []
-
-    for step in range(steps):
-        if step % step_skip == 0:
-            angle = pendulum.angle
-            if not unwrap:
-                angle = (angle + math.pi) % (2 * math.pi) - math.pi
-            angles.append(angle)
-            angular_velocities.append(pendulum.velocity)
-        pendulum.update()
+    angles, angular_velocities = pendulum.advance(steps, record_every=step_skip).T
+    if not unwrap:
+        angles = (angles + math.pi) % (2 * math.pi) - math.pi
 
     return angles, angular_velocities
 
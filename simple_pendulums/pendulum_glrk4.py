@@ -1,140 +1,39 @@
+import os
+import sys
 import pygame
-import math
-import time
-import matplotlib.pyplot as plt
-from scipy.optimize import fsolve
 
-pygame.init()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics import pendulum as physics
+from pendulum_physics.downsample import lttb
+from pendulum_physics.pendulum import delta_t
+from pendulum_physics.profiler import FrameProfiler
+from pendulum_physics.scheduler import FixedStep
+from pendulum_physics.store import TrajectoryReader, frame_writer, recording
+from pendulum_physics.telemetry import Telemetry
+
+# importing this file shouldnt open a window, so the window, font and
+# matplotlib only get set up when we run it directly
+
 width, height = 800, 800
-G = 9.81
 black = (0, 0, 0)
 white = (255, 255, 255)
 red = (255, 0, 0)
-delta_t = 0.03
-
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption("bespendulum ever crEated")
-font = pygame.font.Font(None, 36)
-
-class Pendulum:
-    def __init__(self, origin, mass, length, damping=1.0, angle=0,velocity=0) -> None:
-        self.origin = origin
-        self.mass = mass
-        self.length = length
-        self.angle = angle
-        self.velocity = velocity
-        self.acceleration = 0
-        self.dragging = False
-        self.ball_color = black
-        self.mouse_pos_history = []  # mouse pos
-        self.max_history_length = 4
-        self.throwing_enabled = False  # toggle T to throw
-    
-    def update(self): #absolutely overkill hahah
-        if not self.dragging:
-            h = delta_t
-            L = self.length
-            #curr state
-            theta_n = self.angle
-            omega_n = self.velocity
-
-            # c1,c2 not used bc diff equations are not time dep
-            c1 = 0.5 - math.sqrt(3)/6
-            c2 = 0.5 + math.sqrt(3)/6
-            a11 = 0.25
-            a12 = 0.25 - math.sqrt(3)/6
-            a21 = 0.25 + math.sqrt(3)/6
-            a22 = 0.25
-            b1 = 0.5
-            b2 = 0.5
-
-            K1_guess = [omega_n, -G/L * math.sin(theta_n)]
-            K2_guess = [omega_n, -G/L * math.sin(theta_n)]
-            K_guess = K1_guess + K2_guess
-
-            def residuals(K):
-                K1_theta, K1_omega, K2_theta, K2_omega = K
-
-                theta_c1 = theta_n + h * (a11 * K1_theta + a12 * K2_theta)
-                omega_c1 = omega_n + h * (a11 * K1_omega + a12 * K2_omega)
-                f1_theta = omega_c1
-                f1_omega = -G / L * math.sin(theta_c1)
-
-                res1_theta = K1_theta - f1_theta
-                res1_omega = K1_omega - f1_omega
-
-                theta_c2 = theta_n + h * (a21 * K1_theta + a22 * K2_theta)
-                omega_c2 = omega_n + h * (a21 * K1_omega + a22 * K2_omega)
-                f2_theta = omega_c2
-                f2_omega = -G / L * math.sin(theta_c2)
-
-                res2_theta = K2_theta - f2_theta
-                res2_omega = K2_omega - f2_omega
-
-                return [res1_theta, res1_omega, res2_theta, res2_omega]
-
-            K_solution, _ , ier, msg = fsolve(residuals, K_guess, full_output=True)
-
-            if ier != 1: # if we cant converge, we should always be able to tho
-                raise RuntimeError(msg) 
-
-            K1_theta, K1_omega, K2_theta, K2_omega = K_solution
-
-            self.angle += h * (b1 * K1_theta + b2 * K2_theta)
-            self.velocity += h * (b1 * K1_omega + b2 * K2_omega)
-            self.acceleration = -G / L * math.sin(self.angle)
-            
-    
-    def get_pos(self):
-        x = self.origin[0] + (self.length * math.sin(self.angle))
-        y = self.origin[1] + (self.length * math.cos(self.angle))
-        return (x, y)
-    
-    def kinetic_energy(self):
-        linear_velocity = self.length * self.velocity
-        return 0.5 * self.mass * (linear_velocity ** 2)
+# delta_t comes with the physics, smaller is more accurate but takes more steps
+speed = 1.8 # simulated seconds per real second
 
-    def potential_energy(self):
-        _, y = self.get_pos()
-        height = self.origin[1] - y + self.length
-        return self.mass * G * height
+class Pendulum(physics.Pendulum):
+    """The headless GLRK4 pendulum from pendulum_physics, plus pygame drawing."""
+    def __init__(self, origin, mass, length, damping=1.0, angle=0, velocity=0, **kwargs) -> None:
+        super().__init__(origin, mass, length, damping=damping, angle=angle, velocity=velocity, **kwargs)
+        self.ball_color = black
 
-    def total_energy(self):
-        return self.kinetic_energy() + self.potential_energy()
-    
     def draw(self, screen):
         pos = self.get_pos()
         pygame.draw.line(screen, black, self.origin, pos, 2)
         pygame.draw.circle(screen, self.ball_color, (int(pos[0]), int(pos[1])), int(self.mass))
     
-    def mouse_drag(self, mouse_pos):
-        if self.dragging:
-            dx = mouse_pos[0] - self.origin[0]
-            dy = mouse_pos[1] - self.origin[1]
-            self.angle = math.atan2(dx, dy)
-            current_time = time.time()
-            self.mouse_pos_history.append((mouse_pos, current_time))
-            if len(self.mouse_pos_history) > self.max_history_length:
-                self.mouse_pos_history.pop(0)
-
     def release(self):
-        if self.throwing_enabled and len(self.mouse_pos_history) > 1:
-            total_dx = total_dy = total_dt = 0
-            for i in range(len(self.mouse_pos_history) - 1):
-                (x1, y1), t1 = self.mouse_pos_history[i]
-                (x2, y2), t2 = self.mouse_pos_history[i + 1]
-                total_dx += (x2 - x1)
-                total_dy += (y2 - y1)
-                total_dt += (t2 - t1)
-
-            sens = 70
-            if total_dt > 0:
-                avg_velocity_x = (total_dx / total_dt) / sens
-                avg_velocity_y = (total_dy / total_dt) / sens
-                self.velocity = (avg_velocity_x * math.cos(self.angle) + avg_velocity_y * math.sin(self.angle)) / self.length
-
-        self.mouse_pos_history.clear()
-        self.dragging = False
+        super().release()
         self.ball_color = black
     
 def draw_text(screen, text, position, font, color=black):
@@ -142,18 +41,29 @@ def draw_text(screen, text, position, font, color=black):
     screen.blit(text_surface, position)
 
 if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption("bespendulum ever crEated")
+    font = pygame.font.Font(None, 36)
+
     pendulum = Pendulum(origin=(width // 2, 100), length=300, mass=15)
     #pendulum.angle= math.pi/4
     running = True
     clock = pygame.time.Clock()
     time_step = 0
 
-    # Data lists for plotting after the simulation
-    time_steps, kinetic_energies, potential_energies, total_energies = [], [], [], []
-    angles, angular_velocities = [], []
+    # the phase plots at the end read the run back from this file, a temporary one unless PENDULUM_RECORD=1
+    record = frame_writer("pendulum_glrk4.trj", pendulum, scratch=True)
+    energy = Telemetry(('kinetic', 'potential', 'total'))
+    profiler = FrameProfiler()
+    fixed_step = FixedStep(speed=speed)
 
     while running:
+        profiler.frame()
         screen.fill(white)
+        profiler.mark('clear')
         for event in pygame.event.get():
             mouse_pos = pygame.mouse.get_pos()
             bob_x, bob_y = pendulum.get_pos()
@@ -170,6 +80,8 @@ if __name__ == '__main__':
                     pendulum = Pendulum(origin=(width // 2, 100), length=300, mass=15)
                 elif event.key == pygame.K_t:
                     pendulum.throwing_enabled = not pendulum.throwing_enabled
+                elif event.key == pygame.K_p:
+                    profiler.toggle()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if (curr_x) ** 2 + (curr_y) ** 2 <= pendulum.mass ** 2:
                     pendulum.dragging = True
@@ -180,38 +92,49 @@ if __name__ == '__main__':
                 if pendulum.dragging:
                     pendulum.mouse_drag(pygame.mouse.get_pos())
 
-        pendulum.update()
-        pendulum.draw(screen)
+        profiler.mark('events')
+        steps = fixed_step.advance(pendulum)
+        profiler.mark('update')
+        with fixed_step.interpolated(pendulum):
+            pendulum.draw(screen)
+        profiler.mark('draw')
 
-        angles.append(pendulum.angle)
-        angular_velocities.append(pendulum.velocity)
-        
         kinetic_energy = pendulum.kinetic_energy()
         potential_energy = pendulum.potential_energy()
         total_energy = pendulum.total_energy()
         
-        kinetic_energies.append(kinetic_energy)
-        potential_energies.append(potential_energy)
-        total_energies.append(total_energy)
-        time_steps.append(time_step)
+        if steps:
+            record.append(time_step, *pendulum.y, kinetic_energy, potential_energy, total_energy)
+            energy.append(time_step, kinetic_energy, potential_energy, total_energy)
+        profiler.mark('energy')
 
-        instructions = "Space: Reset | T: Enable/Disable Throwing"
+        instructions = "Space: Reset | T: Enable/Disable Throwing | P: Profiler"
         status = f"Throwing: {'Enabled' if pendulum.throwing_enabled else 'Disabled'}"
         energy_text = f"Total Energy: {total_energy:.2f} | KE: {kinetic_energy:.2f} | PE: {potential_energy:.2f}"
 
         draw_text(screen, instructions, (10, height - 120), font)
         draw_text(screen, status, (10, height - 90), font)
         draw_text(screen, energy_text, (10, height - 60), font)
+        profiler.mark('text')
 
-        time_step += 1
+        time_step += steps
 
+        profiler.draw(screen)
         pygame.display.flip()
+        profiler.mark('flip')
 
     pygame.quit()
+    record.close()
+    print(profiler.summary())
+    time_steps, low, high, mean = energy.history()
+    kinetic_energies, potential_energies, total_energies = mean.T
+    run = TrajectoryReader(record.path)
+    angles, angular_velocities = run['angle'], run['velocity']
 
     # plot energy after
     plt.figure(figsize=(10, 6))
     plt.plot(time_steps, total_energies, 'r-', label="Total Energy")
+    plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
     plt.plot(time_steps, kinetic_energies, 'g-', label="Kinetic Energy")
     plt.plot(time_steps, potential_energies, 'b-', label="Potential Energy")
     plt.xlabel("Time Step")
@@ -227,6 +150,7 @@ if __name__ == '__main__':
 
     plt.figure(figsize=(10, 6))
     plt.plot(time_steps, total_energies, 'r-', label="Total Energy")
+    plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
     plt.xlabel("Time Step")
     plt.ylabel("Energy")
     plt.title("GLRK4: Pendulum Energy Over Time")
@@ -239,10 +163,16 @@ if __name__ == '__main__':
     plt.show()
 
     plt.figure(figsize=(8, 6))
-    plt.plot(angles, angular_velocities, 'b-', label="Phase Portrait")
+    # a long run is millions of points, lttb keeps the shape with a couple thousand
+    plt.plot(*lttb(angles, angular_velocities), 'b-', label="Phase Portrait")
     plt.xlabel("Angle (θ) [radians]")
     plt.ylabel("Angular Velocity (ω) [radians/s]")
     plt.title("Phase Portrait of the Pendulum")
     plt.legend()
     plt.grid()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+    # the views go first, the file can't be removed while it's mapped (windows)
+    del run, angles, angular_velocities
+    if not recording():
+        os.remove(record.path)
\ No newline at end of file
@@ -1,100 +1,43 @@
+import os
+import sys
 import pygame
-import math
-import time
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pendulum_physics import pendulum as physics
+from pendulum_physics.profiler import FrameProfiler
+from pendulum_physics.scheduler import FixedStep
+from pendulum_physics.store import frame_writer
+from pendulum_physics.telemetry import Telemetry
+
 pygame.init()
 width, height = 800, 800
-G = 9.81
 black = (0, 0, 0)
 white = (255, 255, 255)
 red = (255, 0, 0)
 delta_t = 0.03
+# smaller delta t is more accurate but takes more steps
+speed = 1.8 # simulated seconds per real second
 
 screen = pygame.display.set_mode((width, height))
 pygame.display.set_caption("bespendulum ever crEated")
 font = pygame.font.Font(None, 36)
 
-class Pendulum:
+class Pendulum(physics.Pendulum):
+    """The headless pendulum from pendulum_physics, stepped with the velocity_verlet integrator, plus pygame drawing."""
     def __init__(self, origin, mass, length, damping=1.0) -> None:
-        self.origin = origin
-        self.mass = mass
-        self.length = length
-        self.angle = 0
-        self.velocity = 0
-        self.acceleration = 0
-        self.dragging = False
+        super().__init__(origin, mass, length, damping=damping, delta_t=delta_t, integrator='velocity_verlet')
         self.ball_color = black
-        self.mouse_pos_history = []  # mouse pos
-        self.max_history_length = 4
-        self.throwing_enabled = False  # toggle T to throw
-    
-    def update(self):
-        # VELOCITY VERLET!
-        if not self.dragging:
-            #angle_new = angle_old + velocity_old * delta_t + 0.5 * accel_old * delta_t^2
-            self.angle = self.angle + (self.velocity * delta_t + (0.5 * self.acceleration) * (delta_t ** 2))
-            old_accel = self.acceleration
-
-            # update acceleration using new angle
-            self.acceleration = -(G / self.length) * math.sin(self.angle) # update the angle
-
-            # velocity_new = velocity_old + (0.5 * (new_accel + old_accel) * delta_t)
-            self.velocity = self.velocity + (0.5 * (self.acceleration + old_accel) * delta_t)
-            
-    
-    def get_pos(self):
-        x = self.origin[0] + (self.length * math.sin(self.angle))
-        y = self.origin[1] + (self.length * math.cos(self.angle))
-        return (x, y)
-    
-    def kinetic_energy(self):
-        linear_velocity = self.length * self.velocity
-        return 0.5 * self.mass * (linear_velocity ** 2)
-
-    def potential_energy(self):
-        _, y = self.get_pos()
-        height = self.origin[1] - y + self.length
-        return self.mass * G * height
 
-    def total_energy(self):
-        return self.kinetic_energy() + self.potential_energy()
-    
     def draw(self, screen):
         pos = self.get_pos()
         pygame.draw.line(screen, black, self.origin, pos, 2)
         pygame.draw.circle(screen, self.ball_color, (int(pos[0]), int(pos[1])), int(self.mass))
-    
-    def mouse_drag(self, mouse_pos):
-        if self.dragging:
-            dx = mouse_pos[0] - self.origin[0]
-            dy = mouse_pos[1] - self.origin[1]
-            self.angle = math.atan2(dx, dy)
-            current_time = time.time()
-            self.mouse_pos_history.append((mouse_pos, current_time))
-            if len(self.mouse_pos_history) > self.max_history_length:
-                self.mouse_pos_history.pop(0)
 
     def release(self):
-        if self.throwing_enabled and len(self.mouse_pos_history) > 1:
-            total_dx = total_dy = total_dt = 0
-            for i in range(len(self.mouse_pos_history) - 1):
-                (x1, y1), t1 = self.mouse_pos_history[i]
-                (x2, y2), t2 = self.mouse_pos_history[i + 1]
-                total_dx += (x2 - x1)
-                total_dy += (y2 - y1)
-                total_dt += (t2 - t1)
-
-            sens = 70
-            if total_dt > 0:
-                avg_velocity_x = (total_dx / total_dt) / sens
-                avg_velocity_y = (total_dy / total_dt) / sens
-                self.velocity = (avg_velocity_x * math.cos(self.angle) + avg_velocity_y * math.sin(self.angle)) / self.length
-
-        self.mouse_pos_history.clear()
-        self.dragging = False
+        super().release()
         self.ball_color = black
-    
+
 def draw_text(screen, text, position, font, color=black):
     text_surface = font.render(text, True, color)
     screen.blit(text_surface, position)
@@ -105,11 +48,15 @@ running = True
 clock = pygame.time.Clock()
 time_step = 0
 
-# Data lists for plotting after the simulation
-time_steps, kinetic_energies, potential_energies, total_energies = [], [], [], []
+record = frame_writer("velocity_verlet_pend.trj", pendulum)
+energy = Telemetry(('kinetic', 'potential', 'total'))
+profiler = FrameProfiler()
+fixed_step = FixedStep(speed=speed)
 
 while running:
+    profiler.frame()
     screen.fill(white)
+    profiler.mark('clear')
     for event in pygame.event.get():
         mouse_pos = pygame.mouse.get_pos()
         bob_x, bob_y = pendulum.get_pos()
@@ -126,6 +73,8 @@ while running:
                 pendulum = Pendulum(origin=(width // 2, 100), length=300, mass=15)
             elif event.key == pygame.K_t:
                 pendulum.throwing_enabled = not pendulum.throwing_enabled
+            elif event.key == pygame.K_p:
+                profiler.toggle()
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if (curr_x) ** 2 + (curr_y) ** 2 <= pendulum.mass ** 2:
                 pendulum.dragging = True
@@ -136,35 +85,47 @@ while running:
             if pendulum.dragging:
                 pendulum.mouse_drag(pygame.mouse.get_pos())
 
-    pendulum.update()
-    pendulum.draw(screen)
+    profiler.mark('events')
+    steps = fixed_step.advance(pendulum)
+    profiler.mark('update')
+    with fixed_step.interpolated(pendulum):
+        pendulum.draw(screen)
+    profiler.mark('draw')
     
     kinetic_energy = pendulum.kinetic_energy()
     potential_energy = pendulum.potential_energy()
     total_energy = pendulum.total_energy()
     
-    kinetic_energies.append(kinetic_energy)
-    potential_energies.append(potential_energy)
-    total_energies.append(total_energy)
-    time_steps.append(time_step)
+    if steps:
+        record.append(time_step, *pendulum.y, kinetic_energy, potential_energy, total_energy)
+        energy.append(time_step, kinetic_energy, potential_energy, total_energy)
+    profiler.mark('energy')
 
-    instructions = "Space: Reset | T: Enable/Disable Throwing"
+    instructions = "Space: Reset | T: Enable/Disable Throwing | P: Profiler"
     status = f"Throwing: {'Enabled' if pendulum.throwing_enabled else 'Disabled'}"
     energy_text = f"Total Energy: {total_energy:.2f} | KE: {kinetic_energy:.2f} | PE: {potential_energy:.2f}"
 
     draw_text(screen, instructions, (10, height - 120), font)
     draw_text(screen, status, (10, height - 90), font)
     draw_text(screen, energy_text, (10, height - 60), font)
+    profiler.mark('text')
 
-    time_step += 1
+    time_step += steps
 
+    profiler.draw(screen)
     pygame.display.flip()
+    profiler.mark('flip')
 
 pygame.quit()
+record.close()
+print(profiler.summary())
+time_steps, low, high, mean = energy.history()
+kinetic_energies, potential_energies, total_energies = mean.T
 
 # plot energy after
 plt.figure(figsize=(10, 6))
 plt.plot(time_steps, total_energies, 'r-', label="Total Energy")
+plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
 plt.plot(time_steps, kinetic_energies, 'g-', label="Kinetic Energy")
 plt.plot(time_steps, potential_energies, 'b-', label="Potential Energy")
 plt.xlabel("Time Step")
@@ -181,6 +142,7 @@ plt.show()
 # plot total energy after
 plt.figure(figsize=(10, 6))
 plt.plot(time_steps, total_energies, 'r-', label="Total Energy")
+plt.fill_between(time_steps, low[:, 2], high[:, 2], color='red', alpha=0.2)
 plt.xlabel("Time Step")
 plt.ylabel("Energy")
 plt.title("Velocity Verlet Method: Pendulum Energy Over Time")